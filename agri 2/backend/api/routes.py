@@ -1,22 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from typing import List
 
 from backend.database import get_db
-from backend.models import DecisionResponse, FarmInput, EnvironmentalData, Crop
-from backend.pydantic_models import PrescreenRequest, PrescreenResponse, Location, WaterAvailability, CropCandidate
+from backend.models import DecisionResponse, FarmInput, EnvironmentalData
+from backend.data.crop_catalog import crop_catalog
+from backend.pydantic_models import (
+    PrescreenRequest, PrescreenResponse, Location, WaterAvailability, CropCandidate,
+    BatchPrescreenRequest, BatchPrescreenResponse,
+)
 from backend.services.input_processor import InputProcessor
-from backend.services.environmental_service import EnvironmentalService
+from backend.services.environmental_service import EnvironmentalService, env_inflight
+from backend.services.nasa_service import power_cache, snap_to_grid
 from backend.services.crop_selection_engine import CropSelectionEngine
+from backend.services.prescreen_memo import prescreen_memo
 from backend.services.model_engine import ModelOrchestrator
 from backend.services.decision_synthesis import DecisionSynthesizer
 
 # LLM Pipeline imports
 from backend.services.models.schemas import (
     FullAnalysisRequest, FullAnalysisResponse,
-    AnalysisContext, EnvironmentContext, UserContext, CropContext,
+    AnalysisContext, EnvironmentContext, UserContext,
 )
 from backend.services.llm_orchestrator import run_full_analysis
+from backend.services.openrouter_client import llm_cache, llm_inflight, rate_limiter
+from backend.config import NASA_PREFETCH_CONCURRENCY, PRESCREEN_BATCH_MAX_FARMS
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -33,15 +46,61 @@ async def prescreen_crops(request: PrescreenRequest, db: Session = Depends(get_d
             request.location.lon
         )
         
-        # Use the upgraded CropSelectionEngine
+        # Use the upgraded CropSelectionEngine; repeat profiles in a cell are
+        # served from the memo as pre-serialized JSON (no scoring, no re-validation)
         engine = CropSelectionEngine(db, env_data, request)
-        response = engine.get_prescreen_results()
-        
-        return response
+        entry = engine.get_prescreen_entry()
+
+        return Response(content=entry.json, media_type="application/json")
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/crop-advisor/prescreen/batch", response_model=BatchPrescreenResponse)
+async def prescreen_crops_batch(request: BatchPrescreenRequest, db: Session = Depends(get_db)):
+    """
+    Pre-screen many farms in one call (field-agent sync).
+    Farms are grouped by NASA grid cell so each cell is fetched once, then
+    every farm is scored against the catalog in a single vectorized pass.
+    """
+    if len(request.farms) > PRESCREEN_BATCH_MAX_FARMS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {PRESCREEN_BATCH_MAX_FARMS} farms per batch (got {len(request.farms)})",
+        )
+
+    cells: dict = {}  # (cell_lat, cell_lon) -> farm indices
+    for i, farm in enumerate(request.farms):
+        cells.setdefault(snap_to_grid(farm.location.lat, farm.location.lon), []).append(i)
+
+    # Same cap as the overnight prefetch, so one large batch can't flood POWER
+    sem = asyncio.Semaphore(max(1, NASA_PREFETCH_CONCURRENCY))
+
+    async def fetch(lat: float, lon: float):
+        async with sem:
+            return await EnvironmentalService.fetch_environmental_data(lat, lon)
+
+    fetched = await asyncio.gather(*(fetch(lat, lon) for lat, lon in cells), return_exceptions=True)
+
+    farms, indices, errors = [], [], {}
+    for farm_ids, env_data in zip(cells.values(), fetched):
+        for i in farm_ids:
+            if isinstance(env_data, Exception):
+                errors[i] = str(env_data)
+            else:
+                farms.append((request.farms[i], env_data))
+                indices.append(i)
+
+    try:
+        responses = CropSelectionEngine.prescreen_batch(db, farms)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    results = [None] * len(request.farms)
+    for i, response in zip(indices, responses):
+        results[i] = response
+    return BatchPrescreenResponse(results=results, errors=errors, cells=len(cells))
+
 @router.post("/farm/analyze", response_model=DecisionResponse)
 async def analyze_farm(input_data: FarmInput, db: Session = Depends(get_db)):
     """
@@ -49,15 +108,17 @@ async def analyze_farm(input_data: FarmInput, db: Session = Depends(get_db)):
     Executes the full pipeline: Input -> Env -> Pre-screen -> Models -> Decision.
     """
     # 1. Input Processing
-    print(f"Received input: {input_data}")
     ctx = InputProcessor.process(input_data)
-    print(f"Processed context: {ctx}")
+    logger.info(
+        f"[analyze] lat={input_data.latitude} lon={input_data.longitude} "
+        f"season={ctx.season} zone={ctx.region_zone} area={ctx.normalized_land_area:.2f}ac"
+    )
     
     # 2. Environmental Data
     env_data = await EnvironmentalService.fetch_environmental_data(input_data.latitude, input_data.longitude)
-    print(f"Fetched env data: {env_data}")
+    logger.debug(f"[analyze] env data: {env_data}")
     
-    # 3. Pre-screen Candidates (Top 5)
+    # 3. Pre-screen Candidates
     # Adapt FarmInput to PrescreenRequest for the engine
     # Map water source
     water_map = {
@@ -76,46 +137,21 @@ async def analyze_farm(input_data: FarmInput, db: Session = Depends(get_db)):
         budget_per_acre=input_data.budget if input_data.budget else 0
     )
     
+    # The engine hands back the catalog rows with their prescreen scores directly
     engine = CropSelectionEngine(db, env_data, prescreen_req)
-    # get_prescreen_results returns PrescreenResponse
-    prescreen_response = engine.get_prescreen_results()
-    
-    candidates_with_score = []
-    # Convert back to (Crop, score) tuple expected by downstream logic
-    # We need to fetch the full Crop object again or use what we have?
-    # prescreen_response.candidates has IDs.
-    # But downstream code expects (Crop, score).
-    # Since engine uses SQLAlchemy Crop internally, maybe we extended get_top_5 to return objects?
-    # But get_top_5 returns Pydantic model response.
-    # We should probably refactor engine to expose intermediate step or re-fetch.
-    # For now, let's re-fetch by ID for Simplicity or hack it.
-    
-    # Better approach: Modify analyze_farm logic to restart from candidate IDs.
-    candidate_ids = [c.id for c in prescreen_response.candidates]
-    # Fetch crops by ID
-    candidate_crops = db.query(Crop).filter(Crop.id.in_(candidate_ids)).all()
-    # Map scores
-    score_map = {c.id: c.score for c in prescreen_response.candidates}
-    
-    candidates_with_score = []
-    for crop in candidate_crops:
-        score = score_map.get(str(crop.id), 0) # ID might be int in DB but str in Pydantic
-        candidates_with_score.append((crop, score))
-
-    print(f"Candidates found: {[c.name for c, s in candidates_with_score]}")
+    candidates_with_score = engine.get_ranked_crops()
+    logger.info(f"[analyze] {len(candidates_with_score)} candidates: {[c.name for c, _ in candidates_with_score]}")
     
     if not candidates_with_score:
         raise HTTPException(status_code=404, detail="No suitable crops found for this season and location.")
 
     # 4. Model Orchestration
-    # Run all models for all candidates
-    candidate_results = []
+    # Run all models for all candidates, crops fanned out concurrently
+    candidate_results = await ModelOrchestrator.run_for_candidates(
+        ctx, env_data, [crop for crop, _ in candidates_with_score]
+    )
     best_bet_models = [] # To store details for the primary decision
 
-    for crop, pre_score in candidates_with_score:
-        results = await ModelOrchestrator.run_all_models(ctx, env_data, crop)
-        candidate_results.append((crop, results))
-
     # 5. Final Decision Synthesis
     best_bet, alternatives = DecisionSynthesizer.synthesize(candidate_results)
     
@@ -137,8 +173,7 @@ def get_crops(db: Session = Depends(get_db)):
     """
     Get list of all available crops.
     """
-    crops = db.query(Crop).all()
-    return [c.name for c in crops]
+    return [c.name for c in crop_catalog.snapshot().records]
 
 @router.get("/environmental-data", response_model=EnvironmentalData)
 async def get_env_data(lat: float, lon: float):
@@ -147,6 +182,34 @@ async def get_env_data(lat: float, lon: float):
     """
     return await EnvironmentalService.fetch_environmental_data(lat, lon)
 
+@router.get("/environmental-data/cache/stats")
+def get_env_cache_stats():
+    """
+    Hit/miss counters for the NASA POWER grid-cell cache (debug endpoint).
+    """
+    return {**power_cache.stats(), "single_flight": env_inflight.stats()}
+
+@router.get("/crop-advisor/prescreen/cache/stats")
+def get_prescreen_cache_stats():
+    """
+    Hit/miss counters for the prescreen response memo (debug endpoint).
+    """
+    return prescreen_memo.stats()
+
+@router.get("/llm/cache/stats")
+def get_llm_cache_stats():
+    """
+    Hit/miss counters for the LLM response cache and request coalescing (debug endpoint).
+    """
+    return {**llm_cache.stats(), "single_flight": llm_inflight.stats()}
+
+@router.get("/llm/rate-limits")
+def get_llm_rate_limits():
+    """
+    Current token-bucket state per model/provider group (debug endpoint).
+    """
+    return rate_limiter.stats()
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # NEW: Full 9-Model LLM Analysis Pipeline
@@ -159,11 +222,13 @@ async def full_analysis(request: FullAnalysisRequest, db: Session = Depends(get_
 
     Flow:
     1. Fetch environmental data from NASA API
-    2. Load selected crops from DB
+    2. Load selected crops from the catalog snapshot
     3. Build AnalysisContext
     4. Run Models 1–8 in parallel (OpenRouter LLM)
     5. Run Model 9 synthesis
     6. Return FullAnalysisResponse with final decision + all model outputs
+    request.mode overrides ANALYSIS_MODE ("refine" falls back to the numeric
+    estimate on any LLM error).
     """
     try:
         lat = request.location.get("lat")
@@ -174,9 +239,10 @@ async def full_analysis(request: FullAnalysisRequest, db: Session = Depends(get_
         # 1. Fetch environmental data
         env_data = await EnvironmentalService.fetch_environmental_data(lat, lon)
 
-        # 2. Load selected crops from DB
-        db_crops = db.query(Crop).filter(Crop.id.in_(request.selected_crop_ids)).all()
-        if not db_crops:
+        # 2. Load selected crops from the in-memory catalog
+        catalog = crop_catalog.snapshot()
+        crops = catalog.get_many(request.selected_crop_ids)
+        if not crops:
             raise HTTPException(
                 status_code=404,
                 detail=f"No crops found for IDs: {request.selected_crop_ids}"
@@ -195,6 +261,9 @@ async def full_analysis(request: FullAnalysisRequest, db: Session = Depends(get_
             soil_moisture_percent=env_data.soil_moisture_index,
             gdd=env_data.gdd,
             humidity_percent=env_data.avg_humidity,
+            et0_mm_day=env_data.et0_mm_day,
+            daily_et0_mm=env_data.daily_et0_mm,
+            daily_rain_mm=env_data.daily_rain_mm,
         )
 
         user_ctx = UserContext(
@@ -204,27 +273,7 @@ async def full_analysis(request: FullAnalysisRequest, db: Session = Depends(get_
             soil_type=request.soil_type,
         )
 
-        crop_contexts = [
-            CropContext(
-                id=crop.id,
-                name=crop.name,
-                season=crop.season or "Unknown",
-                min_temp=crop.min_temp or 15.0,
-                max_temp=crop.max_temp or 35.0,
-                min_rainfall=crop.min_rainfall or 300.0,
-                max_rainfall=crop.max_rainfall or 1200.0,
-                water_requirement_mm=crop.water_requirement_mm or 500.0,
-                soil_type=crop.soil_type or "Loamy",
-                duration_days=crop.duration_days or 120,
-                input_cost_per_acre=crop.input_cost_per_acre or 20000.0,
-                market_price_per_quintal=crop.market_price_per_quintal or 2000.0,
-                market_potential=crop.market_potential or "Medium",
-                yield_quintal_per_acre=crop.yield_quintal_per_acre or 15.0,
-                risk_factor=crop.risk_factor or "Medium",
-                perishability=crop.perishability or "Low",
-            )
-            for crop in db_crops
-        ]
+        crop_contexts = catalog.contexts_for(request.selected_crop_ids)
 
         context = AnalysisContext(
             environment=env_ctx,
@@ -234,7 +283,7 @@ async def full_analysis(request: FullAnalysisRequest, db: Session = Depends(get_
 
 
         # 4 & 5. Run full LLM pipeline
-        result = await run_full_analysis(context)
+        result = await run_full_analysis(context, mode=request.mode)
         return result
 
     except ValueError as e:
@@ -250,16 +299,20 @@ async def full_analysis(request: FullAnalysisRequest, db: Session = Depends(get_
 # NEW: Progressive Analysis Endpoints (Model 1 First, Then Rest)
 # ─────────────────────────────────────────────────────────────────────────────
 
-from backend.services.analysis_job_store import AnalysisJobStore, AnalysisStatus
-from backend.services.llm_orchestrator import run_model_1_only, run_sequential_remaining_models
-from fastapi import BackgroundTasks
-import asyncio
+from backend.services.analysis_job_store import AnalysisJobStore, AnalysisStatus, TERMINAL_STATUSES
+from backend.services.llm_orchestrator import run_analysis_job, store_estimates
+from backend.config import JOB_EVENTS_HEARTBEAT_SECONDS, ANALYSIS_MODE
+from fastapi import BackgroundTasks, Request
+from fastapi.responses import StreamingResponse
+import json
 
 @router.post("/crop-advisor/analysis/start")
 async def start_analysis(request: FullAnalysisRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """
     Start the progressive analysis.
     Returns immediately with an analysis_id and status.
+    mode="refine" stores a numeric estimate for every model first, so
+    model_results is complete on the first poll; LLM results replace it.
     """
     try:
         # Create Job
@@ -273,7 +326,8 @@ async def start_analysis(request: FullAnalysisRequest, background_tasks: Backgro
              raise HTTPException(status_code=422, detail="location must contain 'lat' and 'lon'")
 
         env_data = await EnvironmentalService.fetch_environmental_data(lat, lon)
-        db_crops = db.query(Crop).filter(Crop.id.in_(request.selected_crop_ids)).all()
+        catalog = crop_catalog.snapshot()
+        crops = catalog.get_many(request.selected_crop_ids)
         
         # Build Context
         env_ctx = EnvironmentContext(
@@ -288,6 +342,9 @@ async def start_analysis(request: FullAnalysisRequest, background_tasks: Backgro
             soil_moisture_percent=env_data.soil_moisture_index,
             gdd=env_data.gdd,
             humidity_percent=env_data.avg_humidity,
+            et0_mm_day=env_data.et0_mm_day,
+            daily_et0_mm=env_data.daily_et0_mm,
+            daily_rain_mm=env_data.daily_rain_mm,
         )
 
         user_ctx = UserContext(
@@ -297,31 +354,11 @@ async def start_analysis(request: FullAnalysisRequest, background_tasks: Backgro
             soil_type=request.soil_type,
         )
 
-        crop_contexts = [
-            CropContext(
-                id=crop.id,
-                name=crop.name,
-                season=crop.season or "Unknown",
-                min_temp=crop.min_temp or 15.0,
-                max_temp=crop.max_temp or 35.0,
-                min_rainfall=crop.min_rainfall or 300.0,
-                max_rainfall=crop.max_rainfall or 1200.0,
-                water_requirement_mm=crop.water_requirement_mm or 500.0,
-                soil_type=crop.soil_type or "Loamy",
-                duration_days=crop.duration_days or 120,
-                input_cost_per_acre=crop.input_cost_per_acre or 20000.0,
-                market_price_per_quintal=crop.market_price_per_quintal or 2000.0,
-                market_potential=crop.market_potential or "Medium",
-                yield_quintal_per_acre=crop.yield_quintal_per_acre or 15.0,
-                risk_factor=crop.risk_factor or "Medium",
-                perishability=crop.perishability or "Low",
-            )
-            for crop in db_crops
-        ]
+        crop_contexts = catalog.contexts_for(request.selected_crop_ids)
 
         # Build crop_name map: {str(id): name}
-        crop_name_map: dict = {str(crop.id): crop.name for crop in db_crops}
-        job.crop_name_map = crop_name_map  # store for status endpoint
+        crop_name_map: dict = {str(crop.id): crop.name for crop in crops}
+        AnalysisJobStore.set_crop_names(job.job_id, crop_name_map)  # store for status endpoint
 
         context = AnalysisContext(
             environment=env_ctx,
@@ -329,28 +366,25 @@ async def start_analysis(request: FullAnalysisRequest, background_tasks: Backgro
             selected_crops=crop_contexts,
         )
 
+        mode = request.mode or ANALYSIS_MODE
+        if mode == "refine":
+            store_estimates(context, job.job_id)
+
         # Define background task
         async def process_analysis(job_id: str, ctx: AnalysisContext):
             try:
-                AnalysisJobStore.update_status(job_id, AnalysisStatus.PROCESSING_MODEL_1)
-                
-                # Run Model 1
-                m1_result = await run_model_1_only(ctx)
-                AnalysisJobStore.set_model_1_result(job_id, m1_result.model_dump())
-                
-                # Run Models 2-8 sequentially (returns Dict, not Pydantic model)
-                full_result = await run_sequential_remaining_models(ctx, m1_result, job_id)
-                # full_result is already stored + status set to COMPLETED inside orchestrator
-                
+                # Runs the 9-model DAG; each model result is stored as it completes
+                full_result = await run_analysis_job(ctx, job_id, mode=mode)
+                AnalysisJobStore.set_full_result(job_id, full_result)
+
             except Exception as e:
-                import traceback
-                print(f"Background analysis failed: {e}\n{traceback.format_exc()}")
+                logger.exception(f"[Job {job_id}] Background analysis failed: {e}")
                 AnalysisJobStore.set_error(job_id, str(e))
 
         # Start background task
         background_tasks.add_task(process_analysis, job.job_id, context)
 
-        return {"analysis_id": job.job_id, "status": "started"}
+        return {"analysis_id": job.job_id, "status": "started", "mode": mode}
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -366,7 +400,7 @@ def get_analysis_status(analysis_id: str):
     if not job:
         raise HTTPException(status_code=404, detail="Analysis not found")
     
-    crop_names = getattr(job, "crop_name_map", {})
+    crop_names = job.crop_names
 
     return {
         "analysis_id": job.job_id,
@@ -376,6 +410,7 @@ def get_analysis_status(analysis_id: str):
         "model_results": job.model_results,   # all per-model results keyed model_1..model_8
         "full_result": job.full_result,
         "crop_names": crop_names,              # {"51": "Wheat", "32": "Rice", ...}
+        "node_timings": job.node_timings,      # per-model start/duration (ms)
         "error": job.error
     }
 
@@ -385,7 +420,6 @@ def get_analysis_status(analysis_id: str):
 # These are the URLs the frontend actually calls.
 # ─────────────────────────────────────────────────────────────────────────────
 
-from datetime import datetime as dt
 
 # Status → model number mapping for JobProgress
 _STATUS_MODEL_MAP = {
@@ -432,7 +466,7 @@ _MODEL_EVIDENCE = [
 ]
 
 
-def _transform_full_result_to_final_decision(full_result: dict, db_crops_map: dict) -> dict:
+def _transform_full_result_to_final_decision(full_result: dict, crops_map: dict) -> dict:
     """
     Transform backend FullAnalysisResponse → frontend FinalDecision shape.
     
@@ -447,8 +481,8 @@ def _transform_full_result_to_final_decision(full_result: dict, db_crops_map: di
     alt_ids = fd.get("alternative_crop_ids", [])
     
     # Resolve crop names from DB map (int or str keys both work)
-    best_crop_name = db_crops_map.get(str(best_crop_id), db_crops_map.get(best_crop_id, f"Crop {best_crop_id}"))
-    alt_names = [db_crops_map.get(str(a), db_crops_map.get(a, f"Crop {a}")) for a in alt_ids]
+    best_crop_name = crops_map.get(str(best_crop_id), crops_map.get(best_crop_id, f"Crop {best_crop_id}"))
+    alt_names = [crops_map.get(str(a), crops_map.get(a, f"Crop {a}")) for a in alt_ids]
     
     # Confidence: 0-100 → "High" | "Medium" | "Low"
     conf_score = fd.get("confidence_score", 50)
@@ -496,6 +530,7 @@ def _transform_full_result_to_final_decision(full_result: dict, db_crops_map: di
             "score": avg_score,
             "summary": summary,
             "ui_state": ui_state,
+            "provenance": mdata.get("provenance"),
         })
     
     # Add Model 9 synthesis result
@@ -506,6 +541,7 @@ def _transform_full_result_to_final_decision(full_result: dict, db_crops_map: di
         "score": conf_score,
         "summary": fd.get("reasoning_summary", "Final decision synthesized."),
         "ui_state": "success" if conf_score >= 65 else "warning",
+        "provenance": fd.get("provenance"),
     })
     
     # Build score breakdown from decision matrix
@@ -529,7 +565,7 @@ def _transform_full_result_to_final_decision(full_result: dict, db_crops_map: di
     types = ["recommended", "gamble", "safe"]
     all_entries = list(dm.items())[:3]
     for idx, (cid, entry) in enumerate(all_entries):
-        cname = db_crops_map.get(str(cid), db_crops_map.get(int(cid) if str(cid).isdigit() else cid, f"Crop {cid}"))
+        cname = crops_map.get(str(cid), crops_map.get(int(cid) if str(cid).isdigit() else cid, f"Crop {cid}"))
         decision_matrix.append({
             "type": types[idx] if idx < len(types) else "safe",
             "title": cname,
@@ -557,6 +593,8 @@ async def submit_crop_job(request: FullAnalysisRequest, background_tasks: Backgr
     """
     Submit a crop analysis job. Returns immediately with a job_id.
     Frontend polls /api/crop-advisor/jobs/{job_id}/status for progress.
+    mode="refine" stores a numeric estimate for every model before returning
+    (also sent back as preliminary_result); LLM results then replace it.
     """
     try:
         # Validate location
@@ -564,18 +602,19 @@ async def submit_crop_job(request: FullAnalysisRequest, background_tasks: Backgr
         lon = request.location.get("lon")
         if lat is None or lon is None:
             raise HTTPException(status_code=422, detail="location must contain 'lat' and 'lon'")
+        mode = request.mode or ANALYSIS_MODE
 
         # Fetch env data upfront so background task can start immediately
         env_data = await EnvironmentalService.fetch_environmental_data(lat, lon)
         
         # Load selected crops
-        db_crops = db.query(Crop).filter(Crop.id.in_(request.selected_crop_ids)).all()
-        if not db_crops:
+        catalog = crop_catalog.snapshot()
+        crops = catalog.get_many(request.selected_crop_ids)
+        if not crops:
             raise HTTPException(status_code=404, detail=f"No crops found for IDs: {request.selected_crop_ids}")
         
         # Build crop name lookup for later response transformation
-        crops_name_map = {str(c.id): c.name for c in db_crops}
-        crops_name_map.update({c.id: c.name for c in db_crops})  # int keys too
+        crops_name_map = {str(c.id): c.name for c in crops}
         
         # Build analysis context
         env_ctx = EnvironmentContext(
@@ -590,6 +629,9 @@ async def submit_crop_job(request: FullAnalysisRequest, background_tasks: Backgr
             soil_moisture_percent=env_data.soil_moisture_index,
             gdd=env_data.gdd,
             humidity_percent=env_data.avg_humidity,
+            et0_mm_day=env_data.et0_mm_day,
+            daily_et0_mm=env_data.daily_et0_mm,
+            daily_rain_mm=env_data.daily_rain_mm,
         )
         user_ctx = UserContext(
             land_area=request.land_area,
@@ -597,51 +639,31 @@ async def submit_crop_job(request: FullAnalysisRequest, background_tasks: Backgr
             budget_per_acre=request.budget_per_acre,
             soil_type=request.soil_type,
         )
-        crop_contexts = [
-            CropContext(
-                id=crop.id,
-                name=crop.name,
-                season=crop.season or "Unknown",
-                min_temp=crop.min_temp or 15.0,
-                max_temp=crop.max_temp or 35.0,
-                min_rainfall=crop.min_rainfall or 300.0,
-                max_rainfall=crop.max_rainfall or 1200.0,
-                water_requirement_mm=crop.water_requirement_mm or 500.0,
-                soil_type=crop.soil_type or "Loamy",
-                duration_days=crop.duration_days or 120,
-                input_cost_per_acre=crop.input_cost_per_acre or 20000.0,
-                market_price_per_quintal=crop.market_price_per_quintal or 2000.0,
-                market_potential=crop.market_potential or "Medium",
-                yield_quintal_per_acre=crop.yield_quintal_per_acre or 15.0,
-                risk_factor=crop.risk_factor or "Medium",
-                perishability=crop.perishability or "Low",
-            )
-            for crop in db_crops
-        ]
+        crop_contexts = catalog.contexts_for(request.selected_crop_ids)
         context = AnalysisContext(environment=env_ctx, user=user_ctx, selected_crops=crop_contexts)
         
         # Create job
         job = AnalysisJobStore.create_job(request.dict())
         # Store crop name map on the job for status endpoint
-        job.crops_name_map = crops_name_map
+        AnalysisJobStore.set_crop_names(job.job_id, crops_name_map)
+
+        # Refine mode: a complete numeric answer is available before the LLM starts;
+        # transformed_result holds it until the final result overwrites it
+        preliminary = None
+        if mode == "refine":
+            estimate = store_estimates(context, job.job_id)
+            preliminary = _transform_full_result_to_final_decision(estimate, crops_name_map)
+            AnalysisJobStore.set_transformed_result(job.job_id, preliminary)
         
         # Background task: runs the 9-model pipeline
         async def _process(job_id: str, ctx: AnalysisContext, name_map: dict):
             try:
-                AnalysisJobStore.update_status(job_id, AnalysisStatus.PROCESSING_MODEL_1)
-                m1_result = await run_model_1_only(ctx)
-                AnalysisJobStore.set_model_1_result(job_id, m1_result.model_dump())
-                full_result = await run_sequential_remaining_models(ctx, m1_result, job_id)
+                raw = await run_analysis_job(ctx, job_id, mode=mode)
                 # Store already-transformed result so status endpoint is cheap
-                raw = full_result.model_dump()
                 transformed = _transform_full_result_to_final_decision(raw, name_map)
-                job_obj = AnalysisJobStore.get_job(job_id)
-                if job_obj:
-                    job_obj.transformed_result = transformed
-                AnalysisJobStore.set_full_result(job_id, raw)
+                AnalysisJobStore.set_full_result(job_id, raw, transformed_result=transformed)
             except Exception as e:
-                import traceback
-                print(f"[Job {job_id}] Analysis failed: {e}\n{traceback.format_exc()}")
+                logger.exception(f"[Job {job_id}] Analysis failed: {e}")
                 AnalysisJobStore.set_error(job_id, str(e))
         
         background_tasks.add_task(_process, job.job_id, context, crops_name_map)
@@ -649,7 +671,9 @@ async def submit_crop_job(request: FullAnalysisRequest, background_tasks: Backgr
         return {
             "job_id": job.job_id,
             "status": "pending",
-            "message": f"Analysis started for {len(db_crops)} crops. Poll /api/crop-advisor/jobs/{job.job_id}/status"
+            "mode": mode,
+            "preliminary_result": preliminary,
+            "message": f"Analysis started for {len(crops)} crops. Poll /api/crop-advisor/jobs/{job.job_id}/status"
         }
     
     except HTTPException:
@@ -658,64 +682,147 @@ async def submit_crop_job(request: FullAnalysisRequest, background_tasks: Backgr
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _frontend_status(job) -> str:
+    """Map AnalysisStatus to the JobStatus strings pipeline.ts understands."""
+    if job.status == AnalysisStatus.COMPLETED:
+        return "completed"
+    if job.status == AnalysisStatus.FAILED:
+        return "failed"
+    if job.status == AnalysisStatus.PENDING:
+        return "pending"
+    return "processing"
+
+
+def _job_progress(job) -> dict:
+    """Build the JobProgress payload shared by the status poll and the SSE stream."""
+    is_completed = job.status == AnalysisStatus.COMPLETED
+    current_model, message = _STATUS_MODEL_MAP.get(job.status, (0, "Processing..."))
+    percentage = int((current_model / _TOTAL_MODELS) * 100) if not is_completed else 100
+    return {
+        "current_model": current_model,
+        "total_models": _TOTAL_MODELS,
+        "message": message,
+        "percentage": percentage,
+        "completed_steps": job.completed_steps,
+        "node_timings": job.node_timings,
+    }
+
+
+def _job_result(job):
+    """FinalDecision-shaped result: pre-transformed if available, else transform on the fly."""
+    if job.status != AnalysisStatus.COMPLETED:
+        return None
+    if job.transformed_result:
+        return job.transformed_result
+    if job.full_result:
+        return _transform_full_result_to_final_decision(job.full_result, job.crop_names)
+    return None
+
+
+def _job_preliminary_result(job):
+    """Refine-mode numeric estimate (FinalDecision shape) while the LLM models still run."""
+    if job.status in TERMINAL_STATUSES:
+        return None
+    return job.transformed_result
+
+
 @router.get("/crop-advisor/jobs/{job_id}/status")
 def get_job_status(job_id: str):
     """
     Poll job status. Returns JobStatusResponse compatible with frontend pipeline.ts.
-    When status == 'completed', includes the FinalDecision-shaped result.
+    When status == 'completed', includes the FinalDecision-shaped result;
+    refine-mode jobs carry preliminary_result until then.
     """
     job = AnalysisJobStore.get_job(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    
-    raw_status = job.status
-    is_completed = raw_status == AnalysisStatus.COMPLETED
-    is_failed = raw_status == AnalysisStatus.FAILED
-    
-    # Map status to frontend-friendly string
-    if is_completed:
-        frontend_status = "completed"
-    elif is_failed:
-        frontend_status = "failed"
-    elif raw_status == AnalysisStatus.PENDING:
-        frontend_status = "pending"
-    else:
-        frontend_status = "processing"
-    
-    # Build JobProgress
-    current_model, message = _STATUS_MODEL_MAP.get(raw_status, (0, "Processing..."))
-    percentage = int((current_model / _TOTAL_MODELS) * 100) if not is_completed else 100
-    
-    progress = {
-        "current_model": current_model,
-        "total_models": _TOTAL_MODELS,
-        "message": message,
-        "percentage": percentage,
-        "completed_steps": job.completed_steps,
-    }
-    
-    # Result: use pre-transformed result if available, else transform on the fly
-    result = None
-    if is_completed:
-        if hasattr(job, 'transformed_result') and job.transformed_result:
-            result = job.transformed_result
-        elif job.full_result:
-            name_map = getattr(job, 'crops_name_map', {})
-            result = _transform_full_result_to_final_decision(job.full_result, name_map)
-    
-    created_iso = job.created_at.isoformat() if hasattr(job, 'created_at') else dt.now().isoformat()
-    
+
     return {
         "job_id": job.job_id,
-        "status": frontend_status,
-        "progress": progress,
-        "result": result,
+        "status": _frontend_status(job),
+        "progress": _job_progress(job),
+        "result": _job_result(job),
+        "preliminary_result": _job_preliminary_result(job),
         "error": job.error,
-        "created_at": created_iso,
-        "updated_at": dt.now().isoformat(),
+        "created_at": job.created_at.isoformat(),
+        "updated_at": job.updated_at.isoformat(),
     }
 
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _job_event_stream(job_id: str, request: Request):
+    """
+    Yield SSE events for a job until it completes or fails:
+      progress      JobProgress (sent whenever the status or step list changes)
+      preliminary   {"result": FinalDecision} refine-mode numeric estimate
+      model_result  {"model_key", "result"} as soon as each model finishes,
+                    again whenever an LLM result replaces an estimate
+      completed     {"result": FinalDecision}
+      failed        {"error": str}
+    Store notifications wake the stream; if none arrive within the heartbeat
+    interval (e.g. another worker runs the job) it re-checks the store anyway.
+    """
+    queue = AnalysisJobStore.subscribe(job_id)
+    sent_models: dict = {}
+    sent_preliminary = False
+    last_progress = None
+    try:
+        while True:
+            job = AnalysisJobStore.get_job(job_id)
+            if job is None:
+                yield _sse("failed", {"error": "Job not found"})
+                return
+
+            progress = _job_progress(job)
+            if progress != last_progress:
+                last_progress = progress
+                yield _sse("progress", progress)
+            preliminary = _job_preliminary_result(job)
+            if preliminary and not sent_preliminary:
+                sent_preliminary = True
+                yield _sse("preliminary", {"result": preliminary})
+            for model_key, result in sorted(job.model_results.items()):
+                if sent_models.get(model_key) != result:
+                    sent_models[model_key] = result
+                    yield _sse("model_result", {"model_key": model_key, "result": result})
+
+            if job.status == AnalysisStatus.COMPLETED:
+                yield _sse("completed", {"result": _job_result(job)})
+                return
+            if job.status == AnalysisStatus.FAILED:
+                yield _sse("failed", {"error": job.error or "Analysis failed"})
+                return
+
+            try:
+                await asyncio.wait_for(queue.get(), timeout=JOB_EVENTS_HEARTBEAT_SECONDS)
+                while not queue.empty():  # coalesce bursts into one re-read
+                    queue.get_nowait()
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield ": keepalive\n\n"
+    finally:
+        AnalysisJobStore.unsubscribe(job_id, queue)
+
+
+@router.get("/crop-advisor/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """
+    Server-Sent Events alternative to polling /status: pushes each model
+    result, progress change and the final decision as they happen.
+    """
+    if not AnalysisJobStore.get_job(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(
+        _job_event_stream(job_id, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/crop-advisor/jobs/{job_id}/result")
 def get_job_result(job_id: str):
     """
@@ -732,11 +839,10 @@ def get_job_result(job_id: str):
     if job.status != AnalysisStatus.COMPLETED:
         raise HTTPException(status_code=425, detail="Job still processing")
     
-    if hasattr(job, 'transformed_result') and job.transformed_result:
+    if job.transformed_result:
         return job.transformed_result
     
     if job.full_result:
-        name_map = getattr(job, 'crops_name_map', {})
-        return _transform_full_result_to_final_decision(job.full_result, name_map)
+        return _transform_full_result_to_final_decision(job.full_result, job.crop_names)
     
     raise HTTPException(status_code=500, detail="Result not available")
@@ -1,3 +1,4 @@
+import json
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -21,6 +22,43 @@ NASA_COMMUNITY = "AG"
 NASA_PARAMETERS = "T2M,T2M_MAX,T2M_MIN,PRECTOTCORR,ALLSKY_SFC_SW_DWN,WS2M,RH2M,GWETTOP"
 
 NASA_API_TOKEN = os.getenv("EXT_PUBLIC_NASA_EARTHDATA_TOKEN")
+NASA_TIMEOUT = float(os.getenv("NASA_TIMEOUT", "30"))
+
+# POWER meteorology is on the MERRA-2 grid (0.5° lat × 0.625° lon); requests are
+# snapped to the cell centre so every farm in a cell shares one fetch / cache entry.
+NASA_GRID_LAT_DEG = 0.5
+NASA_GRID_LON_DEG = 0.625
+NASA_CACHE_ENABLED = os.getenv("NASA_CACHE_ENABLED", "true").lower() == "true"
+NASA_CACHE_TTL_SECONDS = float(os.getenv("NASA_CACHE_TTL_SECONDS", str(24 * 3600)))
+NASA_CACHE_MAX_MEMORY_ENTRIES = int(os.getenv("NASA_CACHE_MAX_MEMORY_ENTRIES", "256"))
+NASA_CACHE_MAX_DISK_ENTRIES = int(os.getenv("NASA_CACHE_MAX_DISK_ENTRIES", "5000"))
+# Per-cell daily series (.npz): only dates not stored yet are requested from POWER
+NASA_SERIES_ENABLED = os.getenv("NASA_SERIES_ENABLED", "true").lower() == "true"
+NASA_SERIES_DIR = Path(os.getenv("NASA_SERIES_DIR", str(Path(__file__).parent / "power_series")))
+NASA_WINDOW_DAYS = int(os.getenv("NASA_WINDOW_DAYS", "180"))
+# Parallel POWER requests for the overnight warm-up (scripts/prefetch_environment.py)
+# and the per-cell fetches of /crop-advisor/prescreen/batch
+NASA_PREFETCH_CONCURRENCY = int(os.getenv("NASA_PREFETCH_CONCURRENCY", "4"))
+# Per-cell day-of-year baselines (scripts/prefetch_environment.py --climatology) behind climate_deviation
+CLIMATOLOGY_ENABLED = os.getenv("CLIMATOLOGY_ENABLED", "true").lower() == "true"
+CLIMATOLOGY_DIR = Path(os.getenv("CLIMATOLOGY_DIR", str(Path(__file__).parent / "climatology")))
+CLIMATOLOGY_YEARS = int(os.getenv("CLIMATOLOGY_YEARS", "10"))
+
+# Legacy /farm/analyze: candidate crops whose rule-based models run at the same time
+LEGACY_ANALYZE_CONCURRENCY = int(os.getenv("LEGACY_ANALYZE_CONCURRENCY", "8"))
+
+# /crop-advisor/prescreen/batch: farms per call (grouped by grid cell for NASA fetches)
+PRESCREEN_BATCH_MAX_FARMS = int(os.getenv("PRESCREEN_BATCH_MAX_FARMS", "200"))
+
+# Finished prescreen responses, keyed by quantized environment + farm profile + catalog version
+PRESCREEN_MEMO_ENABLED = os.getenv("PRESCREEN_MEMO_ENABLED", "true").lower() == "true"
+PRESCREEN_MEMO_MAX_ENTRIES = int(os.getenv("PRESCREEN_MEMO_MAX_ENTRIES", "2048"))
+
+# In-memory crop catalog (data/crop_catalog.py): seed / migration scripts bump the
+# integer in this file and running processes reload their snapshot on next access
+CROP_CATALOG_VERSION_FILE = Path(os.getenv(
+    "CROP_CATALOG_VERSION_FILE", str(Path(__file__).parent / "crop_catalog.version")
+))
 
 # OpenRouter LLM Configuration
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY", "")
@@ -36,12 +74,63 @@ OPENROUTER_MODEL_SYNTHESIS = os.getenv(
     "OPENROUTER_MODEL_SYNTHESIS",
     "meta-llama/llama-3.3-70b-instruct:free"
 )
+# Model 9 is computed locally; the LLM only phrases reasoning_summary when enabled
+MODEL9_LLM_SUMMARY = os.getenv("MODEL9_LLM_SUMMARY", "false").lower() == "true"
+# Model 3 (water balance): "numeric" = FAO-56 ET₀ × Kc engine, "hybrid" = numeric
+# figures handed to the LLM, "llm" = LLM only. Numeric modes need ET₀ in the context.
+MODEL3_MODE = os.getenv("MODEL3_MODE", "numeric").lower()
 # Legacy fallback (defaults to the small fast model)
 OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", OPENROUTER_MODEL_SMALL)
 
 OPENROUTER_TEMPERATURE = 0.6
 OPENROUTER_MAX_TOKENS = 500
 OPENROUTER_MAX_RETRIES = 5
+# A 429 asking us to wait longer than this gives up at once (LLMUnavailableError)
+OPENROUTER_MAX_429_WAIT_SECONDS = float(os.getenv("OPENROUTER_MAX_429_WAIT_SECONDS", "60"))
+
+# Shared HTTP connection pool for OpenRouter (owned by the FastAPI lifespan).
+# HTTP/2 is only enabled when the optional `h2` package is installed.
+OPENROUTER_TIMEOUT = float(os.getenv("OPENROUTER_TIMEOUT", "90"))
+OPENROUTER_MAX_CONNECTIONS = int(os.getenv("OPENROUTER_MAX_CONNECTIONS", "20"))
+OPENROUTER_MAX_KEEPALIVE = int(os.getenv("OPENROUTER_MAX_KEEPALIVE", "10"))
+OPENROUTER_KEEPALIVE_EXPIRY = float(os.getenv("OPENROUTER_KEEPALIVE_EXPIRY", "60"))
+OPENROUTER_HTTP2 = os.getenv("OPENROUTER_HTTP2", "true").lower() == "true"
+
+# Token-bucket rate limits shared by every call_llm request.
+# Keys: exact model id, provider prefix (e.g. "meta-llama") or "default".
+# rpm = requests/minute, tpm = tokens/minute (prompt + max_tokens), 0 = unlimited.
+# Override with LLM_RATE_LIMITS='{"default": {"rpm": 20, "tpm": 6000}}'.
+LLM_RATE_LIMITS = {
+    "default": {"rpm": 20, "tpm": 0},  # OpenRouter free tier: ~20 req/min
+    **json.loads(os.getenv("LLM_RATE_LIMITS", "{}")),
+}
+# Batch mode: Models 2–8 answered by ONE multi-section LLM call (per-model fallback)
+LLM_BATCH_MODE = os.getenv("LLM_BATCH_MODE", "false").lower() == "true"
+LLM_BATCH_MAX_TOKENS = int(os.getenv("LLM_BATCH_MAX_TOKENS", "2800"))
+# Upper bound on LLM model coroutines running at once (the buckets do the pacing)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+# "llm" = LLM models 1–8, "instant" = numeric estimates only (no LLM calls),
+# "refine" (jobs) = store the numeric estimate at once, then replace it model by model
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "llm").lower()
+# Swap in the numeric estimate for a model when the LLM is unavailable (402/429/no key)
+LLM_FALLBACK_ENABLED = os.getenv("LLM_FALLBACK_ENABLED", "true").lower() == "true"
+
+# Response cache (in-memory LRU + SQLite tier). Shared file, one namespace per cache
+# (LLM responses here, NASA POWER payloads via the NASA_CACHE_* settings above).
+CACHE_DB_PATH = Path(os.getenv("CACHE_DB_PATH", str(Path(__file__).parent / "response_cache.db")))
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(24 * 3600)))
+LLM_CACHE_MAX_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MAX_MEMORY_ENTRIES", "512"))
+LLM_CACHE_MAX_DISK_ENTRIES = int(os.getenv("LLM_CACHE_MAX_DISK_ENTRIES", "20000"))
+
+# Analysis job store: "sqlite" (shared by workers, survives restarts) or "memory"
+JOB_STORE_BACKEND = os.getenv("JOB_STORE_BACKEND", "sqlite").lower()
+JOB_STORE_DB_PATH = Path(os.getenv("JOB_STORE_DB_PATH", str(Path(__file__).parent / "analysis_jobs.db")))
+JOB_TTL_SECONDS = float(os.getenv("JOB_TTL_SECONDS", str(7 * 24 * 3600)))  # since last update
+JOB_HOT_CACHE_SIZE = int(os.getenv("JOB_HOT_CACHE_SIZE", "256"))
+JOB_PURGE_INTERVAL_SECONDS = float(os.getenv("JOB_PURGE_INTERVAL_SECONDS", "600"))
+# SSE job stream: keepalive comment + store re-check when no change notification arrives
+JOB_EVENTS_HEARTBEAT_SECONDS = float(os.getenv("JOB_EVENTS_HEARTBEAT_SECONDS", "5"))
 
 # Database Configuration (if we want to move it here later)
 # DATABASE_URL = "sqlite:///./agri_decision.db"
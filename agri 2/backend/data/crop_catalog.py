@@ -0,0 +1,218 @@
+"""
+Process-wide, immutable crop catalog snapshot.
+
+Crop metadata only changes when seed_crops.py or a migration runs, so the
+request paths read it from memory instead of SQLite:
+- CropRecord:      frozen, __slots__ copy of one Crop row (+ growth-stage Kc)
+- CatalogSnapshot: records in table order, id lookup, precomputed
+                   CropContext per crop and the compiled CropMatrix
+- CropCatalog:     holds the current snapshot; reloads it when the catalog
+                   version (an integer in CROP_CATALOG_VERSION_FILE) changes
+
+Writers call bump_catalog_version() after committing; readers only stat the
+version file (no database round-trip) until the version moves.
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy.orm import Session, selectinload
+
+from backend.config import CROP_CATALOG_VERSION_FILE
+from backend.models import Crop
+from backend.services.crop_matrix import CropMatrix
+from backend.services.models.schemas import CropContext
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class CropRecord:
+    id: int
+    name: str
+    season: Optional[str]
+    min_temp: Optional[float]
+    max_temp: Optional[float]
+    min_rainfall: Optional[float]
+    max_rainfall: Optional[float]
+    water_requirement_mm: Optional[float]
+    soil_type: Optional[str]
+    duration_days: Optional[int]
+    input_cost_per_acre: Optional[float]
+    market_price_per_quintal: Optional[float]
+    market_potential: Optional[str]
+    yield_quintal_per_acre: Optional[float]
+    risk_factor: Optional[str]
+    perishability: Optional[str]
+    base_temp_c: Optional[float]
+    kc_stages: Tuple[Tuple[int, int, float], ...] = ()  # (start_day, end_day, kc)
+
+    @classmethod
+    def from_orm(cls, crop: Crop) -> "CropRecord":
+        return cls(
+            id=crop.id,
+            name=crop.name,
+            season=crop.season,
+            min_temp=crop.min_temp,
+            max_temp=crop.max_temp,
+            min_rainfall=crop.min_rainfall,
+            max_rainfall=crop.max_rainfall,
+            water_requirement_mm=crop.water_requirement_mm,
+            soil_type=crop.soil_type,
+            duration_days=crop.duration_days,
+            input_cost_per_acre=crop.input_cost_per_acre,
+            market_price_per_quintal=crop.market_price_per_quintal,
+            market_potential=crop.market_potential,
+            yield_quintal_per_acre=crop.yield_quintal_per_acre,
+            risk_factor=crop.risk_factor,
+            perishability=crop.perishability,
+            base_temp_c=crop.base_temp_c,
+            kc_stages=tuple(
+                (s.start_day, s.end_day, s.kc_value)
+                for s in crop.growth_stages
+                if s.kc_value is not None and s.start_day is not None and s.end_day is not None
+            ),
+        )
+
+
+def crop_context(crop: CropRecord) -> CropContext:
+    """LLM-pipeline view of a crop, with defaults for missing agronomy fields."""
+    return CropContext(
+        id=crop.id,
+        name=crop.name,
+        season=crop.season or "Unknown",
+        min_temp=crop.min_temp or 15.0,
+        max_temp=crop.max_temp or 35.0,
+        min_rainfall=crop.min_rainfall or 300.0,
+        max_rainfall=crop.max_rainfall or 1200.0,
+        water_requirement_mm=crop.water_requirement_mm or 500.0,
+        soil_type=crop.soil_type or "Loamy",
+        duration_days=crop.duration_days or 120,
+        input_cost_per_acre=crop.input_cost_per_acre or 20000.0,
+        market_price_per_quintal=crop.market_price_per_quintal or 2000.0,
+        market_potential=crop.market_potential or "Medium",
+        yield_quintal_per_acre=crop.yield_quintal_per_acre or 15.0,
+        risk_factor=crop.risk_factor or "Medium",
+        perishability=crop.perishability or "Low",
+        kc_stages=[
+            {"start_day": start, "end_day": end, "kc": kc} for start, end, kc in crop.kc_stages
+        ] or None,
+    )
+
+
+class CatalogSnapshot:
+    """One immutable version of the catalog; safe to share across requests."""
+
+    __slots__ = ("version", "records", "by_id", "contexts", "matrix")
+
+    def __init__(self, version: int, records: Iterable[CropRecord]):
+        self.version = version
+        self.records: Tuple[CropRecord, ...] = tuple(records)
+        self.by_id: Mapping[int, CropRecord] = MappingProxyType({r.id: r for r in self.records})
+        self.contexts: Mapping[int, CropContext] = MappingProxyType(
+            {r.id: crop_context(r) for r in self.records}
+        )
+        self.matrix = CropMatrix.from_crops(list(self.records))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def get_many(self, crop_ids: Iterable) -> List[CropRecord]:
+        """Records for the given ids (int or numeric str), in catalog order."""
+        wanted = {int(i) for i in crop_ids}
+        return [r for r in self.records if r.id in wanted]
+
+    def contexts_for(self, crop_ids: Iterable) -> List[CropContext]:
+        # Copies, so a request can't mutate the shared snapshot
+        return [self.contexts[r.id].model_copy(deep=True) for r in self.get_many(crop_ids)]
+
+
+# ─── Version counter ─────────────────────────────────────────────────────────
+
+def read_catalog_version(path: Path = CROP_CATALOG_VERSION_FILE) -> int:
+    try:
+        return int(Path(path).read_text().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def bump_catalog_version(path: Path = CROP_CATALOG_VERSION_FILE) -> int:
+    """Mark the crop tables as changed; running processes reload on next access."""
+    path = Path(path)
+    version = read_catalog_version(path) + 1
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(str(version))
+    os.replace(tmp, path)
+    logger.info(f"[CropCatalog] Version bumped to {version}")
+    return version
+
+
+def load_records(db: Session) -> List[CropRecord]:
+    crops = db.query(Crop).options(selectinload(Crop.growth_stages)).order_by(Crop.id).all()
+    return [CropRecord.from_orm(c) for c in crops]
+
+
+# ─── Catalog ─────────────────────────────────────────────────────────────────
+
+class CropCatalog:
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        version_file: Path = CROP_CATALOG_VERSION_FILE,
+    ):
+        self._session_factory = session_factory
+        self.version_file = Path(version_file)
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._stamp: Optional[int] = None  # version file st_mtime_ns seen at load
+        self._lock = threading.Lock()
+
+    def _file_stamp(self) -> int:
+        try:
+            return self.version_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def _session(self) -> Session:
+        if self._session_factory is None:
+            from backend.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def load(self, db: Optional[Session] = None) -> CatalogSnapshot:
+        """(Re)build the snapshot from the database."""
+        with self._lock:
+            stamp = self._file_stamp()
+            version = read_catalog_version(self.version_file)
+            session = db or self._session()
+            try:
+                records = load_records(session)
+            finally:
+                if db is None:
+                    session.close()
+            self._snapshot = CatalogSnapshot(version, records)
+            self._stamp = stamp
+        logger.info(f"[CropCatalog] Loaded {len(records)} crops (version {version})")
+        return self._snapshot
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Current snapshot; reloads only if the version file changed."""
+        snapshot = self._snapshot
+        if snapshot is None or self._file_stamp() != self._stamp:
+            snapshot = self.load()
+        return snapshot
+
+    def set_records(self, records: Iterable[CropRecord], version: int = 0) -> CatalogSnapshot:
+        """Install records directly (tests, tooling) without a database."""
+        with self._lock:
+            self._snapshot = CatalogSnapshot(version, records)
+            self._stamp = self._file_stamp()
+        return self._snapshot
+
+
+crop_catalog = CropCatalog()
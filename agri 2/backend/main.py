@@ -1,8 +1,30 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from backend.api.routes import router as api_router
+from backend.services import openrouter_client
+from backend.data.crop_catalog import crop_catalog
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled OpenRouter client for the whole process — every call_llm
+    # reuses its keep-alive connections instead of re-handshaking.
+    app.state.llm_client = openrouter_client.open_client()
+    # Crop metadata is served from memory; request paths never query the crop tables.
+    try:
+        crop_catalog.load()
+    except Exception as e:
+        logger.warning(f"Crop catalog not loaded at startup (will retry on first use): {e}")
+    yield
+    await openrouter_client.close_client()
+
 
-app = FastAPI(title="Avishkar Crop Decision Intelligence System", version="1.0")
+app = FastAPI(title="Avishkar Crop Decision Intelligence System", version="1.0", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -82,6 +82,10 @@ class EnvironmentalData(BaseModel):
     rainfall_stability: Optional[float] = 0.0 # 1/CV
     climate_deviation: Optional[float] = 0.0 # % deviation from 10-year avg
     soil_moisture_estimate: Optional[float] = 0.0 # mm
+    et0_mm_day: Optional[float] = None # FAO-56 reference ET, window mean
+    # Daily series for the numeric water balance (internal, not serialized)
+    daily_et0_mm: Optional[List[float]] = Field(default=None, exclude=True)
+    daily_rain_mm: Optional[List[float]] = Field(default=None, exclude=True)
 
 
 # 3.7 Model Structure
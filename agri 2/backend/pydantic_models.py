@@ -89,6 +89,9 @@ class PrescreenRequest(BaseModel):
     water_availability: WaterAvailability
     budget_per_acre: float
     soil_type: Optional[str] = None  # e.g. "Black", "Loamy", "Red"
+    # Paging over ranked candidates; limit=None returns every viable crop
+    limit: Optional[int] = Field(None, ge=1)
+    offset: int = Field(0, ge=0)
 
 class CropCandidate(BaseModel):
     id: str
@@ -118,3 +121,14 @@ class PrescreenResponse(BaseModel):
     recommended_top_ids: List[str]
     current_season: str
     environmental_summary: Dict[str, Any]
+    total_candidates: int = 0       # viable crops before paging
+    offset: int = 0
+    limit: Optional[int] = None
+
+class BatchPrescreenRequest(BaseModel):
+    farms: List[PrescreenRequest]
+
+class BatchPrescreenResponse(BaseModel):
+    results: List[Optional[PrescreenResponse]]  # same order as request.farms; None on error
+    errors: Dict[int, str] = {}                 # farm index -> error message
+    cells: int                                  # distinct NASA grid cells fetched
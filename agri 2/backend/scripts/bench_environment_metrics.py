@@ -0,0 +1,186 @@
+"""
+Benchmark: dict-based environmental metrics vs the vectorized NumPy version.
+
+`legacy_environmental_data` is the original per-day dict implementation of
+NASAService.get_environmental_data, kept here as the reference. Synthetic
+series (with realistic gaps) are run through both; outputs are checked for
+equality before anything is timed.
+
+Usage:
+  python backend/scripts/bench_environment_metrics.py
+  python backend/scripts/bench_environment_metrics.py --cells 2000 --days 1825
+"""
+import argparse
+import statistics
+import sys
+import time
+from datetime import date
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+import numpy as np
+
+from backend.models import EnvironmentalData
+from backend.services.environment_metrics import compute_environmental_data
+from backend.services.power_series_store import CellSeries
+
+PARAMETERS = ["T2M", "T2M_MIN", "T2M_MAX", "PRECTOTCORR", "RH2M", "GWETTOP"]
+
+
+# ─── Reference implementation ─────────────────────────────────────────────────
+
+def calculate_cv(values: List[float]) -> float:
+    valid_values = [v for v in values if v >= 0]
+    if not valid_values or len(valid_values) < 2:
+        return 0.0
+    mean = statistics.mean(valid_values)
+    if mean == 0:
+        return 100.0
+    stdev = statistics.stdev(valid_values)
+    return min((stdev / mean) * 100, 100.0)
+
+
+def aggregate_monthly(daily_data: Dict[str, float]) -> List[float]:
+    monthly: Dict[str, float] = {}
+    for date_str, value in daily_data.items():
+        if not isinstance(value, (int, float)) or value < 0:
+            continue
+        monthly[date_str[:6]] = monthly.get(date_str[:6], 0.0) + value
+    return list(monthly.values())
+
+
+def legacy_environmental_data(params: Dict[str, Dict[str, float]]) -> EnvironmentalData:
+    """Original loop-over-dicts metrics on a POWER {parameter: {YYYYMMDD: value}} payload."""
+    t2m = params.get("T2M", {})
+    t2m_min = params.get("T2M_MIN", {})
+    t2m_max = params.get("T2M_MAX", {})
+    precip = params.get("PRECTOTCORR", {})
+    gwettop = params.get("GWETTOP", {})
+    rh2m = params.get("RH2M", {})
+
+    def get_valid_values(d: dict, min_val: float = -900) -> List[float]:
+        return [v for v in d.values() if isinstance(v, (int, float)) and v > min_val]
+
+    t2m_values = get_valid_values(t2m)
+    t2m_min_values = get_valid_values(t2m_min)
+    t2m_max_values = get_valid_values(t2m_max)
+    precip_values = get_valid_values(precip, min_val=0)
+    gwettop_values = get_valid_values(gwettop, min_val=0)
+    rh2m_values = get_valid_values(rh2m, min_val=0)
+
+    if not t2m_values:
+        raise ValueError("No valid temperature data received from NASA")
+
+    avg_temp = statistics.mean(t2m_values)
+    min_temp_avg = statistics.mean(t2m_min_values) if t2m_min_values else avg_temp - 5
+    max_temp_avg = statistics.mean(t2m_max_values) if t2m_max_values else avg_temp + 5
+    avg_humidity = statistics.mean(rh2m_values) if rh2m_values else 0.0
+    rainfall_total = sum(precip_values)
+
+    cv = calculate_cv(aggregate_monthly(precip))
+    rainfall_stability = (100.0 / cv) if cv > 1.0 else 100.0
+
+    heat_stress_days = sum(1 for v in t2m_max_values if v > 35)
+    cold_stress_days = sum(1 for v in t2m_min_values if v < 10)
+
+    gdd_total = 0.0
+    for k in sorted(t2m.keys()):
+        tmax = t2m_max.get(k, -999)
+        tmin = t2m_min.get(k, -999)
+        if tmax > -900 and tmin > -900:
+            gdd_total += max(0, ((tmax + tmin) / 2) - 10.0)
+
+    dry_spell_days = 0
+    current_dry_sequence = 0
+    for k in sorted(precip.keys()):
+        val = precip.get(k, -999)
+        if val > -0.1 and val < 2.5:
+            current_dry_sequence += 1
+        else:
+            dry_spell_days = max(dry_spell_days, current_dry_sequence)
+            current_dry_sequence = 0
+    dry_spell_days = max(dry_spell_days, current_dry_sequence)
+
+    if gwettop_values:
+        soil_moisture_index = statistics.mean(gwettop_values)
+    else:
+        estimated_val = max(0, rainfall_total * 0.7 - (avg_temp * 5))
+        soil_moisture_index = min(1.0, estimated_val / 500.0)
+
+    return EnvironmentalData(
+        avg_temp=round(avg_temp, 2),
+        min_temp=round(min_temp_avg, 2),
+        max_temp=round(max_temp_avg, 2),
+        rainfall_total=round(rainfall_total, 2),
+        rainfall_variability=round(cv, 2),
+        rainfall_stability=round(rainfall_stability, 2),
+        soil_moisture_index=round(soil_moisture_index, 2),
+        soil_moisture_estimate=round(soil_moisture_index * 100, 2),
+        avg_humidity=round(avg_humidity, 2),
+        gdd=round(gdd_total, 2),
+        forecast_rain_next_14_days=None,
+        heat_stress_days=heat_stress_days,
+        cold_stress_days=cold_stress_days,
+        dry_spell_days=dry_spell_days,
+        climate_deviation=0.0,
+    )
+
+
+# ─── Synthetic data ───────────────────────────────────────────────────────────
+
+def synthetic_series(rng: np.random.Generator, days: int, first_day: date = date(2020, 1, 1)) -> CellSeries:
+    """Plausible daily weather for one cell with ~2% random gaps per parameter."""
+    t = np.arange(days)
+    season = np.sin(2 * np.pi * t / 365.25)
+    t2m = 24 + 8 * season + rng.normal(0, 2, days)
+    rain = np.where(rng.random(days) < 0.35, rng.gamma(1.2, 8.0, days), 0.0)
+    values = {
+        "T2M": t2m,
+        "T2M_MIN": t2m - 6 + rng.normal(0, 1, days),
+        "T2M_MAX": t2m + 7 + rng.normal(0, 1, days),
+        "PRECTOTCORR": rain,
+        "RH2M": np.clip(60 + 20 * season + rng.normal(0, 5, days), 5, 100),
+        "GWETTOP": np.clip(0.4 + 0.2 * season + rng.normal(0, 0.05, days), 0.01, 1),
+    }
+    for name, column in values.items():
+        column = column.astype(np.float32)
+        column[rng.random(days) < 0.02] = np.nan
+        values[name] = column
+    return CellSeries(first_day, values, elevation=300.0)
+
+
+# ─── Main ─────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--cells", type=int, default=500, help="number of synthetic grid cells")
+    parser.add_argument("--days", type=int, default=180, help="days per cell window")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    series = [synthetic_series(rng, args.days) for _ in range(args.cells)]
+    payloads = [s.to_power_parameters() for s in series]
+
+    for s, payload in zip(series, payloads):
+        assert compute_environmental_data(s) == legacy_environmental_data(payload), "outputs differ"
+    print(f"Outputs identical for {args.cells} cells × {args.days} days")
+
+    t0 = time.perf_counter()
+    for payload in payloads:
+        legacy_environmental_data(payload)
+    legacy_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for s in series:
+        compute_environmental_data(s)
+    vector_s = time.perf_counter() - t0
+
+    print(f"  dict loops : {legacy_s * 1000:8.1f} ms  ({legacy_s / args.cells * 1e6:7.1f} µs/cell)")
+    print(f"  numpy      : {vector_s * 1000:8.1f} ms  ({vector_s / args.cells * 1e6:7.1f} µs/cell)")
+    print(f"  speed-up   : {legacy_s / vector_s:.1f}×")
+
+
+if __name__ == "__main__":
+    main()
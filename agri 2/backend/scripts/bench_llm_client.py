@@ -0,0 +1,100 @@
+"""
+Benchmark: fresh httpx client per call vs the shared pooled client.
+
+Starts a local stand-in OpenRouter server (FastAPI + uvicorn on 127.0.0.1),
+points call_llm at it and fires the same sustained load both ways. The
+stand-in counts distinct client sockets so the saved connection setups are
+visible next to the latency numbers.
+
+Usage:
+  python backend/scripts/bench_llm_client.py
+  python backend/scripts/bench_llm_client.py --jobs 20 --concurrency 4
+"""
+import argparse
+import asyncio
+import json
+import socket
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+
+import backend.config as cfg
+from backend.services import openrouter_client
+from backend.services.rate_limiter import LLMRateLimiter
+
+MODELS_PER_JOB = 9  # Models 1–8 + Model 9
+
+stand_in = FastAPI()
+_seen_sockets: set = set()
+
+
+@stand_in.post("/api/v1/chat/completions")
+async def fake_completion(request: Request):
+    _seen_sockets.add((request.client.host, request.client.port))
+    body = await request.json()
+    content = json.dumps({"model_name": body["model"], "crop_scores": {"1": 70}})
+    return {"choices": [{"message": {"content": content}}]}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _run_load(jobs: int, concurrency: int, pooled: bool) -> float:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one_call():
+        async with sem:
+            if pooled:
+                await openrouter_client.call_llm("system", "user", use_cache=False)
+            else:
+                # Pre-pool behaviour: a brand new client (and TCP connection) per call
+                async with httpx.AsyncClient(timeout=90.0) as client:
+                    await openrouter_client.call_llm("system", "user", client=client, use_cache=False)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one_call() for _ in range(jobs * MODELS_PER_JOB)))
+    return time.perf_counter() - t0
+
+
+async def main(jobs: int, concurrency: int):
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(stand_in, host="127.0.0.1", port=port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    cfg.OPENROUTER_BASE_URL = f"http://127.0.0.1:{port}/api/v1/chat/completions"
+    cfg.OPENROUTER_API_KEY = "sk-or-bench"
+    # Measure connection cost only: no quota pacing, no cached/coalesced answers
+    openrouter_client.rate_limiter = LLMRateLimiter({"default": {"rpm": 0, "tpm": 0}})
+    calls = jobs * MODELS_PER_JOB
+
+    try:
+        for label, pooled in (("fresh client per call", False), ("shared pooled client", True)):
+            _seen_sockets.clear()
+            elapsed = await _run_load(jobs, concurrency, pooled)
+            print(
+                f"{label:<24} {calls} calls in {elapsed * 1000:7.0f}ms  "
+                f"({elapsed / calls * 1000:5.2f}ms/call, {len(_seen_sockets)} connections opened)"
+            )
+    finally:
+        await openrouter_client.close_client()
+        server.should_exit = True
+        await server_task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=10, help="simulated analysis jobs")
+    parser.add_argument("--concurrency", type=int, default=4, help="in-flight calls")
+    args = parser.parse_args()
+    asyncio.run(main(args.jobs, args.concurrency))
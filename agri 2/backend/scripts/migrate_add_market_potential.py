@@ -5,11 +5,13 @@ sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
 
 from sqlalchemy import text
 from backend.database import engine
+from backend.data.crop_catalog import bump_catalog_version
 
 with engine.connect() as conn:
     try:
         conn.execute(text('ALTER TABLE crops ADD COLUMN market_potential VARCHAR DEFAULT "Medium"'))
         conn.commit()
+        bump_catalog_version()
         print("Column market_potential added successfully.")
     except Exception as e:
         if "duplicate column" in str(e).lower() or "already exists" in str(e).lower():
@@ -0,0 +1,92 @@
+"""
+Warm the NASA POWER series store for a set of locations (run overnight).
+
+Locations are reduced to distinct POWER grid cells and fetched with bounded
+concurrency; afterwards every farm in those cells is served from local data.
+With --climatology the same cells get their multi-year day-of-year baselines
+(used for climate_deviation) built instead.
+
+Usage:
+  python backend/scripts/prefetch_environment.py --points "19.07,72.88;18.52,73.85"
+  python backend/scripts/prefetch_environment.py --points-file farms.csv   # lat,lon per line
+  python backend/scripts/prefetch_environment.py --bbox 18.0,72.5,20.0,75.0
+  python backend/scripts/prefetch_environment.py --geojson pune_district.geojson --concurrency 8
+  python backend/scripts/prefetch_environment.py --bbox 18.0,72.5,20.0,75.0 --climatology --years 15
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from backend.services.environment_prefetch import (
+    build_climatologies, cells_for_bbox, cells_for_geojson, cells_for_points, prefetch_cells,
+)
+
+
+def _parse_points(text: str) -> List[Tuple[float, float]]:
+    points = []
+    for pair in filter(None, (p.strip() for p in text.split(";"))):
+        lat, lon = (float(v) for v in pair.split(","))
+        points.append((lat, lon))
+    return points
+
+
+def _read_points_file(path: Path) -> List[Tuple[float, float]]:
+    points = []
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            try:
+                points.append((float(row[0]), float(row[1])))
+            except (ValueError, IndexError):
+                continue  # header or malformed line
+    return points
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--points", help='"lat,lon;lat,lon;..."')
+    source.add_argument("--points-file", type=Path, help="CSV with lat,lon columns")
+    source.add_argument("--bbox", help="min_lat,min_lon,max_lat,max_lon")
+    source.add_argument("--geojson", type=Path, help="Polygon / MultiPolygon / Feature(Collection) file")
+    parser.add_argument("--concurrency", type=int, default=None, help="parallel POWER requests")
+    parser.add_argument("--climatology", action="store_true", help="build multi-year baselines")
+    parser.add_argument("--years", type=int, default=None, help="baseline length (default CLIMATOLOGY_YEARS)")
+    parser.add_argument("--dry-run", action="store_true", help="list the cells without fetching")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.points:
+        cells = cells_for_points(_parse_points(args.points))
+    elif args.points_file:
+        cells = cells_for_points(_read_points_file(args.points_file))
+    elif args.bbox:
+        cells = cells_for_bbox(*(float(v) for v in args.bbox.split(",")))
+    else:
+        cells = cells_for_geojson(json.loads(args.geojson.read_text()))
+
+    print(f"{len(cells)} POWER grid cells to warm")
+    if args.dry_run:
+        for lat, lon in cells:
+            print(f"  {lat:.4f},{lon:.4f}")
+        return
+
+    if args.climatology:
+        report = asyncio.run(build_climatologies(cells, years=args.years, concurrency=args.concurrency))
+    else:
+        report = asyncio.run(prefetch_cells(cells, concurrency=args.concurrency))
+    print(report.summary())
+    for cell, error in report.failed.items():
+        print(f"  FAILED {cell}: {error}")
+    sys.exit(1 if report.failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ from sqlalchemy.orm import Session
 from backend.database import SessionLocal, engine, Base
 from backend.models import Crop as CropDB
 from backend.data.crops import CROP_DATABASE
+from backend.data.crop_catalog import bump_catalog_version
 
 
 def seed_crops():
@@ -127,7 +128,8 @@ def seed_crops():
                 added_count += 1
         
         db.commit()
-        print(f"Seeding complete. Added: {added_count}, Updated: {updated_count}")
+        version = bump_catalog_version()
+        print(f"Seeding complete. Added: {added_count}, Updated: {updated_count} (catalog version {version})")
         
     except Exception as e:
         print(f"Error seeding database: {e}")
@@ -1,12 +1,31 @@
 """
 Analysis Job Store
 Stores the state of running analyses.
+
+- Jobs persist through a pluggable JobStoreBackend (SQLite in WAL mode by
+  default, see config.JOB_STORE_BACKEND), so every uvicorn worker sees the
+  same jobs and they survive restarts
+- A bounded LRU hot cache keeps recently used jobs in memory; finished jobs
+  are served from it, running jobs are re-read since another worker may own them
+- Jobs expire JOB_TTL_SECONDS after their last update and are purged
+  periodically, keeping both the DB and worker RSS bounded
+- subscribe() hands out an asyncio.Queue that receives the job_id on every
+  change (status, model result, completion, error) — feeds the SSE endpoint
 """
-from typing import Dict, Any, Optional
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 from enum import Enum
 from datetime import datetime
 import uuid
 
+import backend.config as cfg
+from backend.services.job_store_backend import (
+    JobStoreBackend, MemoryJobBackend, SQLiteJobBackend, apply_changes,
+)
+
 class AnalysisStatus(str, Enum):
     PENDING = "pending"
     PROCESSING_MODEL_1 = "processing_model_1"
@@ -22,65 +41,194 @@ class AnalysisStatus(str, Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
+TERMINAL_STATUSES = (AnalysisStatus.COMPLETED, AnalysisStatus.FAILED)
+
 class AnalysisJob:
     def __init__(self, request_data: Dict[str, Any]):
         self.job_id = str(uuid.uuid4())
         self.status = AnalysisStatus.PENDING
         self.request_data = request_data
         self.created_at = datetime.now()
+        self.updated_at = self.created_at
         self.model_1_result: Optional[Dict[str, Any]] = None
         self.full_result: Optional[Dict[str, Any]] = None
+        # FinalDecision-shaped result for the /jobs endpoints (computed once);
+        # refine-mode jobs hold the numeric estimate here until they complete
+        self.transformed_result: Optional[Dict[str, Any]] = None
         self.completed_steps: list[str] = []  # Track completed model names
         self.error: Optional[str] = None
         # Per-model results: keyed "model_1" .. "model_9", populated as each model finishes
         self.model_results: Dict[str, Any] = {}
+        # Per-DAG-node timing: {"model_3": {"start_ms": ..., "duration_ms": ...}}
+        self.node_timings: Dict[str, Dict[str, float]] = {}
+        # {"51": "Wheat", ...} so status endpoints can show real crop names
+        self.crop_names: Dict[str, str] = {}
 
 class AnalysisJobStore:
-    _jobs: Dict[str, AnalysisJob] = {}
+    _backend: Optional[JobStoreBackend] = None
+    _hot: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+    _lock = threading.RLock()
+    _last_purge = 0.0
+    # job_id -> [(event loop, queue)]; writes may come from worker threads
+    _subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+
+    # ─── Backend / cache plumbing ─────────────────────────────────────────────
+    @classmethod
+    def configure(cls, backend: Optional[JobStoreBackend] = None):
+        """Swap the storage backend (None = rebuild from config); clears the hot cache."""
+        with cls._lock:
+            cls._backend = backend
+            cls._hot = OrderedDict()
+            cls._last_purge = time.time()
+
+    @classmethod
+    def _get_backend(cls) -> JobStoreBackend:
+        if cls._backend is None:
+            if cfg.JOB_STORE_BACKEND == "memory":
+                cls._backend = MemoryJobBackend()
+            else:
+                cls._backend = SQLiteJobBackend(cfg.JOB_STORE_DB_PATH)
+        return cls._backend
+
+    @classmethod
+    def _remember(cls, job: AnalysisJob):
+        cls._hot[job.job_id] = job
+        cls._hot.move_to_end(job.job_id)
+        while len(cls._hot) > cfg.JOB_HOT_CACHE_SIZE:
+            cls._hot.popitem(last=False)
+
+    @classmethod
+    def _update(cls, job_id: str, **changes: Any):
+        """Apply `changes` to the job in memory and write just those fields through."""
+        with cls._lock:
+            job = cls._hot.get(job_id) or cls._get_backend().load(job_id)
+            if job is None:
+                return
+            changes["updated_at"] = datetime.now()
+            apply_changes(job, changes)
+            cls._remember(job)
+            cls._get_backend().update(job_id, changes, time.time() + cfg.JOB_TTL_SECONDS)
+        cls._notify(job_id)
+
+    # ─── Change notifications ─────────────────────────────────────────────────
+    @classmethod
+    def subscribe(cls, job_id: str) -> asyncio.Queue:
+        """Queue that receives `job_id` after every change to the job (call from a coroutine)."""
+        queue: asyncio.Queue = asyncio.Queue()
+        with cls._lock:
+            cls._subscribers.setdefault(job_id, []).append((asyncio.get_running_loop(), queue))
+        return queue
+
+    @classmethod
+    def unsubscribe(cls, job_id: str, queue: asyncio.Queue):
+        with cls._lock:
+            remaining = [(loop, q) for loop, q in cls._subscribers.get(job_id, []) if q is not queue]
+            if remaining:
+                cls._subscribers[job_id] = remaining
+            else:
+                cls._subscribers.pop(job_id, None)
+
+    @classmethod
+    def _notify(cls, job_id: str):
+        with cls._lock:
+            subscribers = list(cls._subscribers.get(job_id, []))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, job_id)
+            except RuntimeError:  # subscriber's loop already closed
+                cls.unsubscribe(job_id, queue)
 
+    @classmethod
+    def purge_expired(cls) -> int:
+        """Drop expired jobs from the backend and the hot cache."""
+        now = time.time()
+        with cls._lock:
+            cls._last_purge = now
+            cutoff = now - cfg.JOB_TTL_SECONDS
+            for job_id in [j for j, job in cls._hot.items() if job.updated_at.timestamp() <= cutoff]:
+                del cls._hot[job_id]
+            return cls._get_backend().purge_expired(now)
+
+    # ─── Public API ───────────────────────────────────────────────────────────
     @classmethod
     def create_job(cls, request_data: Dict[str, Any]) -> AnalysisJob:
+        if time.time() - cls._last_purge > cfg.JOB_PURGE_INTERVAL_SECONDS:
+            cls.purge_expired()
         job = AnalysisJob(request_data)
-        cls._jobs[job.job_id] = job
+        with cls._lock:
+            cls._get_backend().insert(job, time.time() + cfg.JOB_TTL_SECONDS)
+            cls._remember(job)
         return job
 
     @classmethod
     def get_job(cls, job_id: str) -> Optional[AnalysisJob]:
-        return cls._jobs.get(job_id)
+        with cls._lock:
+            cached = cls._hot.get(job_id)
+            if cached is not None and cached.status in TERMINAL_STATUSES:
+                cls._hot.move_to_end(job_id)
+                return cached
+
+            # Running (or unknown) job: the row may have been advanced by another worker
+            fresh = cls._get_backend().load(job_id)
+            if fresh is None:
+                cls._hot.pop(job_id, None)
+                return None
+            if cached is not None and cached is not fresh:
+                cached.__dict__.update(fresh.__dict__)  # keep object identity for holders
+                fresh = cached
+            cls._remember(fresh)
+            return fresh
 
     @classmethod
     def update_status(cls, job_id: str, status: AnalysisStatus):
-        if job_id in cls._jobs:
-            cls._jobs[job_id].status = status
+        cls._update(job_id, status=status)
 
     @classmethod
     def add_completed_step(cls, job_id: str, step_name: str):
-        if job_id in cls._jobs:
-            cls._jobs[job_id].completed_steps.append(step_name)
+        job = cls.get_job(job_id)
+        if job:
+            cls._update(job_id, completed_steps=[*job.completed_steps, step_name])
 
     @classmethod
     def set_model_result(cls, job_id: str, model_key: str, result: Dict[str, Any]):
         """Store an individual model's result. e.g. model_key='model_1'"""
-        if job_id in cls._jobs:
-            cls._jobs[job_id].model_results[model_key] = result
+        cls._update(job_id, **{model_key: result})
+
+    @classmethod
+    def set_model_results(cls, job_id: str, results: Dict[str, Dict[str, Any]]):
+        """Store several model results in one write, e.g. a refine-mode estimate."""
+        cls._update(job_id, **results)
+
+    @classmethod
+    def set_node_timing(cls, job_id: str, node_key: str, timing: Dict[str, float]):
+        job = cls.get_job(job_id)
+        if job:
+            cls._update(job_id, node_timings={**job.node_timings, node_key: timing})
+
+    @classmethod
+    def set_crop_names(cls, job_id: str, crop_names: Dict[str, str]):
+        cls._update(job_id, crop_names={str(k): v for k, v in crop_names.items()})
+
+    @classmethod
+    def set_transformed_result(cls, job_id: str, result: Dict[str, Any]):
+        cls._update(job_id, transformed_result=result)
 
     @classmethod
     def set_model_1_result(cls, job_id: str, result: Dict[str, Any]):
-        if job_id in cls._jobs:
-            cls._jobs[job_id].model_1_result = result
-            cls._jobs[job_id].status = AnalysisStatus.MODEL_1_COMPLETED
-            cls.add_completed_step(job_id, "Rainfall Analysis")
-            # Also store in unified model_results for frontend progressive access
-            cls.set_model_result(job_id, "model_1", result)
+        cls._update(job_id, model_1_result=result, status=AnalysisStatus.MODEL_1_COMPLETED)
+        cls.add_completed_step(job_id, "Rainfall Analysis")
+        # Also store in unified model_results for frontend progressive access
+        cls.set_model_result(job_id, "model_1", result)
 
     @classmethod
-    def set_full_result(cls, job_id: str, result: Dict[str, Any]):
-        if job_id in cls._jobs:
-            cls._jobs[job_id].full_result = result
-            cls._jobs[job_id].status = AnalysisStatus.COMPLETED
+    def set_full_result(cls, job_id: str, result: Dict[str, Any],
+                        transformed_result: Optional[Dict[str, Any]] = None):
+        changes: Dict[str, Any] = {"full_result": result, "status": AnalysisStatus.COMPLETED}
+        if transformed_result is not None:
+            # Same write as the status, so readers never see a final result as preliminary
+            changes["transformed_result"] = transformed_result
+        cls._update(job_id, **changes)
 
     @classmethod
     def set_error(cls, job_id: str, error: str):
-        if job_id in cls._jobs:
-            cls._jobs[job_id].error = error
-            cls._jobs[job_id].status = AnalysisStatus.FAILED
+        cls._update(job_id, error=error, status=AnalysisStatus.FAILED)
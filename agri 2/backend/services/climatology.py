@@ -0,0 +1,199 @@
+"""
+Multi-year per-cell climatology baselines for `climate_deviation`.
+
+Built offline (scripts/prefetch_environment.py --climatology) from 10+ years of POWER daily
+data, stored as one memory-mapped float32 array plus a small JSON index:
+
+  climatology.<version>.npy  (cells × 366 day-of-year × parameters × stats)
+  climatology_index.json     {"array": "climatology.<version>.npy",
+                              "cells": {"19.0000,73.1250": row, ...}, "years": [...], ...}
+
+- Each build writes a new versioned array and then swaps the index, so the
+  array a worker has memory-mapped is never replaced underneath it (Windows
+  refuses to replace a mapped file); superseded arrays are removed once unmapped
+
+- Day-of-year uses a leap-year calendar (Feb 29 = slot 59) so every date
+  maps to the same slot in every year
+- Each slot pools a ±7 day window across all years, so 10 years give ~150
+  samples per percentile instead of 10
+- Stats per parameter: mean, p10, p50, p90 and the running sum of the daily
+  mean over the year, so the expected total for any date window is two
+  lookups — request-time deviation is O(1) regardless of window length
+"""
+
+import json
+import logging
+import os
+import time
+import warnings
+from datetime import date
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from backend.services.power_series_store import CellSeries
+
+logger = logging.getLogger(__name__)
+
+Cell = Tuple[float, float]
+
+CLIMATOLOGY_PARAMETERS = ["T2M", "PRECTOTCORR"]
+STATS = ["mean", "p10", "p50", "p90", "cum_mean"]
+DAYS_IN_YEAR = 366
+FEB_29 = 59
+WINDOW_HALF_WIDTH = 7
+
+
+def day_of_year_index(first_day: date, n_days: int) -> np.ndarray:
+    """0..365 slot for each day from first_day, on a leap-year calendar."""
+    days = np.datetime64(first_day, "D") + np.arange(n_days)
+    years = days.astype("datetime64[Y]")
+    doy = (days - years).astype(np.int64)
+    year_numbers = years.astype(np.int64) + 1970
+    leap = (year_numbers % 4 == 0) & ((year_numbers % 100 != 0) | (year_numbers % 400 == 0))
+    return doy + ((~leap) & (doy >= FEB_29))
+
+
+def build_cell_climatology(series: CellSeries, half_width: int = WINDOW_HALF_WIDTH) -> np.ndarray:
+    """(366, parameters, stats) baseline for one cell from a multi-year daily series."""
+    slots = day_of_year_index(series.first_day, series.n_days)
+    # Circular distance between every target slot and every observed day's slot
+    distance = np.abs(np.arange(DAYS_IN_YEAR)[:, None] - slots[None, :])
+    in_window = np.minimum(distance, DAYS_IN_YEAR - distance) <= half_width
+
+    out = np.full((DAYS_IN_YEAR, len(CLIMATOLOGY_PARAMETERS), len(STATS)), np.nan, dtype=np.float32)
+    for p, name in enumerate(CLIMATOLOGY_PARAMETERS):
+        values = series.values[name].astype(np.float64)
+        pooled = np.where(in_window, values[None, :], np.nan)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # slots with no samples -> NaN
+            out[:, p, 0] = np.nanmean(pooled, axis=1)
+            out[:, p, 1:4] = np.nanpercentile(pooled, [10, 50, 90], axis=1).T
+        out[:, p, 4] = np.cumsum(np.nan_to_num(out[:, p, 0]))
+    return out
+
+
+class ClimatologyStore:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.index_path = self.root / "climatology_index.json"
+        self._data: Optional[np.ndarray] = None
+        self._rows: Dict[str, int] = {}
+        self.meta: Dict = {}
+        self._mtime: Optional[int] = None
+
+    @staticmethod
+    def _key(cell: Cell) -> str:
+        return f"{cell[0]:.4f},{cell[1]:.4f}"
+
+    def _refresh(self) -> None:
+        """(Re)open the memmap when the builder has replaced the files."""
+        try:
+            mtime = self.index_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._data, self._rows, self._mtime = None, {}, None
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            index = json.loads(self.index_path.read_text())
+            self._data = np.load(self.root / index["array"], mmap_mode="r")
+        except KeyError:
+            logger.warning("Climatology index has no array entry, deviations disabled")
+            self._data, self._rows, self._mtime = None, {}, mtime
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Climatology unreadable, deviations disabled: {e}")
+            self._data, self._rows, self._mtime = None, {}, mtime
+            return
+        self._rows = index["cells"]
+        self.meta = {k: v for k, v in index.items() if k != "cells"}
+        self._mtime = mtime
+
+    def has(self, cell: Cell) -> bool:
+        self._refresh()
+        return self._data is not None and self._key(cell) in self._rows
+
+    def lookup(self, cell: Cell, day: date) -> Optional[Dict[str, Dict[str, float]]]:
+        """{"T2M": {"mean": .., "p10": .., ...}, ...} for the cell on that calendar day."""
+        if not self.has(cell):
+            return None
+        slot = int(day_of_year_index(day, 1)[0])
+        row = self._data[self._rows[self._key(cell)], slot]
+        return {
+            name: {stat: float(row[p, s]) for s, stat in enumerate(STATS[:4])}
+            for p, name in enumerate(CLIMATOLOGY_PARAMETERS)
+        }
+
+    def expected_total(self, cell: Cell, parameter: str, start: date, end: date) -> Optional[float]:
+        """Sum of the climatological daily mean over start..end (two lookups)."""
+        if not self.has(cell):
+            return None
+        cum = self._data[self._rows[self._key(cell)], :, CLIMATOLOGY_PARAMETERS.index(parameter), 4]
+        year_total = float(cum[-1])
+        n_days = (end - start).days + 1
+        full_years, remainder = divmod(n_days, 365)
+        total = full_years * year_total
+        if remainder:
+            a = int(day_of_year_index(start, 1)[0])
+            b = int(day_of_year_index(end, 1)[0])
+            before_a = float(cum[a - 1]) if a > 0 else 0.0
+            total += float(cum[b]) - before_a if a <= b else year_total - before_a + float(cum[b])
+        return total
+
+    def rainfall_deviation(self, cell: Cell, series: CellSeries) -> Optional[float]:
+        """% deviation of the window's rainfall from the multi-year average for the same days."""
+        expected = self.expected_total(cell, "PRECTOTCORR", series.first_day, series.last_day)
+        rain = series.values.get("PRECTOTCORR")
+        if not expected or rain is None:
+            return None
+        observed = ~np.isnan(rain)
+        if not observed.any():
+            return None
+        # Scale for missing days (e.g. POWER's trailing latency gap)
+        actual = float(np.clip(rain[observed], 0, None).sum()) * len(rain) / int(observed.sum())
+        return (actual - expected) / expected * 100
+
+    def write(self, baselines: Dict[Cell, np.ndarray], meta: Dict) -> None:
+        """Merge per-cell baselines into a new versioned array, then swap the index to it."""
+        self._refresh()
+        rows = dict(self._rows)
+        existing = np.asarray(self._data) if self._data is not None else None
+        new_keys = [self._key(c) for c in baselines if self._key(c) not in rows]
+        for key in new_keys:
+            rows[key] = len(rows)
+
+        shape = (len(rows), DAYS_IN_YEAR, len(CLIMATOLOGY_PARAMETERS), len(STATS))
+        self.root.mkdir(parents=True, exist_ok=True)
+        array_name = f"climatology.{time.time_ns()}.{os.getpid()}.npy"
+        out = np.lib.format.open_memmap(self.root / array_name, mode="w+", dtype=np.float32, shape=shape)
+        if existing is not None:
+            out[: len(existing)] = existing
+        for cell, baseline in baselines.items():
+            out[rows[self._key(cell)]] = baseline
+        out.flush()
+        del out
+
+        tmp_index = self.index_path.with_name(f"climatology_index.{os.getpid()}.tmp.json")
+        tmp_index.write_text(json.dumps({
+            **meta,
+            "array": array_name,
+            "parameters": CLIMATOLOGY_PARAMETERS,
+            "stats": STATS,
+            "cells": rows,
+        }))
+        os.replace(tmp_index, self.index_path)
+        self._data, self._mtime = None, None  # drop our memmap of the old array
+        self._remove_stale_arrays(keep=array_name)
+
+    def _remove_stale_arrays(self, keep: str) -> None:
+        """Best-effort cleanup; an array another worker still maps is left for the next build."""
+        for path in self.root.glob("climatology.*.npy"):
+            if path.name == keep:
+                continue
+            try:
+                path.unlink()
+            except OSError as e:
+                logger.info(f"Climatology: keeping {path.name} until it is unmapped ({e})")
+
@@ -0,0 +1,252 @@
+"""
+Columnar crop catalog for vectorized prescreen scoring.
+
+CropMatrix compiles the Crop rows (or catalog CropRecords) once into NumPy columns (temperature and
+rainfall bounds, duration, price, yield, cost) plus bitmasks for season and
+soil, so CropSelectionEngine can run the hard filter, the seven score
+components and the risk penalty as array operations over the whole catalog.
+Farm inputs come in as a FarmBatch of (farms × 1) columns, so one pass
+scores any number of farms: every array below is (farms × crops).
+
+The formulas mirror CropSelectionEngine.hard_filter / score_candidate
+exactly (same clamps, same component order for the float sum, same
+rounding); the scalar versions stay as the reference implementation.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from backend.models import Crop, EnvironmentalData
+
+SEASON_BITS = {"Kharif": 1, "Rabi": 2, "Zaid": 4, "Annual": 8}
+SOIL_NAMES = ["clay", "sandy", "loamy", "black", "red", "alluvial"]
+SOIL_BITS = {name: 1 << i for i, name in enumerate(SOIL_NAMES)}
+
+COMPONENTS = ["temperature", "water", "gdd", "market", "roi", "season", "soil"]
+
+
+def _column(crops: List[Crop], attr: str) -> np.ndarray:
+    return np.array(
+        [np.nan if getattr(c, attr) is None else float(getattr(c, attr)) for c in crops],
+        dtype=np.float64,
+    )
+
+
+def season_tokens(season: Optional[str]) -> List[str]:
+    return [s.strip() for s in season.split(",")] if season else []
+
+
+@dataclass
+class CropMatrix:
+    crops: List[Crop]
+    min_temp: np.ndarray
+    max_temp: np.ndarray
+    min_rainfall: np.ndarray
+    max_rainfall: np.ndarray
+    duration_days: np.ndarray
+    price: np.ndarray
+    yield_q: np.ndarray
+    input_cost: np.ndarray
+    season_mask: np.ndarray   # SEASON_BITS of the crop's season tokens
+    has_season: np.ndarray    # crop.season set (hard filter skips the check otherwise)
+    soil_mask: np.ndarray     # SOIL_BITS whose name appears in crop.soil_type
+    soil_text: np.ndarray     # lower-cased crop.soil_type for free-text soil queries
+
+    def __len__(self) -> int:
+        return len(self.crops)
+
+    @classmethod
+    def from_crops(cls, crops: List[Crop]) -> "CropMatrix":
+        season_mask, soil_mask, soil_text = [], [], []
+        for crop in crops:
+            tokens = season_tokens(crop.season)
+            season_mask.append(sum(bit for name, bit in SEASON_BITS.items() if name in tokens))
+            soils = (crop.soil_type or "").lower()
+            soil_mask.append(sum(bit for name, bit in SOIL_BITS.items() if name in soils))
+            soil_text.append(soils)
+        return cls(
+            crops=list(crops),
+            min_temp=_column(crops, "min_temp"),
+            max_temp=_column(crops, "max_temp"),
+            min_rainfall=_column(crops, "min_rainfall"),
+            max_rainfall=_column(crops, "max_rainfall"),
+            duration_days=_column(crops, "duration_days"),
+            price=_column(crops, "market_price_per_quintal"),
+            yield_q=_column(crops, "yield_quintal_per_acre"),
+            input_cost=_column(crops, "input_cost_per_acre"),
+            season_mask=np.array(season_mask, dtype=np.int64),
+            has_season=np.array([bool(c.season) for c in crops], dtype=bool),
+            soil_mask=np.array(soil_mask, dtype=np.int64),
+            soil_text=np.array(soil_text, dtype=str),
+        )
+
+    # ─── Hard filter ──────────────────────────────────────────────────────────
+    def viable_mask(self, farms: "FarmBatch", current_season: str) -> np.ndarray:
+        """(farms × crops) mask of crops passing the hard filter."""
+        temp = farms.avg_temp
+        ok = (self.min_temp - 8 <= temp) & (temp <= self.max_temp + 8)
+        ok &= ~(farms.available_water < self.min_rainfall * 0.35)
+        season_ok = (self.season_mask & (SEASON_BITS[current_season] | SEASON_BITS["Annual"])) != 0
+        ok &= ~self.has_season | season_ok
+        ok &= ~((farms.budget > 0) & (farms.budget < self.input_cost * 0.55))
+        return ok
+
+    # ─── Scoring ──────────────────────────────────────────────────────────────
+    def soil_match(self, user_soil: str) -> np.ndarray:
+        if user_soil in SOIL_BITS:
+            return (self.soil_mask & SOIL_BITS[user_soil]) != 0
+        return np.char.find(self.soil_text, user_soil) >= 0
+
+    def soil_scores(self, soils: List[str]) -> np.ndarray:
+        rows = {}
+        for soil in set(soils):
+            if not soil:
+                rows[soil] = np.full(len(self), 7.0)
+            else:
+                rows[soil] = np.where(self.soil_match(soil), 10.0, 3.0)
+        return np.vstack([rows[soil] for soil in soils]) if soils else np.zeros((0, len(self)))
+
+    def score(self, farms: "FarmBatch", current_season: str,
+              max_market_price: np.ndarray) -> Dict[str, np.ndarray]:
+        """(farms × crops) float component scores, risk penalty and total."""
+        scores: Dict[str, np.ndarray] = {}
+        shape = (len(farms), len(self))
+
+        # 1. Temperature (25)
+        temp = farms.avg_temp
+        t_min, t_max = self.min_temp, self.max_temp
+        inside = (t_min <= temp) & (temp <= t_max)
+        half_range = np.maximum((t_max - t_min) / 2, 1)
+        in_score = np.clip(25 * (1 - np.abs(temp - (t_min + t_max) / 2) / half_range), 10, 25)
+        dist = np.minimum(np.abs(temp - t_min), np.abs(temp - t_max))
+        scores["temperature"] = np.where(inside, in_score, np.clip(25 - dist * 2.5, 0, 9))
+
+        # 2. Water (20)
+        water = farms.available_water
+        c_min, c_max = self.min_rainfall, self.max_rainfall
+        with np.errstate(divide="ignore", invalid="ignore"):
+            in_band = 12 + (water - c_min) / (c_max - c_min) * 8
+            deficit = np.where(c_min > 0, water / c_min * 12, 0.0)
+        scores["water"] = np.where(
+            water >= c_max, 20.0,
+            np.where(water >= c_min, in_band, np.clip(deficit, 0, 11)),
+        )
+
+        # 3. GDD (15)
+        required = self.duration_days * 8.0
+        actual = farms.gdd
+        with np.errstate(divide="ignore", invalid="ignore"):
+            partial = np.clip(actual / required * 15, 0, 14)
+        scores["gdd"] = np.where(actual >= required, 15.0, np.where(required > 0, partial, 10.0))
+
+        # 4. Market (10) + ROI (10)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            market = np.clip(np.log1p(self.price) / np.log1p(max_market_price) * 10, 2, 10)
+        scores["market"] = np.where((max_market_price > 0) & (self.price > 0), market, 5.0)
+        cost = np.maximum(self.input_cost, 1)
+        roi_ratio = (self.yield_q * self.price - cost) / cost
+        scores["roi"] = np.broadcast_to(np.clip(roi_ratio / 3.0 * 10, 0, 10), shape)
+
+        # 5. Season (10)
+        current = (self.season_mask & SEASON_BITS[current_season]) != 0
+        annual = (self.season_mask & SEASON_BITS["Annual"]) != 0
+        scores["season"] = np.broadcast_to(np.where(current, 10.0, np.where(annual, 8.0, 0.0)), shape)
+
+        # 6. Soil (10)
+        scores["soil"] = self.soil_scores(farms.soils)
+
+        # Risk penalty (≤ 15)
+        heat, cv, dry = farms.heat_stress_days, farms.rainfall_variability, farms.dry_spell_days
+        penalty = np.zeros(shape)
+        penalty = penalty + np.where((heat > 0) & (self.max_temp < 38), np.clip(heat * 0.8, 0, 8), 0.0)
+        penalty = penalty + np.where(cv > 40, np.clip((cv - 40) / 60 * 5, 0, 5), 0.0)
+        penalty = penalty + np.where(
+            (dry > 10) & (self.min_rainfall > 400), np.clip((dry - 10) / 20 * 4, 0, 4), 0.0
+        )
+        scores["risk_penalty"] = np.clip(penalty, 0, 15)
+
+        component_sum = np.zeros(shape)
+        for name in COMPONENTS:  # same order as the scalar sum
+            component_sum = component_sum + scores[name]
+        scores["total"] = np.clip(component_sum - scores["risk_penalty"], 0, 100)
+        return scores
+
+    def rank(self, farms: "FarmBatch", current_season: str,
+             top: Optional[int] = None) -> List["Ranking"]:
+        """
+        Per farm: the best `top` viable crops (all if None) with int score and
+        breakdown. Partial selection (argpartition) keeps the work for the
+        returned rows proportional to `top`, not to the catalog.
+        """
+        viable = self.viable_mask(farms, current_season)
+        viable_price = np.where(viable, self.price, -np.inf)
+        max_price = viable_price.max(axis=1, keepdims=True) if len(self) else np.full((len(farms), 1), -np.inf)
+        max_price = np.where(viable.any(axis=1, keepdims=True), max_price, 1.0)
+
+        scores = self.score(farms, current_season, max_price)
+        totals = np.round(scores.pop("total")).astype(np.int64)
+
+        ranked = []
+        for f in range(len(farms)):
+            rows = np.flatnonzero(viable[f])
+            # Unique sort key: score descending, ties keep catalog order (as a stable sort)
+            key = -totals[f, rows] * (len(self) + 1) + rows
+            if top is not None and top < len(rows):
+                picked = np.argpartition(key, top - 1)[:top] if top > 0 else rows[:0]
+                order = rows[picked[np.argsort(key[picked])]]
+            else:
+                order = rows[np.argsort(key)]
+            breakdown = {k: np.round(v[f, order]).astype(int) for k, v in scores.items()}
+            ranked.append(Ranking(
+                items=[
+                    {
+                        "crop": self.crops[i],
+                        "score": int(totals[f, i]),
+                        "breakdown": {k: int(v[j]) for k, v in breakdown.items()},
+                    }
+                    for j, i in enumerate(order)
+                ],
+                n_viable=len(rows),
+            ))
+        return ranked
+
+
+@dataclass
+class Ranking:
+    items: List[Dict[str, Any]]  # best first, at most `top` rows
+    n_viable: int                # crops that passed the hard filter
+
+
+@dataclass
+class FarmBatch:
+    """Per-farm inputs as (farms × 1) columns that broadcast against the catalog."""
+    avg_temp: np.ndarray
+    gdd: np.ndarray
+    heat_stress_days: np.ndarray
+    rainfall_variability: np.ndarray
+    dry_spell_days: np.ndarray
+    available_water: np.ndarray
+    budget: np.ndarray
+    soils: List[str]
+
+    def __len__(self) -> int:
+        return len(self.soils)
+
+    @classmethod
+    def build(cls, envs: List[EnvironmentalData], available_water: List[float],
+              budgets: List[float], soils: List[str]) -> "FarmBatch":
+        def column(values) -> np.ndarray:
+            return np.array(values, dtype=np.float64).reshape(-1, 1)
+
+        return cls(
+            avg_temp=column([e.avg_temp for e in envs]),
+            gdd=column([e.gdd or 0.0 for e in envs]),
+            heat_stress_days=column([e.heat_stress_days or 0 for e in envs]),
+            rainfall_variability=column([e.rainfall_variability or 0.0 for e in envs]),
+            dry_spell_days=column([e.dry_spell_days or 0 for e in envs]),
+            available_water=column(available_water),
+            budget=column(budgets),
+            soils=list(soils),
+        )
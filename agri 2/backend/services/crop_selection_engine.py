@@ -11,18 +11,28 @@ Scoring Dimensions (100 pts total before risk penalty):
   Risk Penalty    -15 max  — heat_stress, rainfall_variability, dry_spell_days
 
 All scores use smooth linear interpolation — no hard tiers.
+
+get_prescreen_results scores the whole in-memory catalog snapshot
+(data/crop_catalog.py) at once through its CropMatrix, memoized per
+environment + farm profile (prescreen_memo.py); hard_filter / score_candidate are the per-crop reference
+implementation it is tested against.
 """
 
-from typing import List, Dict, Any
+import math
+from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.orm import Session
-from datetime import datetime
 
 from backend.models import Crop, EnvironmentalData
 from backend.pydantic_models import (
     PrescreenRequest, CropCandidate, PrescreenResponse,
     WaterAvailability
 )
-from backend.data.crop_repository import CropRepository
+from backend.data.crop_catalog import CatalogSnapshot, CropCatalog, crop_catalog
+from backend.services.input_processor import InputProcessor
+from backend.services.crop_matrix import CropMatrix, FarmBatch, Ranking, season_tokens
+from backend.services.prescreen_memo import (
+    PrescreenEntry, PrescreenMemo, prescreen_fingerprint, prescreen_memo,
+)
 
 
 def _lerp(value: float, low: float, high: float, score_low: float, score_high: float) -> float:
@@ -37,6 +47,9 @@ def _clamp(value: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, value))
 
 
+TOP_RECOMMENDED = 3  # recommended_top_ids
+
+
 class CropSelectionEngine:
     # Irrigation bonus (mm) added to rainfall based on water availability
     IRRIGATION_BONUS = {
@@ -45,20 +58,20 @@ class CropSelectionEngine:
         WaterAvailability.ADEQUATE: 400,
     }
 
-    def __init__(self, db: Session, env_data: EnvironmentalData, request: PrescreenRequest):
+    def __init__(self, db: Session, env_data: EnvironmentalData, request: PrescreenRequest,
+                 catalog: Optional[CropCatalog] = None, memo: Optional[PrescreenMemo] = None):
         self.db = db
         self.env_data = env_data
         self.request = request
-        self.crop_repo = CropRepository(db)
-        self.current_season = self._detect_season()
+        self.catalog = catalog or crop_catalog
+        self.memo = memo or prescreen_memo
+        self.current_season = InputProcessor.get_current_season()
 
-    def _detect_season(self) -> str:
-        m = datetime.now().month
-        if 6 <= m <= 10:
-            return "Kharif"
-        elif m >= 11 or m <= 3:
-            return "Rabi"
-        return "Zaid"
+    def _available_water(self) -> float:
+        # NASA fetches 6 months of data — annualize rainfall for comparison
+        # with crop DB values which store annual requirements
+        annual_rain = self.env_data.rainfall_total * 2.0
+        return annual_rain + self.IRRIGATION_BONUS.get(self.request.water_availability, 0)
 
     # ─────────────────────────────────────────────
     # STAGE 1 — Hard Filter (eliminate impossible crops)
@@ -66,13 +79,7 @@ class CropSelectionEngine:
     def hard_filter(self, crops: List[Crop]) -> List[Crop]:
         """Eliminate crops that cannot grow under current conditions."""
         viable = []
-        # NASA fetches 6 months of data — annualize rainfall for comparison
-        # with crop DB values which store annual requirements
-        annual_rain = self.env_data.rainfall_total * 2.0
-        available_water = (
-            annual_rain
-            + self.IRRIGATION_BONUS.get(self.request.water_availability, 0)
-        )
+        available_water = self._available_water()
 
         for crop in crops:
             # 1. Temperature — allow ±8°C tolerance
@@ -120,12 +127,7 @@ class CropSelectionEngine:
             scores["temperature"] = _clamp(25 - dist * 2.5, 0, 9)
 
         # ── 2. Water / Rainfall (20 pts) ─────────────────
-        # NASA fetches 6 months — annualize for comparison with annual crop requirements
-        annual_rain = self.env_data.rainfall_total * 2.0
-        available_water = (
-            annual_rain
-            + self.IRRIGATION_BONUS.get(self.request.water_availability, 0)
-        )
+        available_water = self._available_water()
         c_min, c_max = crop.min_rainfall, crop.max_rainfall
 
         if available_water >= c_max:
@@ -158,7 +160,6 @@ class CropSelectionEngine:
 
         # Market score (10 pts): log-scale normalization so all crops get
         # meaningful differentiation (not just top-priced crop gets 10)
-        import math
         if max_market_price > 0 and price > 0:
             log_price = math.log1p(price)
             log_max = math.log1p(max_market_price)
@@ -170,7 +171,7 @@ class CropSelectionEngine:
         scores["roi"] = _clamp(_lerp(roi_ratio, 0, 3.0, 0, 10), 0, 10)
 
         # ── 5. Season Fit (10 pts) ────────────────────────
-        crop_seasons = [s.strip() for s in crop.season.split(",")] if crop.season else []
+        crop_seasons = season_tokens(crop.season)
         if self.current_season in crop_seasons:
             scores["season"] = 10
         elif "Annual" in crop_seasons:
@@ -223,23 +224,82 @@ class CropSelectionEngine:
     # ─────────────────────────────────────────────
     # STAGE 3 — Assemble Response
     # ─────────────────────────────────────────────
-    def get_prescreen_results(self) -> PrescreenResponse:
-        all_crops = self.crop_repo.get_all_crops()
-        viable = self.hard_filter(all_crops)
-
-        max_price = max((c.market_price_per_quintal for c in viable), default=1.0)
-
-        scored = []
-        for crop in viable:
-            result = self.score_candidate(crop, max_price)
-            scored.append({"crop": crop, "score": result["score"], "breakdown": result["breakdown"]})
-
-        scored.sort(key=lambda x: x["score"], reverse=True)
+    def _farm_inputs(self) -> Tuple[EnvironmentalData, float, float, str]:
+        user_soil = (self.request.soil_type or "").strip().lower()
+        return self.env_data, self._available_water(), self.request.budget_per_acre, user_soil
+
+    def _rows_needed(self) -> Optional[int]:
+        """Ranked rows the response needs: the requested page and the top 3 ids."""
+        if self.request.limit is None:
+            return None
+        return max(self.request.offset + self.request.limit, TOP_RECOMMENDED)
+
+    def score_matrix(self, matrix: CropMatrix, top: Optional[int] = None) -> Ranking:
+        """Hard filter + score every crop in the matrix; best `top` first."""
+        env, water, budget, soil = self._farm_inputs()
+        batch = FarmBatch.build([env], [water], [budget], [soil])
+        return matrix.rank(batch, self.current_season, top)[0]
+
+    def get_ranked_crops(self) -> List[Tuple[Any, int]]:
+        """(catalog crop row, prescreen score) for every viable crop, best first."""
+        ranking = self.score_matrix(self.catalog.snapshot().matrix)
+        return [(item["crop"], item["score"]) for item in ranking.items]
+
+    def _fingerprint(self, snapshot: CatalogSnapshot) -> tuple:
+        return prescreen_fingerprint(self.env_data, self.request, self.current_season, snapshot.version)
+
+    def get_prescreen_entry(self) -> PrescreenEntry:
+        """Memoized response (+ JSON bytes) for this farm; scores only on a miss."""
+        snapshot = self.catalog.snapshot()
+        self.memo.sync(snapshot)
+        key = self._fingerprint(snapshot)
+        entry = self.memo.get(key)
+        if entry is None:
+            ranking = self.score_matrix(snapshot.matrix, self._rows_needed())
+            entry = self.memo.put(key, self.build_response(ranking))
+        return entry
 
-        top_ids = [str(item["crop"].id) for item in scored[:3]]
+    def get_prescreen_results(self) -> PrescreenResponse:
+        # Shared with the memo — read-only for callers
+        return self.get_prescreen_entry().response
+
+    @classmethod
+    def prescreen_batch(
+        cls,
+        db: Session,
+        farms: List[Tuple[PrescreenRequest, EnvironmentalData]],
+        catalog: Optional[CropCatalog] = None,
+        memo: Optional[PrescreenMemo] = None,
+    ) -> List[PrescreenResponse]:
+        """Prescreen many farms against the catalog in one vectorized pass."""
+        engines = [cls(db, env, request, catalog, memo) for request, env in farms]
+        if not engines:
+            return []
+        snapshot = engines[0].catalog.snapshot()
+        engines[0].memo.sync(snapshot)
+
+        keys = [engine._fingerprint(snapshot) for engine in engines]
+        entries = [engine.memo.get(key) for engine, key in zip(engines, keys)]
+        misses = [i for i, entry in enumerate(entries) if entry is None]
+        if misses:
+            inputs = list(zip(*(engines[i]._farm_inputs() for i in misses)))
+            batch = FarmBatch.build(*(list(column) for column in inputs))
+            needed = [engines[i]._rows_needed() for i in misses]
+            top = None if None in needed else max(needed)
+            ranked = snapshot.matrix.rank(batch, engines[0].current_season, top)
+            for i, ranking in zip(misses, ranked):
+                entries[i] = engines[i].memo.put(keys[i], engines[i].build_response(ranking))
+        return [entry.response for entry in entries]
+
+    def build_response(self, ranking: Ranking) -> PrescreenResponse:
+        top_ids = [str(item["crop"].id) for item in ranking.items[:TOP_RECOMMENDED]]
+
+        # Only the requested page becomes CropCandidate objects
+        offset, limit = self.request.offset, self.request.limit
+        page = ranking.items[offset:] if limit is None else ranking.items[offset:offset + limit]
 
         candidates = []
-        for item in scored:
+        for item in page:
             c = item["crop"]
             bd = item["breakdown"]
 
@@ -260,7 +320,7 @@ class CropSelectionEngine:
                 score_roi=bd.get("roi", 0),
                 score_soil=bd.get("soil", 0),
                 risk_penalty=bd.get("risk_penalty", 0),
-                season=[s.strip() for s in c.season.split(",")] if c.season else [],
+                season=season_tokens(c.season),
                 market_potential=c.market_potential or "Medium",
                 input_cost_range=f"₹{int(cost):,}",
                 duration_days=f"{c.duration_days} days",
@@ -284,4 +344,7 @@ class CropSelectionEngine:
                 "rainfall_variability_cv": self.env_data.rainfall_variability,
                 "dry_spell_days": self.env_data.dry_spell_days,
             },
+            total_candidates=ranking.n_viable,
+            offset=offset,
+            limit=limit,
         )
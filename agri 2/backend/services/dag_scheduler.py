@@ -0,0 +1,98 @@
+"""
+DAG Scheduler – runs async pipeline nodes as soon as their inputs are ready.
+
+Each DAGNode declares the keys of the nodes it depends on; its `run`
+coroutine function receives their results positionally, in `deps` order.
+Independent nodes run concurrently (pacing is left to the shared LLM
+semaphore / rate limiter), so a run takes as long as its critical path.
+
+- Per-node timings (start offset + duration, ms) are recorded in `timings`
+- `on_complete(key, result, timing)` fires the moment each node finishes,
+  which is how the orchestrator streams results into AnalysisJobStore
+- The first failing node cancels everything still pending and re-raises
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DAGNode:
+    key: str
+    run: Callable[..., Awaitable[Any]]
+    deps: Tuple[str, ...] = ()
+
+
+CompletionCallback = Callable[[str, Any, Dict[str, float]], None]
+
+
+def topological_order(nodes: Sequence[DAGNode]) -> List[DAGNode]:
+    """Kahn's algorithm; raises ValueError on unknown dependencies or cycles."""
+    by_key = {node.key: node for node in nodes}
+    if len(by_key) != len(nodes):
+        raise ValueError("DAG node keys must be unique")
+    for node in nodes:
+        missing = [d for d in node.deps if d not in by_key]
+        if missing:
+            raise ValueError(f"Node '{node.key}' depends on unknown node(s): {missing}")
+
+    remaining = {node.key: set(node.deps) for node in nodes}
+    ordered: List[DAGNode] = []
+    while remaining:
+        ready = [key for key, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Dependency cycle between nodes: {sorted(remaining)}")
+        for key in ready:
+            ordered.append(by_key[key])
+            del remaining[key]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return ordered
+
+
+class DAGScheduler:
+    def __init__(self, nodes: Sequence[DAGNode], on_complete: Optional[CompletionCallback] = None):
+        self.nodes = topological_order(nodes)
+        self.on_complete = on_complete
+        self.timings: Dict[str, Dict[str, float]] = {}
+
+    async def run(self) -> Dict[str, Any]:
+        """Execute every node; returns {key: result}."""
+        t0 = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def _execute(node: DAGNode) -> Any:
+            inputs = await asyncio.gather(*(tasks[d] for d in node.deps))
+            started = time.perf_counter()
+            result = await node.run(*inputs)
+            finished = time.perf_counter()
+            timing = {
+                "start_ms": round((started - t0) * 1000, 1),
+                "duration_ms": round((finished - started) * 1000, 1),
+            }
+            self.timings[node.key] = timing
+            logger.info(f"DAG node {node.key} done in {timing['duration_ms']:.0f}ms (t+{timing['start_ms']:.0f}ms)")
+            if self.on_complete is not None:
+                self.on_complete(node.key, result, timing)
+            return result
+
+        # Topological order guarantees every dependency task exists before it is awaited
+        for node in self.nodes:
+            tasks[node.key] = asyncio.create_task(_execute(node), name=f"dag:{node.key}")
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        total_ms = (time.perf_counter() - t0) * 1000
+        logger.info(f"DAG complete in {total_ms:.0f}ms ({len(self.nodes)} nodes)")
+        return {key: task.result() for key, task in tasks.items()}
@@ -0,0 +1,152 @@
+"""
+Vectorized environmental metrics over a POWER daily series.
+
+The series is stacked once into a (parameters × days) float64 matrix with a
+validity mask; every metric is then a NumPy reduction instead of a Python
+loop over date-keyed dicts:
+- means / totals:   masked sums over the valid days
+- GDD (base 10°C):  clip((Tmax + Tmin) / 2 - 10, 0) on days with both values
+- heat/cold stress: counts of Tmax > 35°C and Tmin < 10°C
+- dry spell:        longest run of days with 0 ≤ rain < 2.5 mm (run-length encoding)
+- rainfall CV:      monthly totals via bincount over a datetime64[M] index
+
+Given the cell latitude, FAO-56 reference ET₀ is added (evapotranspiration.py):
+its window mean plus the daily ET₀ / rain series for the numeric water balance.
+
+Validity thresholds match the original dict-based implementation exactly:
+temperatures > -900, precipitation / humidity / soil wetness > 0 for means
+and totals, precipitation ≥ 0 for monthly totals.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from backend.models import EnvironmentalData
+from backend.services.evapotranspiration import series_et0
+from backend.services.power_series_store import CellSeries
+
+GDD_BASE_TEMP = 10.0
+HEAT_STRESS_TEMP = 35.0
+COLD_STRESS_TEMP = 10.0
+DRY_DAY_MM = 2.5
+
+_PARAMETERS = ["T2M", "T2M_MIN", "T2M_MAX", "PRECTOTCORR", "RH2M", "GWETTOP"]
+T2M, T2M_MIN, T2M_MAX, PRECIP, RH2M, GWETTOP = range(len(_PARAMETERS))
+
+
+def _masked_mean(values: np.ndarray, valid: np.ndarray) -> Optional[float]:
+    count = int(valid.sum())
+    return float(values[valid].sum() / count) if count else None
+
+
+def longest_run(flags: np.ndarray) -> int:
+    """Length of the longest run of True values (run-length encoding)."""
+    if not flags.any():
+        return 0
+    edges = np.diff(np.concatenate(([0], flags.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return int((ends - starts).max())
+
+
+def monthly_rainfall_cv(series: CellSeries, precip: np.ndarray) -> float:
+    """Coefficient of variation (%) of monthly rainfall totals, capped at 100."""
+    days = np.datetime64(series.first_day, "D") + np.arange(len(precip))
+    months = days.astype("datetime64[M]").astype(np.int64)
+    month_index = months - months[0] if len(months) else months
+
+    # Only months with at least one reported day count, as in the dict version
+    valid = ~np.isnan(precip) & (precip >= 0)
+    totals = np.bincount(month_index[valid], weights=precip[valid])
+    reported = np.bincount(month_index[valid]) > 0
+    totals = totals[reported]
+
+    if len(totals) < 2:
+        return 0.0
+    mean = totals.mean()
+    if mean == 0:
+        return 100.0  # No rainfall = maximum variability context
+    cv = totals.std(ddof=1) / mean * 100
+    return float(min(cv, 100.0))
+
+
+def compute_environmental_data(
+    series: CellSeries,
+    climate_deviation: float = 0.0,
+    latitude: Optional[float] = None,
+) -> EnvironmentalData:
+    """All EnvironmentalData metrics for one daily series, vectorized."""
+    n_days = series.n_days
+    empty = np.full(n_days, np.nan)
+    data = np.vstack([series.values.get(name, empty) for name in _PARAMETERS]).astype(np.float64)
+    present = ~np.isnan(data)
+
+    t2m, t2m_min, t2m_max = data[T2M], data[T2M_MIN], data[T2M_MAX]
+    precip, rh2m, gwettop = data[PRECIP], data[RH2M], data[GWETTOP]
+    temp_valid = present[[T2M, T2M_MIN, T2M_MAX]] & (data[[T2M, T2M_MIN, T2M_MAX]] > -900)
+    positive = present & (data > 0)
+
+    avg_temp = _masked_mean(t2m, temp_valid[0])
+    if avg_temp is None:
+        raise ValueError("No valid temperature data received from NASA")
+
+    # --- Calculations ---
+    min_temp_avg = _masked_mean(t2m_min, temp_valid[1])
+    max_temp_avg = _masked_mean(t2m_max, temp_valid[2])
+    min_temp_avg = avg_temp - 5 if min_temp_avg is None else min_temp_avg
+    max_temp_avg = avg_temp + 5 if max_temp_avg is None else max_temp_avg
+    avg_humidity = _masked_mean(rh2m, positive[RH2M]) or 0.0
+    rainfall_total = float(precip[positive[PRECIP]].sum())
+
+    # Rainfall Consistency
+    cv = monthly_rainfall_cv(series, precip)
+    rainfall_stability = (100.0 / cv) if cv > 1.0 else 100.0  # Inverse of variability
+
+    # Heat/Cold Stress
+    heat_stress_days = int((t2m_max[temp_valid[2]] > HEAT_STRESS_TEMP).sum())
+    cold_stress_days = int((t2m_min[temp_valid[1]] < COLD_STRESS_TEMP).sum())
+
+    # GDD on days with both Tmax and Tmin
+    both = temp_valid[1] & temp_valid[2]
+    gdd_total = float(np.clip((t2m_max[both] + t2m_min[both]) / 2 - GDD_BASE_TEMP, 0, None).sum())
+
+    # Dry Spells: longest run of 0–2.5 mm days (missing days break a run)
+    dry = present[PRECIP] & (precip > -0.1) & (precip < DRY_DAY_MM)
+    dry_spell_days = longest_run(dry)
+
+    # Soil Moisture: GWETTOP (0-1) when available, else a rough rain/temperature proxy
+    soil_moisture_index = _masked_mean(gwettop, positive[GWETTOP])
+    if soil_moisture_index is None:
+        estimated_val = max(0, rainfall_total * 0.7 - (avg_temp * 5))
+        soil_moisture_index = min(1.0, estimated_val / 500.0)
+
+    # Reference ET (needs latitude for extraterrestrial radiation)
+    et0_mm_day = daily_et0 = daily_rain = None
+    if latitude is not None and {"T2M_MAX", "T2M_MIN"} <= series.values.keys():
+        et0 = series_et0(series, latitude)
+        if not np.isnan(et0).all():
+            et0_mm_day = float(np.nanmean(et0))
+            daily_et0 = np.round(np.where(np.isnan(et0), et0_mm_day, et0), 2).tolist()
+            daily_rain = np.round(np.nan_to_num(np.clip(precip, 0, None)), 2).tolist()
+
+    return EnvironmentalData(
+        avg_temp=round(avg_temp, 2),
+        min_temp=round(min_temp_avg, 2),
+        max_temp=round(max_temp_avg, 2),
+        rainfall_total=round(rainfall_total, 2),
+        rainfall_variability=round(cv, 2),
+        rainfall_stability=round(rainfall_stability, 2),
+        soil_moisture_index=round(soil_moisture_index, 2),
+        soil_moisture_estimate=round(soil_moisture_index * 100, 2),  # approx mm or %
+        avg_humidity=round(avg_humidity, 2),
+        gdd=round(gdd_total, 2),
+        forecast_rain_next_14_days=None,  # Not available in historical API
+        heat_stress_days=heat_stress_days,
+        cold_stress_days=cold_stress_days,
+        dry_spell_days=dry_spell_days,
+        climate_deviation=climate_deviation,
+        et0_mm_day=round(et0_mm_day, 2) if et0_mm_day is not None else None,
+        daily_et0_mm=daily_et0,
+        daily_rain_mm=daily_rain,
+    )
@@ -0,0 +1,194 @@
+"""
+Bulk warm-up of the NASA POWER series store / cache, and the offline
+climatology baseline build.
+
+Onboarding a district means the first request from every village stalls on
+a POWER call. This module turns a list of points, a bounding box or a
+GeoJSON district polygon into the distinct POWER grid cells it covers and
+fetches each cell once, with bounded concurrency, through NASAService —
+which writes the days into the per-cell series store (and the response
+cache). Run overnight via scripts/prefetch_environment.py so daytime
+prescreens only read local data.
+
+- Points are deduplicated with snap_to_grid, so 10k farms in one district
+  are typically a few dozen requests
+- Cells already stored up to yesterday cost no network call at all
+- A failing cell is logged and reported; it never aborts the rest of the run
+- build_climatologies() pulls CLIMATOLOGY_YEARS full calendar years of T2M
+  and PRECTOTCORR per cell (cache bypassed) into the ClimatologyStore
+"""
+
+import asyncio
+import logging
+import time
+from datetime import date, datetime
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import backend.config as cfg
+from backend.services.climatology import CLIMATOLOGY_PARAMETERS, ClimatologyStore, build_cell_climatology
+from backend.services.nasa_service import NASAService, nasa_service, snap_to_grid
+from backend.services.power_series_store import CellSeries
+
+logger = logging.getLogger(__name__)
+
+Cell = Tuple[float, float]
+Ring = Sequence[Sequence[float]]  # GeoJSON ring: [[lon, lat], ...]
+
+
+# ─── Coordinates → grid cells ─────────────────────────────────────────────────
+
+def cells_for_points(points: Iterable[Tuple[float, float]]) -> List[Cell]:
+    """Distinct grid cells containing the (lat, lon) points, in first-seen order."""
+    return list(dict.fromkeys(snap_to_grid(lat, lon) for lat, lon in points))
+
+
+def cells_for_bbox(min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> List[Cell]:
+    """Every grid cell overlapping the bounding box."""
+    if min_lat > max_lat or min_lon > max_lon:
+        raise ValueError("Bounding box minimum must not exceed maximum")
+    lat_step, lon_step = cfg.NASA_GRID_LAT_DEG, cfg.NASA_GRID_LON_DEG
+    lo_lat, lo_lon = snap_to_grid(min_lat, min_lon)
+    hi_lat, hi_lon = snap_to_grid(max_lat, max_lon)
+    n_lat = int(round((hi_lat - lo_lat) / lat_step)) + 1
+    n_lon = int(round((hi_lon - lo_lon) / lon_step)) + 1
+    return [
+        snap_to_grid(lo_lat + i * lat_step, lo_lon + j * lon_step)
+        for i in range(n_lat)
+        for j in range(n_lon)
+    ]
+
+
+def _polygons(geojson: Dict[str, Any]) -> List[List[Ring]]:
+    """Polygons (each a list of rings) from a Geometry, Feature or FeatureCollection."""
+    kind = geojson.get("type")
+    if kind == "FeatureCollection":
+        return [p for feature in geojson.get("features", []) for p in _polygons(feature)]
+    if kind == "Feature":
+        return _polygons(geojson.get("geometry") or {})
+    if kind == "Polygon":
+        return [geojson["coordinates"]]
+    if kind == "MultiPolygon":
+        return list(geojson["coordinates"])
+    raise ValueError(f"Unsupported GeoJSON type for prefetch: {kind}")
+
+
+def _inside(lat: float, lon: float, rings: List[Ring]) -> bool:
+    """Even-odd ray casting across all rings, so holes are excluded."""
+    inside = False
+    for ring in rings:
+        for a, b in zip(ring, list(ring[1:]) + [ring[0]]):
+            (x1, y1), (x2, y2) = a[:2], b[:2]
+            if (y1 > lat) != (y2 > lat):
+                if lon < x1 + (lat - y1) * (x2 - x1) / (y2 - y1):
+                    inside = not inside
+    return inside
+
+
+def cells_for_geojson(geojson: Dict[str, Any]) -> List[Cell]:
+    """
+    Grid cells whose centre lies inside the polygon(s), plus the cells holding
+    each vertex so districts smaller than one cell still get their cell.
+    """
+    cells: Dict[Cell, None] = {}
+    for rings in _polygons(geojson):
+        outer = rings[0]
+        lons = [p[0] for p in outer]
+        lats = [p[1] for p in outer]
+        for cell in cells_for_bbox(min(lats), min(lons), max(lats), max(lons)):
+            if _inside(cell[0], cell[1], rings):
+                cells[cell] = None
+        for lon, lat, *_ in outer:
+            cells[snap_to_grid(lat, lon)] = None
+    return list(cells)
+
+
+# ─── Fetching ─────────────────────────────────────────────────────────────────
+
+@dataclass
+class PrefetchReport:
+    cells: int = 0
+    fetched: int = 0
+    failed: Dict[str, str] = field(default_factory=dict)  # "lat,lon" -> error
+    duration_s: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.fetched}/{self.cells} cells warmed, {len(self.failed)} failed "
+            f"in {self.duration_s:.1f}s"
+        )
+
+
+async def prefetch_cells(
+    cells: Sequence[Cell],
+    service: Optional[NASAService] = None,
+    concurrency: Optional[int] = None,
+) -> PrefetchReport:
+    """Fetch the default analysis window for every cell, at most `concurrency` at a time."""
+    service = service or nasa_service
+    sem = asyncio.Semaphore(max(1, concurrency or cfg.NASA_PREFETCH_CONCURRENCY))
+    report = PrefetchReport(cells=len(cells))
+    t0 = time.perf_counter()
+
+    async def warm(cell: Cell):
+        async with sem:
+            try:
+                await service.fetch_power_series(cell[0], cell[1])
+                report.fetched += 1
+            except Exception as e:
+                report.failed[f"{cell[0]},{cell[1]}"] = str(e) or type(e).__name__
+                logger.warning(f"Prefetch: cell {cell} failed: {e}")
+
+    await asyncio.gather(*(warm(cell) for cell in cells))
+    report.duration_s = time.perf_counter() - t0
+    logger.info(f"Environment prefetch: {report.summary()}")
+    return report
+
+
+# ─── Climatology baselines ────────────────────────────────────────────────────
+
+async def build_climatologies(
+    cells: Sequence[Cell],
+    store: Optional[ClimatologyStore] = None,
+    service: Optional[NASAService] = None,
+    years: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    last_year: Optional[int] = None,
+) -> PrefetchReport:
+    """Fetch `years` full calendar years per cell and write their day-of-year baselines."""
+    service = service or nasa_service
+    store = store or ClimatologyStore(cfg.CLIMATOLOGY_DIR)
+    years = years or cfg.CLIMATOLOGY_YEARS
+    last_year = last_year or date.today().year - 1
+    start, end = date(last_year - years + 1, 1, 1), date(last_year, 12, 31)
+    sem = asyncio.Semaphore(max(1, concurrency or cfg.NASA_PREFETCH_CONCURRENCY))
+    report = PrefetchReport(cells=len(cells))
+    baselines: Dict[Cell, np.ndarray] = {}
+    t0 = time.perf_counter()
+
+    async def build(cell: Cell):
+        async with sem:
+            try:
+                data = await service.fetch_power_data(
+                    cell[0], cell[1],
+                    datetime.combine(start, datetime.min.time()),
+                    datetime.combine(end, datetime.min.time()),
+                    parameters=",".join(CLIMATOLOGY_PARAMETERS),
+                    use_cache=False,
+                )
+            except Exception as e:
+                report.failed[f"{cell[0]},{cell[1]}"] = str(e) or type(e).__name__
+                logger.warning(f"Climatology: cell {cell} failed: {e}")
+                return
+        series = CellSeries.from_power_payload(data, CLIMATOLOGY_PARAMETERS, start, end)
+        baselines[cell] = build_cell_climatology(series)
+        report.fetched += 1
+
+    await asyncio.gather(*(build(cell) for cell in cells))
+    if baselines:
+        store.write(baselines, {"years": [start.year, end.year]})
+    report.duration_s = time.perf_counter() - t0
+    logger.info(f"Climatology build: {report.summary()}")
+    return report
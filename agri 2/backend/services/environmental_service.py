@@ -1,14 +1,25 @@
 from backend.models import EnvironmentalData
-from backend.services.nasa_service import nasa_service
+from backend.services.nasa_service import default_window, nasa_service, snap_to_grid
+from backend.services.single_flight import SingleFlight
+
+# Farms in one grid cell get identical data, so concurrent requests share a fetch
+env_inflight = SingleFlight("environment")
 
 class EnvironmentalService:
     @staticmethod
     async def fetch_environmental_data(lat: float, lon: float) -> EnvironmentalData:
         """
         Fetch environmental data using NASA POWER API and calculate intelligence.
+        Concurrent callers for the same grid cell + window share one in-flight
+        fetch; each gets its own copy of the resulting EnvironmentalData, so
+        one request enriching it can't leak into another farm's.
         """
+        cell_lat, cell_lon = snap_to_grid(lat, lon)
+        start, end = default_window()
+        key = f"{cell_lat},{cell_lon}:{start:%Y%m%d}-{end:%Y%m%d}"
         # All logic delegated to the enhanced NASAService
-        return await nasa_service.get_environmental_data(lat, lon)
+        shared = await env_inflight.do(key, lambda: nasa_service.get_environmental_data(cell_lat, cell_lon))
+        return shared.model_copy(deep=True)
 
     @staticmethod
     def calculate_compatibility(data: EnvironmentalData, min_temp: float, max_temp: float, min_rain: float, max_rain: float) -> float:
@@ -0,0 +1,208 @@
+"""
+Storage backends for AnalysisJobStore.
+
+JobStoreBackend is the pluggable interface; two implementations ship:
+  - SQLiteJobBackend: one row per job in a WAL-mode SQLite file, shared by
+    every uvicorn worker on the host and surviving restarts. Each model
+    result has its own column (model_1 .. model_9) so a finished model is
+    written as a single-column UPDATE, never a rewrite of the whole job.
+  - MemoryJobBackend: the original per-process dict (single worker / tests).
+
+Backends only persist; caching and TTL policy live in AnalysisJobStore.
+`changes` passed to update() are AnalysisJob attribute names, plus
+"model_N" keys for individual entries of AnalysisJob.model_results.
+"""
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MODEL_KEYS = [f"model_{i}" for i in range(1, 10)]
+_MODEL_KEY = re.compile(r"^model_[1-9]$")
+
+# AnalysisJob attributes stored as JSON text
+_JSON_FIELDS = [
+    "request_data", "model_1_result", "full_result", "transformed_result",
+    "completed_steps", "node_timings", "crop_names",
+]
+_UPDATABLE = {"status", "error", "updated_at", *_JSON_FIELDS}
+
+
+def apply_changes(job, changes: Dict[str, Any]) -> None:
+    """Apply an update() change set to an in-memory AnalysisJob."""
+    for key, value in changes.items():
+        if _MODEL_KEY.match(key):
+            job.model_results[key] = value
+        else:
+            setattr(job, key, value)
+
+
+class JobStoreBackend(ABC):
+    @abstractmethod
+    def insert(self, job, expires_at: float) -> None:
+        """Persist a newly created job."""
+
+    @abstractmethod
+    def load(self, job_id: str):
+        """Return the stored AnalysisJob, or None if missing or expired."""
+
+    @abstractmethod
+    def update(self, job_id: str, changes: Dict[str, Any], expires_at: float) -> None:
+        """Write only the changed fields and push the job's expiry forward."""
+
+    @abstractmethod
+    def purge_expired(self, now: float) -> int:
+        """Delete expired jobs; returns how many were removed."""
+
+
+class MemoryJobBackend(JobStoreBackend):
+    def __init__(self):
+        self._jobs: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+
+    def insert(self, job, expires_at: float) -> None:
+        self._jobs[job.job_id] = job
+        self._expires[job.job_id] = expires_at
+
+    def load(self, job_id: str):
+        if self._expires.get(job_id, 0.0) <= time.time():
+            return None
+        return self._jobs.get(job_id)
+
+    def update(self, job_id: str, changes: Dict[str, Any], expires_at: float) -> None:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            apply_changes(job, changes)
+            self._expires[job_id] = expires_at
+
+    def purge_expired(self, now: float) -> int:
+        expired = [job_id for job_id, expires_at in self._expires.items() if expires_at <= now]
+        for job_id in expired:
+            self._jobs.pop(job_id, None)
+            self._expires.pop(job_id, None)
+        return len(expired)
+
+
+class SQLiteJobBackend(JobStoreBackend):
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    # The connection is opened lazily so importing this module never touches disk.
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=10.0)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            columns = ", ".join(f"{name} TEXT" for name in _JSON_FIELDS + MODEL_KEYS)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_jobs ("
+                " job_id TEXT PRIMARY KEY,"
+                " status TEXT NOT NULL,"
+                " error TEXT,"
+                " created_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                f" {columns})"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_analysis_jobs_expires ON analysis_jobs (expires_at)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def _column(key: str, value: Any) -> Any:
+        if key == "status":
+            return getattr(value, "value", value)
+        if key in ("created_at", "updated_at"):
+            return value.timestamp() if isinstance(value, datetime) else value
+        if key in _JSON_FIELDS or _MODEL_KEY.match(key):
+            return None if value is None else json.dumps(value, default=str)
+        return value
+
+    def insert(self, job, expires_at: float) -> None:
+        row = {
+            "job_id": job.job_id,
+            "status": job.status,
+            "error": job.error,
+            "created_at": job.created_at,
+            "updated_at": job.updated_at,
+            "expires_at": expires_at,
+            **{name: getattr(job, name) for name in _JSON_FIELDS},
+            **{key: job.model_results.get(key) for key in MODEL_KEYS},
+        }
+        names = list(row)
+        with self._lock:
+            conn = self._db()
+            conn.execute(
+                f"INSERT INTO analysis_jobs ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+                [self._column(name, row[name]) for name in names],
+            )
+            conn.commit()
+
+    def load(self, job_id: str):
+        from backend.services.analysis_job_store import AnalysisJob, AnalysisStatus
+
+        with self._lock:
+            conn = self._db()
+            cursor = conn.execute(
+                "SELECT * FROM analysis_jobs WHERE job_id = ? AND expires_at > ?",
+                (job_id, time.time()),
+            )
+            row = cursor.fetchone()
+            names = [d[0] for d in cursor.description]
+        if row is None:
+            return None
+
+        data = dict(zip(names, row))
+        job = AnalysisJob.__new__(AnalysisJob)
+        job.job_id = data["job_id"]
+        job.status = AnalysisStatus(data["status"])
+        job.error = data["error"]
+        job.created_at = datetime.fromtimestamp(data["created_at"])
+        job.updated_at = datetime.fromtimestamp(data["updated_at"])
+        for name in _JSON_FIELDS:
+            setattr(job, name, json.loads(data[name]) if data[name] is not None else None)
+        job.completed_steps = job.completed_steps or []
+        job.node_timings = job.node_timings or {}
+        job.crop_names = job.crop_names or {}
+        job.model_results = {
+            key: json.loads(data[key]) for key in MODEL_KEYS if data[key] is not None
+        }
+        return job
+
+    def update(self, job_id: str, changes: Dict[str, Any], expires_at: float) -> None:
+        unknown = [k for k in changes if k not in _UPDATABLE and not _MODEL_KEY.match(k)]
+        if unknown:
+            raise ValueError(f"Unknown analysis job field(s): {unknown}")
+        columns = {key: self._column(key, value) for key, value in changes.items()}
+        columns["expires_at"] = expires_at
+        assignments = ", ".join(f"{name} = ?" for name in columns)
+        with self._lock:
+            conn = self._db()
+            conn.execute(
+                f"UPDATE analysis_jobs SET {assignments} WHERE job_id = ?",
+                [*columns.values(), job_id],
+            )
+            conn.commit()
+
+    def purge_expired(self, now: float) -> int:
+        with self._lock:
+            conn = self._db()
+            removed = conn.execute("DELETE FROM analysis_jobs WHERE expires_at <= ?", (now,)).rowcount
+            conn.commit()
+        if removed:
+            logger.info(f"Purged {removed} expired analysis jobs")
+        return removed
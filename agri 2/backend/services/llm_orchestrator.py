@@ -1,21 +1,34 @@
 """
-LLM Orchestrator – Runs Models 1–8 in parallel, then Model 9 for synthesis.
+LLM Orchestrator – Runs the 9-model pipeline as a dependency DAG.
 
-This is the main entry point for the full 9-model pipeline.
+Models 1–8 are independent and start together (or Model 1 + one batched
+Models 2–8 call with LLM_BATCH_MODE); Model 9 waits for all of them. Both
+the synchronous endpoint (run_full_analysis) and the background job
+endpoints (run_analysis_job) use the same DAG, so a job takes as long as
+its critical path rather than the sum of its models.
+
+Models 1–8 also have numeric estimates (models/numeric_engine.py):
+ANALYSIS_MODE="instant" uses them instead of the LLM, and with
+LLM_FALLBACK_ENABLED any LLM node that raises LLMUnavailableError (no key,
+402, 429 / quota) is answered by its numeric estimate instead of failing
+the whole analysis. Every result carries its provenance ("llm", "numeric",
+"numeric_fallback", or "computed" for the final FAO-56 Model 3). Jobs in "refine" mode store the numeric estimate for
+all nine models up front (store_estimates), then the LLM results replace
+them one by one as they arrive; any LLM error there (bad JSON, 5xx,
+timeout) keeps the estimate instead of failing the job.
 """
 
 import asyncio
 import logging
 import time
-from typing import Any, Dict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
 
 from backend.services.models.schemas import (
     AnalysisContext,
     FullAnalysisResponse,
-    Model1Result, Model2Result, Model3Result, Model4Result,
-    Model5Result, Model6Result, Model7Result, Model8Result,
     Model9Result,
 )
+from backend.services.dag_scheduler import DAGNode, DAGScheduler
 from backend.services.models.model1_rainfall import run_model_1
 from backend.services.models.model2_soil import run_model_2
 from backend.services.models.model3_water_balance import run_model_3
@@ -24,21 +37,30 @@ from backend.services.models.model5_economic import run_model_5
 from backend.services.models.model6_risk import run_model_6
 from backend.services.models.model7_market_access import run_model_7
 from backend.services.models.model8_demand import run_model_8
-from backend.services.models.model9_synthesis import run_model_9
+from backend.services.models.model9_synthesis import compute_synthesis, run_model_9
+from backend.services.models.multi_domain import run_models_2_to_8_batched
+from backend.services.models.numeric_engine import NUMERIC_MODELS, NumericInputs, run_numeric_models
+from backend.services.openrouter_client import LLMUnavailableError
+from backend.config import LLM_MAX_CONCURRENCY, LLM_BATCH_MODE, ANALYSIS_MODE, LLM_FALLBACK_ENABLED
 
 logger = logging.getLogger(__name__)
 
-# ─── Global rate-limit guard ──────────────────────────────────────────────────
-# Free-tier models on OpenRouter have strict per-minute limits.
+# ─── Global concurrency guard ─────────────────────────────────────────────────
+# Per-minute quota is enforced by the token-bucket limiter inside call_llm;
+# this semaphore only caps how many model coroutines are in flight at once.
 # The semaphore is created lazily so uvicorn --reload won't crash on import
-# (module-level asyncio.Semaphore() raises if no event loop is running).
+# (module-level asyncio.Semaphore() raises if no event loop is running), and
+# recreated if a different event loop (tests, scripts) picks it up.
 _LLM_SEMAPHORE: asyncio.Semaphore | None = None
+_SEMAPHORE_LOOP: asyncio.AbstractEventLoop | None = None
 
 def _get_semaphore() -> asyncio.Semaphore:
     """Return the process-wide LLM semaphore, creating it on first use."""
-    global _LLM_SEMAPHORE
-    if _LLM_SEMAPHORE is None:
-        _LLM_SEMAPHORE = asyncio.Semaphore(1)
+    global _LLM_SEMAPHORE, _SEMAPHORE_LOOP
+    loop = asyncio.get_running_loop()
+    if _LLM_SEMAPHORE is None or _SEMAPHORE_LOOP is not loop:
+        _LLM_SEMAPHORE = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+        _SEMAPHORE_LOOP = loop
     return _LLM_SEMAPHORE
 
 
@@ -48,164 +70,263 @@ async def _run_with_guard(coro):
         return await coro
 
 
-async def run_model_1_only(context: AnalysisContext) -> Model1Result:
-    """Run only Model 1 (Rainfall) and return the result."""
-    logger.info("Running Model 1 (Rainfall) independently...")
-    return await _run_with_guard(run_model_1(context))
+# ─── Pipeline graph ───────────────────────────────────────────────────────────
+
+# Job-store key → FullAnalysisResponse.model_outputs key
+_OUTPUT_KEYS = {
+    "model_1": "model_1_rainfall",
+    "model_2": "model_2_soil_moisture",
+    "model_3": "model_3_water_balance",
+    "model_4": "model_4_climate",
+    "model_5": "model_5_economic",
+    "model_6": "model_6_risk",
+    "model_7": "model_7_market_access",
+    "model_8": "model_8_demand",
+}
+
+# Completed-step labels (job store / frontend progress)
+_STEP_LABELS = {
+    "model_1": "Rainfall Analysis",
+    "model_2": "Soil Analysis",
+    "model_3": "Water Balance",
+    "model_4": "Climate Analysis",
+    "model_5": "Economic Viability",
+    "model_6": "Risk Assessment",
+    "model_7": "Market Access",
+    "model_8": "Demand Analysis",
+    "model_9": "Final Synthesis",
+}
+
+_TOTAL_MODELS = len(_STEP_LABELS)
+
+# DAG node that yields Models 2–8 at once in batch mode
+_BATCH_NODE = "models_2_8"
+_BATCH_KEYS = tuple(f"model_{i}" for i in range(2, 9))
+
+
+def _numeric_source(context: AnalysisContext) -> Callable[[str], Any]:
+    """model_key → numeric estimate; the shared prescreen inputs are built on first use."""
+    inputs: Optional[NumericInputs] = None
+
+    def estimate(model_key: str) -> Any:
+        nonlocal inputs
+        if inputs is None:
+            inputs = NumericInputs(context)
+        return NUMERIC_MODELS[model_key](inputs)
+
+    return estimate
+
+
+def _numeric_node(key: str, estimate: Callable[[str], Any]) -> Callable[[], Awaitable[Any]]:
+    async def run():
+        return estimate(key)
+    return run
+
+
+def _tag(result: Any, provenance: str) -> Any:
+    if result.provenance is None:
+        result.provenance = provenance
+    return result
+
+
+def _llm_node(key: str, make_coro: Callable[[], Awaitable[Any]],
+              estimate: Callable[[str], Any], refine: bool = False) -> Callable[[], Awaitable[Any]]:
+    """
+    Guarded LLM call that degrades to the numeric estimate when the LLM is
+    unavailable — or, with refine=True, when the call fails for any reason.
+    """
+    async def run():
+        try:
+            result = await _run_with_guard(make_coro())
+        except Exception as e:
+            if not (refine or (isinstance(e, LLMUnavailableError) and LLM_FALLBACK_ENABLED)):
+                raise
+            logger.warning(f"{key}: LLM failed ({type(e).__name__}: {e}) — using numeric estimate")
+            fallback = lambda k: estimate(k).model_copy(update={"provenance": "numeric_fallback"})
+            if key == _BATCH_NODE:
+                return {k: fallback(k) for k in _BATCH_KEYS}
+            return fallback(key)
+        if key == _BATCH_NODE:
+            return {k: _tag(r, "llm") for k, r in result.items()}
+        return _tag(result, "llm")
+    return run
+
+
+def _synthesis_provenance(models: Sequence[Any]) -> str:
+    # A computed Model 3 is final whatever the other models are, so it doesn't count as a mix
+    kinds = {m.provenance for m in models}
+    if len(kinds) > 1:
+        kinds.discard("computed")
+    return kinds.pop() if len(kinds) == 1 else "mixed"
+
+
+async def _synthesize(context: AnalysisContext, *models: Any) -> Model9Result:
+    result = await run_model_9(context, *models)
+    result.provenance = _synthesis_provenance(models)
+    return result
+
+
+def build_pipeline(
+    context: AnalysisContext,
+    batch_mode: Optional[bool] = None,
+    mode: Optional[str] = None,
+) -> List[DAGNode]:
+    """
+    Nodes for one analysis. Every LLM node acquires the global semaphore;
+    Model 9 is local arithmetic and depends on all model results.
+    mode="instant" replaces the LLM nodes with numeric estimates; "llm" and
+    "refine" both run the LLM (refine's estimate is stored before the run,
+    and any LLM error keeps it).
+    """
+    if batch_mode is None:
+        batch_mode = LLM_BATCH_MODE
+    if mode is None:
+        mode = ANALYSIS_MODE
+    estimate = _numeric_source(context)
+    refine = mode == "refine"
+
+    if mode == "instant":
+        nodes = [DAGNode(f"model_{i}", _numeric_node(f"model_{i}", estimate)) for i in range(1, 9)]
+    else:
+        nodes = [DAGNode("model_1", _llm_node("model_1", lambda: run_model_1(context), estimate, refine))]
+
+        if batch_mode:
+            nodes.append(DAGNode(_BATCH_NODE, _llm_node(
+                _BATCH_NODE, lambda: run_models_2_to_8_batched(context), estimate, refine,
+            )))
+            nodes.append(DAGNode(
+                "model_9",
+                lambda m1, rest: _synthesize(context, m1, *rest.values()),
+                deps=("model_1", _BATCH_NODE),
+            ))
+            return nodes
+
+        runners = [run_model_2, run_model_3, run_model_4, run_model_5, run_model_6, run_model_7, run_model_8]
+        for i, runner in enumerate(runners, start=2):
+            nodes.append(DAGNode(
+                f"model_{i}",
+                _llm_node(f"model_{i}", lambda runner=runner: runner(context), estimate, refine),
+            ))
+    nodes.append(DAGNode(
+        "model_9",
+        lambda *models: _synthesize(context, *models),
+        deps=tuple(f"model_{i}" for i in range(1, 9)),
+    ))
+    return nodes
+
+
+def _expand(key: str, result: Any) -> Dict[str, Any]:
+    """Node result → {"model_N": result}; the batch node yields seven at once."""
+    return dict(result) if key == _BATCH_NODE else {key: result}
+
+
+async def run_pipeline(
+    context: AnalysisContext,
+    on_complete: Optional[Callable[[str, Any, Dict[str, float]], None]] = None,
+    mode: Optional[str] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Dict[str, float]]]:
+    """Run the DAG. Returns ({"model_1".."model_9": result}, per-node timings)."""
+    scheduler = DAGScheduler(build_pipeline(context, mode=mode), on_complete=on_complete)
+    node_results = await scheduler.run()
+    results: Dict[str, Any] = {}
+    for key, result in node_results.items():
+        results.update(_expand(key, result))
+    return results, scheduler.timings
 
 
-async def run_sequential_remaining_models(context: AnalysisContext, m1_result: Model1Result, job_id: str) -> Dict[str, Any]:
+def _build_response(context: AnalysisContext, results: Dict[str, Any]) -> FullAnalysisResponse:
+    return FullAnalysisResponse(
+        final_decision=results["model_9"],
+        model_outputs={out_key: results[key].model_dump() for key, out_key in _OUTPUT_KEYS.items()},
+        analysis_context=context.model_dump(),
+    )
+
+
+# ─── Background jobs ──────────────────────────────────────────────────────────
+
+def _job_progress(job_id: str) -> Callable[[str, Any, Dict[str, float]], None]:
+    """
+    DAG completion callback that streams each result into AnalysisJobStore.
+    Models finish out of order, so the status reflects how many are done
+    (processing_model_N = N-1 models complete) rather than which one runs.
+    """
+    from backend.services.analysis_job_store import AnalysisJobStore, AnalysisStatus
+
+    completed: set = set()
+
+    def on_complete(key: str, result: Any, timing: Dict[str, float]) -> None:
+        for model_key, model_result in _expand(key, result).items():
+            data = model_result.model_dump()
+            if model_key == "model_1":
+                AnalysisJobStore.set_model_1_result(job_id, data)
+            else:
+                AnalysisJobStore.set_model_result(job_id, model_key, data)
+                AnalysisJobStore.add_completed_step(job_id, _STEP_LABELS[model_key])
+            completed.add(model_key)
+        AnalysisJobStore.set_node_timing(job_id, key, timing)
+        if len(completed) < _TOTAL_MODELS:
+            AnalysisJobStore.update_status(job_id, AnalysisStatus(f"processing_model_{len(completed) + 1}"))
+
+    return on_complete
+
+
+def estimate_models(context: AnalysisContext) -> Dict[str, Any]:
+    """Numeric Models 1–8 plus the local Model 9 — no LLM, milliseconds."""
+    results = run_numeric_models(context)
+    synthesis = compute_synthesis(context, *results.values())
+    synthesis.provenance = "numeric"
+    results["model_9"] = synthesis
+    return results
+
+
+def store_estimates(context: AnalysisContext, job_id: str) -> Dict[str, Any]:
     """
-    Run Models 2-8 sequentially (Model 9 synthesis removed — top crops are
-    computed client-side from Models 1-8 aggregate scores).
-    After each model completes, store its result so the frontend can
-    progressively display each card.
+    Refine mode, phase one: store a numeric estimate for every model in one
+    job-store write. Returns the estimated FullAnalysisResponse as a dict.
+    """
+    from backend.services.analysis_job_store import AnalysisJobStore
+
+    results = estimate_models(context)
+    AnalysisJobStore.set_model_results(job_id, {key: r.model_dump() for key, r in results.items()})
+    logger.info(f"Job {job_id}: numeric estimates stored for all {_TOTAL_MODELS} models")
+    return _build_response(context, results).model_dump()
+
+
+async def run_analysis_job(context: AnalysisContext, job_id: str, mode: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run the full pipeline for a background job, storing every model result
+    as it completes (replacing any refine-mode estimate). Returns the
+    FullAnalysisResponse as a dict; the caller stores it with set_full_result
+    (which marks the job COMPLETED).
     """
     from backend.services.analysis_job_store import AnalysisJobStore, AnalysisStatus
 
-    # ── Models 2–9: each acquires the global semaphore before LLM call ─────
-    # This ensures no two analyses fire OpenRouter simultaneously on the free tier.
-    _INTER_MODEL_DELAY = 3.0  # seconds between models (free tier: ~20 req/min)
-
-    # Model 2
-    logger.info("Starting Model 2...")
-    AnalysisJobStore.update_status(job_id, AnalysisStatus.PROCESSING_MODEL_2)
-    await asyncio.sleep(_INTER_MODEL_DELAY)
-    m2_result = await _run_with_guard(run_model_2(context))
-    AnalysisJobStore.set_model_result(job_id, "model_2", m2_result.model_dump())
-    AnalysisJobStore.add_completed_step(job_id, "Soil Analysis")
-
-    # Model 3
-    logger.info("Starting Model 3...")
-    AnalysisJobStore.update_status(job_id, AnalysisStatus.PROCESSING_MODEL_3)
-    await asyncio.sleep(_INTER_MODEL_DELAY)
-    m3_result = await _run_with_guard(run_model_3(context))
-    AnalysisJobStore.set_model_result(job_id, "model_3", m3_result.model_dump())
-    AnalysisJobStore.add_completed_step(job_id, "Water Balance")
-
-    # Model 4
-    logger.info("Starting Model 4...")
-    AnalysisJobStore.update_status(job_id, AnalysisStatus.PROCESSING_MODEL_4)
-    await asyncio.sleep(_INTER_MODEL_DELAY)
-    m4_result = await _run_with_guard(run_model_4(context))
-    AnalysisJobStore.set_model_result(job_id, "model_4", m4_result.model_dump())
-    AnalysisJobStore.add_completed_step(job_id, "Climate Analysis")
-
-    # Model 5
-    logger.info("Starting Model 5...")
-    AnalysisJobStore.update_status(job_id, AnalysisStatus.PROCESSING_MODEL_5)
-    await asyncio.sleep(_INTER_MODEL_DELAY)
-    m5_result = await _run_with_guard(run_model_5(context))
-    AnalysisJobStore.set_model_result(job_id, "model_5", m5_result.model_dump())
-    AnalysisJobStore.add_completed_step(job_id, "Economic Viability")
-
-    # Model 6
-    logger.info("Starting Model 6...")
-    AnalysisJobStore.update_status(job_id, AnalysisStatus.PROCESSING_MODEL_6)
-    await asyncio.sleep(_INTER_MODEL_DELAY)
-    m6_result = await _run_with_guard(run_model_6(context))
-    AnalysisJobStore.set_model_result(job_id, "model_6", m6_result.model_dump())
-    AnalysisJobStore.add_completed_step(job_id, "Risk Assessment")
-
-    # Model 7
-    logger.info("Starting Model 7...")
-    AnalysisJobStore.update_status(job_id, AnalysisStatus.PROCESSING_MODEL_7)
-    await asyncio.sleep(_INTER_MODEL_DELAY)
-    m7_result = await _run_with_guard(run_model_7(context))
-    AnalysisJobStore.set_model_result(job_id, "model_7", m7_result.model_dump())
-    AnalysisJobStore.add_completed_step(job_id, "Market Access")
-
-    # Model 8
-    logger.info("Starting Model 8...")
-    AnalysisJobStore.update_status(job_id, AnalysisStatus.PROCESSING_MODEL_8)
-    await asyncio.sleep(_INTER_MODEL_DELAY)
-    m8_result = await _run_with_guard(run_model_8(context))
-    AnalysisJobStore.set_model_result(job_id, "model_8", m8_result.model_dump())
-    AnalysisJobStore.add_completed_step(job_id, "Demand Analysis")
-
-    # ─── All 8 models done — mark job completed ───────────────────────────────
-    model_outputs: Dict[str, Any] = {
-        "model_1_rainfall":      m1_result.model_dump(),
-        "model_2_soil_moisture": m2_result.model_dump(),
-        "model_3_water_balance": m3_result.model_dump(),
-        "model_4_climate":       m4_result.model_dump(),
-        "model_5_economic":      m5_result.model_dump(),
-        "model_6_risk":          m6_result.model_dump(),
-        "model_7_market_access": m7_result.model_dump(),
-        "model_8_demand":        m8_result.model_dump(),
-    }
-    AnalysisJobStore.set_full_result(job_id, {"model_outputs": model_outputs})
-    logger.info(f"Job {job_id}: all 8 models complete, status=COMPLETED")
-    return model_outputs
-
-
-async def run_full_analysis(context: AnalysisContext) -> FullAnalysisResponse:
+    AnalysisJobStore.update_status(job_id, AnalysisStatus.PROCESSING_MODEL_1)
+    results, timings = await run_pipeline(context, on_complete=_job_progress(job_id), mode=mode)
+    logger.info(f"Job {job_id}: all {_TOTAL_MODELS} models complete")
+    return _build_response(context, results).model_dump()
+
+
+# ─── Synchronous endpoint ─────────────────────────────────────────────────────
+
+async def run_full_analysis(context: AnalysisContext, mode: Optional[str] = None) -> FullAnalysisResponse:
     """
     Execute the full 9-model agricultural decision pipeline.
+    mode overrides ANALYSIS_MODE ("refine" here means LLM with numeric fallback on any error).
     """
     crop_names = [c.name for c in context.selected_crops]
     logger.info(f"Starting full 9-model analysis for crops: {crop_names}")
 
-    # ─── Step 1: Parallel execution of Models 1–8 ───────────────────────────
-    logger.info("Launching Models 1–8 in parallel...")
     t0 = time.perf_counter()
-    (
-        m1_result,
-        m2_result,
-        m3_result,
-        m4_result,
-        m5_result,
-        m6_result,
-        m7_result,
-        m8_result,
-    ) = await asyncio.gather(
-        run_model_1(context),
-        run_model_2(context),
-        run_model_3(context),
-        run_model_4(context),
-        run_model_5(context),
-        run_model_6(context),
-        run_model_7(context),
-        run_model_8(context),
-    )
-    parallel_ms = (time.perf_counter() - t0) * 1000
-    logger.info(f"Models 1–8 parallel complete in {parallel_ms:.0f}ms. Running Model 9 synthesis...")
-
-    # ─── Step 2: Model 9 Synthesis ──────────────────────────────────────────
-    t1 = time.perf_counter()
-    m9_result: Model9Result = await run_model_9(
-        context,
-        m1_result,
-        m2_result,
-        m3_result,
-        m4_result,
-        m5_result,
-        m6_result,
-        m7_result,
-        m8_result,
-    )
-    synth_ms = (time.perf_counter() - t1) * 1000
-    total_ms = parallel_ms + synth_ms
+    results, timings = await run_pipeline(context, mode=mode)
+    total_ms = (time.perf_counter() - t0) * 1000
+
+    m9_result: Model9Result = results["model_9"]
+    slowest = max((k for k in timings if k != "model_9"), key=lambda k: timings[k]["duration_ms"])
     logger.info(
         f"Full analysis complete in {total_ms:.0f}ms "
-        f"(parallel={parallel_ms:.0f}ms, synthesis={synth_ms:.0f}ms). "
+        f"(critical path via {slowest}={timings[slowest]['duration_ms']:.0f}ms, "
+        f"synthesis={timings['model_9']['duration_ms']:.0f}ms). "
         f"Best crop ID: {m9_result.best_crop_id}, Confidence: {m9_result.confidence_score}"
     )
-
-    # ─── Step 3: Build response ──────────────────────────────────────────────
-    model_outputs: Dict[str, Any] = {
-        "model_1_rainfall": m1_result.model_dump(),
-        "model_2_soil_moisture": m2_result.model_dump(),
-        "model_3_water_balance": m3_result.model_dump(),
-        "model_4_climate": m4_result.model_dump(),
-        "model_5_economic": m5_result.model_dump(),
-        "model_6_risk": m6_result.model_dump(),
-        "model_7_market_access": m7_result.model_dump(),
-        "model_8_demand": m8_result.model_dump(),
-    }
-
-    return FullAnalysisResponse(
-        final_decision=m9_result,
-        model_outputs=model_outputs,
-        analysis_context=context.model_dump(),
-    )
+    return _build_response(context, results)
@@ -1,8 +1,12 @@
 import asyncio
-from typing import List, Any
+import logging
+from typing import List, Any, Optional, Sequence, Tuple
 from abc import ABC, abstractmethod
+from backend.config import LEGACY_ANALYZE_CONCURRENCY
 from backend.models import ProcessedFarmInput, EnvironmentalData, Crop, ModelResult, DataPoints, Risk
 
+logger = logging.getLogger(__name__)
+
 class BaseDecisionModel(ABC):
     def __init__(self, ctx: ProcessedFarmInput, env: EnvironmentalData, crop: Crop):
         self.ctx = ctx
@@ -31,20 +35,20 @@ class LandFeasibilityModel(BaseDecisionModel):
         )
 
 class SoilAnalysisModel(BaseDecisionModel):
-    async def run(self) -> ModelResult:
+    @staticmethod
+    def assess(user_soil: Optional[str], crop_soil: Optional[str]) -> Tuple[int, str]:
+        """Soil-type match score and its label (also used by numeric Model 2)."""
         # Real Logic: Match user soil type with crop preference
-        score = 60 # Default baseline
-        match_quality = "Poor"
-        
+        if user_soil and crop_soil:
+            if user_soil.lower() in crop_soil.lower():
+                return 95, "Excellent"
+            return 40, "Sub-optimal"
+        return 60, "Poor"  # Default baseline
+
+    async def run(self) -> ModelResult:
         user_soil = self.ctx.original_input.soil_type
-        if user_soil and self.crop.soil_type:
-            if user_soil.lower() in self.crop.soil_type.lower():
-                score = 95
-                match_quality = "Excellent"
-            else:
-                score = 40
-                match_quality = "Sub-optimal"
-        
+        score, match_quality = self.assess(user_soil, self.crop.soil_type)
+
         return ModelResult(
             id=2,
             name="Soil Analysis",
@@ -57,23 +61,59 @@ class SoilAnalysisModel(BaseDecisionModel):
             ],
             status="Green" if score > 80 else "Yellow" if score > 50 else "Red"
         )
-# ... WaterBalanceModel is good ...
 
-class ClimateModel(BaseDecisionModel):
+class WaterBalanceModel(BaseDecisionModel):
     async def run(self) -> ModelResult:
+        # Real Logic: Seasonal water supply (rain + irrigation) vs crop requirement
+        # NASA window is 6 months — annualize like the prescreen engine does
+        rain = self.env.rainfall_total * 2.0
+        supply = rain * self.ctx.water_multiplier
+        need = self.crop.water_requirement_mm or self.crop.min_rainfall or 500.0
+        ceiling = self.crop.max_rainfall or need * 2
+        ratio = supply / need if need > 0 else 1.0
+
+        if ratio >= 1.0:
+            score = 90
+            balance = "Sufficient"
+            if rain > ceiling * 1.5:
+                score = 65
+                balance = "Excess (waterlogging risk)"
+        else:
+            score = max(20, round(90 * ratio))
+            balance = "Deficit"
+
+        return ModelResult(
+            id=3,
+            name="Water Balance",
+            score=score,
+            confidence=75,
+            summary=f"Water supply {supply:.0f} mm vs requirement {need:.0f} mm: {balance}.",
+            reasoning_steps=[
+                f"Annualized rainfall: {rain:.0f} mm",
+                f"Water source multiplier: {self.ctx.water_multiplier}",
+                f"Crop requirement: {need:.0f} mm (max tolerated rain {ceiling:.0f} mm)",
+            ],
+            data_points=DataPoints(rainfall_next_14_days=self.env.forecast_rain_next_14_days),
+            status="Green" if score > 75 else "Yellow" if score > 45 else "Red"
+        )
+
+class ClimateModel(BaseDecisionModel):
+    @staticmethod
+    def assess(env: EnvironmentalData, crop: Crop) -> Tuple[int, List[str]]:
+        """Climate suitability score and the checks behind it (also used by numeric Model 4)."""
         # Real Logic: Use Env Data vs Crop Constraints
         score = 0
         checks = []
         
         # Temp check
-        if self.crop.min_temp <= self.env.avg_temp <= self.crop.max_temp:
+        if crop.min_temp <= env.avg_temp <= crop.max_temp:
             score += 40
             checks.append("Avg Temp within optimal range.")
         else:
-            checks.append(f"Avg Temp {self.env.avg_temp} outside {self.crop.min_temp}-{self.crop.max_temp}")
+            checks.append(f"Avg Temp {env.avg_temp} outside {crop.min_temp}-{crop.max_temp}")
             
         # Rainfall/Moisture check for this specific model view
-        if self.env.rainfall_total >= self.crop.min_rainfall:
+        if env.rainfall_total >= crop.min_rainfall:
             score += 30
             checks.append("Rainfall sufficient.")
         else:
@@ -81,16 +121,19 @@ class ClimateModel(BaseDecisionModel):
             checks.append("Rainfall deficit.")
 
         # GDD check (Simple proxy)
-        if self.env.gdd > 1000: 
+        if env.gdd > 1000: 
             score += 20
             checks.append("Good GDD accumulation.")
             
         # Stress check
-        if self.env.heat_stress_days > 5 and self.crop.max_temp < 35:
+        if env.heat_stress_days > 5 and crop.max_temp < 35:
             score -= 10
             checks.append("Heat stress warning.")
             
-        score = min(100, max(0, score + 10)) # Base
+        return min(100, max(0, score + 10)), checks  # Base
+
+    async def run(self) -> ModelResult:
+        score, checks = self.assess(self.env, self.crop)
 
         return ModelResult(
             id=4,
@@ -103,32 +146,68 @@ class ClimateModel(BaseDecisionModel):
             status="Green" if score > 75 else "Yellow"
         )
 
-# ... EconomicViabilityModel is good ...
+class EconomicViabilityModel(BaseDecisionModel):
+    async def run(self) -> ModelResult:
+        # Real Logic: Per-acre ROI from DB yield, price and input cost vs user budget
+        cost = max(self.crop.input_cost_per_acre or 0.0, 1.0)
+        revenue = (self.crop.yield_quintal_per_acre or 0.0) * (self.crop.market_price_per_quintal or 0.0)
+        profit = revenue - cost
+        roi = profit / cost
+
+        score = min(100, max(0, round(50 + roi * 25)))
+        steps = [
+            f"Revenue/acre: ₹{revenue:,.0f}",
+            f"Input cost/acre: ₹{cost:,.0f}",
+            f"ROI: {roi * 100:.0f}%",
+        ]
+
+        budget = self.ctx.original_input.budget
+        if budget and budget < cost:
+            score = max(0, score - 20)
+            steps.append(f"Budget ₹{budget:,.0f} below input cost.")
+
+        return ModelResult(
+            id=5,
+            name="Economic Viability",
+            score=score,
+            confidence=70,
+            summary=f"Expected profit ₹{profit:,.0f}/acre ({roi * 100:.0f}% ROI).",
+            reasoning_steps=steps,
+            status="Green" if score > 75 else "Yellow" if score > 45 else "Red"
+        )
+
 
 class RiskAssessmentModel(BaseDecisionModel):
-    async def run(self) -> ModelResult:
+    @staticmethod
+    def assess(env: EnvironmentalData, crop: Crop) -> Tuple[int, List[str]]:
+        """Safety score (higher = safer) and risk factors (also used by numeric Model 6)."""
         # Real Logic: Use DB Risk Factor + Env Risks
         base_score = 90
         
         factors = []
         
         # 1. Intrinsic Crop Risk
-        if self.crop.risk_factor == "High":
+        if crop.risk_factor == "High":
             base_score -= 30
             factors.append("High intrinsic crop risk.")
-        elif self.crop.risk_factor == "Medium":
+        elif crop.risk_factor == "Medium":
             base_score -= 15
             factors.append("Medium intrinsic crop risk.")
             
         # 2. Environmental Risk
-        if self.env.dry_spell_days > 10:
+        if env.dry_spell_days > 10:
             base_score -= 10
             factors.append("High dry spell risk.")
             
-        if self.env.rainfall_variability > 50: # High CV
+        if env.rainfall_variability > 50: # High CV
             base_score -= 10
             factors.append("High rainfall variability.")
-            
+
+        return base_score, factors
+
+    async def run(self) -> ModelResult:
+        base_score, factors = self.assess(self.env, self.crop)
+
         return ModelResult(
             id=6,
             name="Risk Assessment",
@@ -159,3 +238,27 @@ class ModelOrchestrator:
         # Parallel Execution
         results = await asyncio.gather(*(model.run() for model in models))
         return list(results)
+
+    @classmethod
+    async def run_for_candidates(
+        cls,
+        ctx: ProcessedFarmInput,
+        env: EnvironmentalData,
+        crops: Sequence[Crop],
+        concurrency: Optional[int] = None,
+    ) -> List[Tuple[Crop, List[ModelResult]]]:
+        """
+        Run all models for every candidate crop concurrently (bounded by a
+        semaphore), so latency tracks the slowest crop instead of the sum.
+        Results keep the order of `crops`.
+        """
+        semaphore = asyncio.Semaphore(concurrency or LEGACY_ANALYZE_CONCURRENCY)
+
+        async def run_one(crop: Crop) -> List[ModelResult]:
+            async with semaphore:
+                return await cls.run_all_models(ctx, env, crop)
+
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(run_one(crop)) for crop in crops]
+        logger.info(f"[ModelOrchestrator] Ran models for {len(crops)} candidate crops")
+        return [(crop, task.result()) for crop, task in zip(crops, tasks)]
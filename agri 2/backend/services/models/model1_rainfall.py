@@ -1,8 +1,9 @@
 """Model 1 – Rainfall Feasibility Analysis"""
-import json, logging
+import logging
 from backend.services.openrouter_client import call_llm
 from backend.services.models.schemas import AnalysisContext, Model1Result
 from backend.services.models.llm_parse_utils import safe_parse_base_result
+from backend.services.models.prompt_encoder import encode_context, log_prompt_tokens
 from backend.config import OPENROUTER_MODEL_SMALL
 
 logger = logging.getLogger(__name__)
@@ -32,7 +33,8 @@ Return ONLY valid JSON (no markdown, no explanation):
 }"""
 
 async def run_model_1(context: AnalysisContext) -> Model1Result:
-    user_prompt = json.dumps(context.model_dump(), indent=2)
+    user_prompt = encode_context(context, "rainfall")
     logger.info(f"Model 1 (Rainfall): analyzing {len(context.selected_crops)} crops")
+    log_prompt_tokens("Model 1 (Rainfall)", SYSTEM_PROMPT, user_prompt)
     raw = await call_llm(SYSTEM_PROMPT, user_prompt, model=OPENROUTER_MODEL_SMALL, max_tokens=500)
     return Model1Result(**safe_parse_base_result(raw, "rainfall_feasibility"))
@@ -1,8 +1,21 @@
-"""Model 3 – Water Balance Analysis"""
-import json, logging
+"""Model 3 – Water Balance Analysis
+
+MODEL3_MODE selects the engine:
+- "numeric": FAO-56 ET₀ × Kc daily water balance (services/water_balance.py),
+  deterministic and millisecond-scale, no LLM call
+- "hybrid":  the numeric balance is computed first and handed to the LLM as input
+- "llm":     the original LLM-only analysis
+Numeric modes fall back to the LLM when the context carries no ET₀.
+The FAO-56 result is final, not an estimate awaiting the LLM, so it is
+tagged provenance="computed".
+"""
+import logging
 from backend.services.openrouter_client import call_llm
 from backend.services.models.schemas import AnalysisContext, Model3Result
 from backend.services.models.llm_parse_utils import safe_parse_base_result
+from backend.services.models.prompt_encoder import encode_context, log_prompt_tokens
+from backend.services.water_balance import crop_water_balance, water_balance_score
+import backend.config as cfg
 from backend.config import OPENROUTER_MODEL_SMALL
 
 logger = logging.getLogger(__name__)
@@ -30,8 +43,76 @@ Return ONLY valid JSON (no markdown, no explanation):
   "confidence": <0-100>
 }"""
 
+
+def numeric_available(context: AnalysisContext) -> bool:
+    env = context.environment
+    return bool(env.daily_et0_mm) or env.et0_mm_day is not None
+
+
+def run_numeric_model_3(context: AnalysisContext) -> Model3Result:
+    """Water balance from daily ET₀, crop Kc curves and rainfall — no LLM."""
+    env = context.environment
+    if env.daily_et0_mm:
+        et0, rain, confidence = env.daily_et0_mm, env.daily_rain_mm or [0.0] * len(env.daily_et0_mm), 85
+    else:
+        # Only the window means are known: spread them evenly over the window
+        days = cfg.NASA_WINDOW_DAYS + 1
+        et0, rain, confidence = [env.et0_mm_day] * days, [env.rainfall_mm / days] * days, 70
+
+    balances = crop_water_balance(
+        context.selected_crops, et0, rain,
+        context.user.water_availability,
+        initial_soil_moisture=env.soil_moisture_percent,
+    )
+    crop_scores, risk_factors = {}, {}
+    for crop in context.selected_crops:
+        balance = balances[str(crop.id)]
+        score, status = water_balance_score(balance)
+        crop_scores[str(crop.id)] = score
+        risk_factors[str(crop.id)] = {**balance, "status": status}
+
+    names = {str(c.id): c.name for c in context.selected_crops}
+    best = max(crop_scores, key=crop_scores.get)
+    thirstiest = max(balances, key=lambda k: balances[k]["unmet_deficit_mm"])
+    key_findings = [
+        f"Reference ET₀ averages {sum(et0) / len(et0):.1f} mm/day over the recent window",
+        f"{names[best]} has the best water balance ({risk_factors[best]['status']}, "
+        f"ETc {balances[best]['etc_mm']:g} mm)",
+    ]
+    if balances[thirstiest]["unmet_deficit_mm"] > 0:
+        key_findings.append(
+            f"{names[thirstiest]} would lack {balances[thirstiest]['unmet_deficit_mm']:g} mm "
+            f"with {context.user.water_availability} water"
+        )
+    return Model3Result(
+        model_name="water_balance",
+        crop_scores=crop_scores,
+        risk_factors=risk_factors,
+        key_findings=key_findings,
+        confidence=confidence,
+        provenance="computed",
+    )
+
+
 async def run_model_3(context: AnalysisContext) -> Model3Result:
-    user_prompt = json.dumps(context.model_dump(), indent=2)
+    mode = cfg.MODEL3_MODE
+    if mode != "llm" and not numeric_available(context):
+        logger.info("Model 3 (Water): no ET₀ in context, using the LLM")
+        mode = "llm"
+    if mode == "numeric":
+        logger.info(f"Model 3 (Water): numeric balance for {len(context.selected_crops)} crops")
+        return run_numeric_model_3(context)
+
+    user_prompt = encode_context(context, "water_balance")
+    if mode == "hybrid":
+        numeric = run_numeric_model_3(context)
+        rows = [
+            f"{crop_id},{r['etc_mm']:g},{r['effective_rain_mm']:g},{r['deficit_mm']:g},{r['surplus_mm']:g}"
+            for crop_id, r in numeric.risk_factors.items()
+        ]
+        user_prompt += "\nBALANCE (FAO-56, use these figures)\nid,etc_mm,effective_rain_mm,deficit_mm,surplus_mm\n"
+        user_prompt += "\n".join(rows)
     logger.info(f"Model 3 (Water): analyzing {len(context.selected_crops)} crops")
+    log_prompt_tokens("Model 3 (Water)", SYSTEM_PROMPT, user_prompt)
     raw = await call_llm(SYSTEM_PROMPT, user_prompt, model=OPENROUTER_MODEL_SMALL, max_tokens=500)
     return Model3Result(**safe_parse_base_result(raw, "water_balance"))
@@ -1,8 +1,9 @@
 """Model 4 – Climate & Thermal Analysis"""
-import json, logging
+import logging
 from backend.services.openrouter_client import call_llm
 from backend.services.models.schemas import AnalysisContext, Model4Result
 from backend.services.models.llm_parse_utils import safe_parse_base_result
+from backend.services.models.prompt_encoder import encode_context, log_prompt_tokens
 from backend.config import OPENROUTER_MODEL_SMALL
 
 logger = logging.getLogger(__name__)
@@ -31,7 +32,8 @@ Return ONLY valid JSON (no markdown, no explanation):
 }"""
 
 async def run_model_4(context: AnalysisContext) -> Model4Result:
-    user_prompt = json.dumps(context.model_dump(), indent=2)
+    user_prompt = encode_context(context, "climate")
     logger.info(f"Model 4 (Climate): analyzing {len(context.selected_crops)} crops")
+    log_prompt_tokens("Model 4 (Climate)", SYSTEM_PROMPT, user_prompt)
     raw = await call_llm(SYSTEM_PROMPT, user_prompt, model=OPENROUTER_MODEL_SMALL, max_tokens=500)
     return Model4Result(**safe_parse_base_result(raw, "climate_thermal"))
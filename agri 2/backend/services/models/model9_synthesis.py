@@ -1,78 +1,91 @@
 """
 Model 9 – Final Agricultural Decision Synthesis Engine
+
+The decision itself is deterministic arithmetic over the Model 1–8 outputs
+(computed here with NumPy). The LLM is optionally used only to phrase
+reasoning_summary (config.MODEL9_LLM_SUMMARY).
+
+Scoring formula:
+- base_score = (rainfall×0.12 + soil_moisture×0.10 + water_balance×0.10 +
+               climate×0.15 + economic×0.18 + demand×0.12 + market_access×0.08) / 0.85
+- risk_penalty = risk_index × 0.25  (risk_index from Model 6)
+- overall_score = max(0, min(100, round(base_score - risk_penalty)))
+
+risk_level:       "Low" if risk_index < 35, "Moderate" if < 65, else "High"
+economic_outlook: "Strong" if economic_score >= 70 AND roi_probability >= 65,
+                  "Moderate" if economic_score >= 50, else "Weak"
 """
 
 import json
 import logging
+from typing import Any, Dict, List
+
+import numpy as np
+
 from backend.services.openrouter_client import call_llm
+from backend.services.models.prompt_encoder import encode_context, log_prompt_tokens
 from backend.services.models.schemas import (
-    AnalysisContext,
+    AnalysisContext, BaseModelResult,
     Model1Result, Model2Result, Model3Result, Model4Result,
     Model5Result, Model6Result, Model7Result, Model8Result,
     Model9Result, DecisionMatrixEntry
 )
-from backend.config import OPENROUTER_MODEL_SYNTHESIS
+from backend.config import OPENROUTER_MODEL_SYNTHESIS, MODEL9_LLM_SUMMARY
 
 logger = logging.getLogger(__name__)
 
-SYSTEM_PROMPT = """You are Model 9: Final Agricultural Decision Synthesis Engine.
-
-You are the master reasoning engine of a multi-model agricultural AI system.
-You receive structured outputs from 8 specialist analytical models that have evaluated 3 crops.
-
-Your responsibilities:
-1. Integrate all model scores for each crop into a unified overall_score
-2. Normalize cross-model inconsistencies
-3. Apply risk penalties: High risk_index from Model 6 must reduce overall_score significantly
-4. Evaluate long-term sustainability
-5. Identify the BEST crop (highest overall_score after risk adjustment)
-6. Identify 2 ALTERNATIVE crops (next best options)
-7. Recommend cropping_system
-8. Compute confidence_score
-
-Scoring formula (use this exactly):
-- base_score = (rainfall_score×0.12 + soil_moisture_score×0.10 + water_balance_score×0.10 + 
-               climate_score×0.15 + economic_score×0.18 + demand_score×0.12 + 
-               market_access_score×0.08) / 0.85
-- risk_penalty = risk_index × 0.25  (subtract from base_score)
-- overall_score = max(0, min(100, round(base_score - risk_penalty)))
+# Column order of the score matrix: rainfall, soil, water, climate, economic, demand, market
+SCORE_WEIGHTS = np.array([0.12, 0.10, 0.10, 0.15, 0.18, 0.12, 0.08])
+WEIGHT_TOTAL = 0.85
+RISK_PENALTY_FACTOR = 0.25
 
-risk_level:
-- "Low" if risk_index < 35
-- "Moderate" if risk_index < 65
-- "High" otherwise
+SUMMARY_PROMPT = """You are Model 9: Final Agricultural Decision Synthesis Engine.
 
-economic_outlook:
-- "Strong" if economic_score >= 70 AND roi_probability >= 65
-- "Moderate" if economic_score >= 50
-- "Weak" otherwise
+The decision below has already been computed from 8 specialist models.
+Do NOT change any number or the crop ranking. Explain it to a farmer.
 
 Rules:
-- Return ONLY valid JSON. No prose.
-- reasoning_summary must be a single concise string.
-- cropping_system must be exactly: "Standalone", "Intercrop", or "Sequential"
-- decision_matrix keys must be crop_ids (strings).
+- Return ONLY valid JSON. No prose outside JSON.
+- reasoning_summary must be a single concise string (2-3 sentences).
 
 Output schema (strict):
-{
-  "best_crop_id": <int>,
-  "alternative_crop_ids": [<int>, <int>],
-  "confidence_score": <int 0-100>,
-  "cropping_system": "Standalone|Intercrop|Sequential",
-  "decision_matrix": {
-    "crop_id": {
-      "crop_id": <int>,
-      "overall_score": <int 0-100>,
-      "risk_adjusted_score": <int 0-100>,
-      "risk_level": "Low|Moderate|High",
-      "economic_outlook": "Strong|Moderate|Weak",
-      "climate_resilience": <int 0-100>
-    }
-  },
-  "reasoning_summary": "<concise explanation>"
-}"""
-
-async def run_model_9(
+{"reasoning_summary": "<concise explanation>"}"""
+
+
+def _crop_values(result: BaseModelResult, crop_ids: List[str], default: float = 0.0) -> np.ndarray:
+    return np.array([result.crop_scores.get(cid, default) for cid in crop_ids], dtype=float)
+
+
+def _risk_factor_values(result: BaseModelResult, crop_ids: List[str], field: str, fallback: np.ndarray) -> np.ndarray:
+    """Read a numeric risk_factors[crop_id][field], falling back per crop."""
+    values = fallback.copy()
+    for i, cid in enumerate(crop_ids):
+        factors = result.risk_factors.get(cid)
+        if isinstance(factors, dict):
+            try:
+                values[i] = float(factors[field])
+            except (KeyError, TypeError, ValueError):
+                pass
+    return values
+
+
+def _template_summary(context: AnalysisContext, ranked_ids: List[int], matrix: Dict[str, DecisionMatrixEntry]) -> str:
+    names = {c.id: c.name for c in context.selected_crops}
+    best = matrix[str(ranked_ids[0])]
+    summary = (
+        f"{names.get(ranked_ids[0], ranked_ids[0])} ranks highest with an overall score of "
+        f"{best.overall_score}/100, {best.risk_level.lower()} risk and a "
+        f"{best.economic_outlook.lower()} economic outlook."
+    )
+    if len(ranked_ids) > 1:
+        runner_up = matrix[str(ranked_ids[1])]
+        summary += (
+            f" {names.get(ranked_ids[1], ranked_ids[1])} follows at {runner_up.overall_score}/100."
+        )
+    return summary
+
+
+def compute_synthesis(
     context: AnalysisContext,
     m1: Model1Result,
     m2: Model2Result,
@@ -83,47 +96,108 @@ async def run_model_9(
     m7: Model7Result,
     m8: Model8Result,
 ) -> Model9Result:
-    """Run Final Synthesis."""
-    
-    # helper to extract scores safely
-    def get_score(model_res, crop_id):
-        return model_res.crop_scores.get(str(crop_id), 0)
-
-    # We construct a simplified input for the LLM to reduce token usage/complexity
-    # or we can pass full dumps. Let's pass full dumps but ensure keys are strings.
-    
-    synthesis_input = {
-        "analysis_context": {
-            "environment": context.environment.model_dump(),
-            "user": context.user.model_dump(),
-            "crops": [c.model_dump() for c in context.selected_crops],
-        },
-        "model_outputs": {
-             "model_1_rainfall": m1.model_dump(),
-             "model_2_soil": m2.model_dump(),
-             "model_3_water": m3.model_dump(),
-             "model_4_climate": m4.model_dump(),
-             "model_5_economic": m5.model_dump(),
-             "model_6_risk": m6.model_dump(),
-             "model_7_market": m7.model_dump(),
-             "model_8_demand": m8.model_dump(),
-        }
+    """Deterministic Model 9: score, rank and classify every selected crop."""
+    crop_ids = [str(c.id) for c in context.selected_crops]
+
+    # (n_crops, 7) score matrix in SCORE_WEIGHTS column order
+    scores = np.column_stack([
+        _crop_values(m, crop_ids) for m in (m1, m2, m3, m4, m5, m8, m7)
+    ])
+    base_score = scores @ SCORE_WEIGHTS / WEIGHT_TOTAL
+
+    # Model 6: higher crop_score = safer, so 100 - score stands in for a missing risk_index
+    safety = _crop_values(m6, crop_ids, default=50.0)
+    risk_index = np.clip(_risk_factor_values(m6, crop_ids, "risk_index", 100.0 - safety), 0, 100)
+    overall = np.clip(np.round(base_score - risk_index * RISK_PENALTY_FACTOR), 0, 100).astype(int)
+
+    economic = scores[:, 4]
+    roi_probability = _risk_factor_values(m5, crop_ids, "roi_probability", economic)
+    climate_resilience = np.clip(np.round(scores[:, [0, 2, 3]].mean(axis=1)), 0, 100).astype(int)
+
+    risk_level = np.where(risk_index < 35, "Low", np.where(risk_index < 65, "Moderate", "High"))
+    economic_outlook = np.where(
+        (economic >= 70) & (roi_probability >= 65), "Strong",
+        np.where(economic >= 50, "Moderate", "Weak"),
+    )
+
+    decision_matrix = {
+        cid: DecisionMatrixEntry(
+            crop_id=int(cid),
+            overall_score=int(overall[i]),
+            # Safety score: the frontend shows 100 - risk_adjusted_score as the risk
+            risk_adjusted_score=int(round(100 - risk_index[i])),
+            risk_level=str(risk_level[i]),
+            economic_outlook=str(economic_outlook[i]),
+            climate_resilience=int(climate_resilience[i]),
+        )
+        for i, cid in enumerate(crop_ids)
     }
 
-    user_prompt = json.dumps(synthesis_input, indent=2)
-
-    # COMBINE system prompt into user prompt because gemma-3-12b-it on OpenRouter 
+    # Stable sort keeps the user's selection order on ties
+    order = np.argsort(-overall, kind="stable")
+    ranked_ids = [int(crop_ids[i]) for i in order]
+
+    # Confidence: mean model confidence, nudged up by a clear winning margin
+    confidences = np.array([m.confidence for m in (m1, m2, m3, m4, m5, m6, m7, m8)], dtype=float)
+    margin = float(overall[order[0]] - overall[order[1]]) if len(order) > 1 else 10.0
+    confidence = int(np.clip(round(0.8 * confidences.mean() + min(margin, 20.0)), 0, 100))
+
+    return Model9Result(
+        best_crop_id=ranked_ids[0],
+        alternative_crop_ids=ranked_ids[1:3],
+        confidence_score=confidence,
+        cropping_system="Standalone",
+        decision_matrix=decision_matrix,
+        reasoning_summary=_template_summary(context, ranked_ids, decision_matrix),
+    )
+
+
+async def _llm_reasoning_summary(context: AnalysisContext, result: Model9Result) -> str:
+    """Ask the LLM to phrase the already computed decision."""
+    names = {str(c.id): c.name for c in context.selected_crops}
+    decision_input: Dict[str, Any] = {
+        "best_crop": names.get(str(result.best_crop_id)),
+        "alternatives": [names.get(str(a)) for a in result.alternative_crop_ids],
+        "decision_matrix": {
+            names.get(cid, cid): entry.model_dump(exclude={"crop_id"})
+            for cid, entry in result.decision_matrix.items()
+        },
+    }
+    # COMBINE system prompt into user prompt because gemma-3-12b-it on OpenRouter
     # throws 400 "Developer instruction is not enabled" if we use 'system' role.
-    combined_prompt = f"{SYSTEM_PROMPT}\n\nINPUT DATA:\n{user_prompt}"
-
-    logger.info("Model 9 (Synthesis): running final decision synthesis")
-    
-    # Pass empty system prompt, putting everything in user prompt
-    raw = await call_llm("", combined_prompt,
-                         model=OPENROUTER_MODEL_SYNTHESIS, max_tokens=800)
+    combined_prompt = (
+        f"{SUMMARY_PROMPT}\n\nDECISION:\n{json.dumps(decision_input, separators=(',', ':'))}"
+        f"\n\nCONTEXT:\n{encode_context(context, 'synthesis')}"
+    )
+    log_prompt_tokens("Model 9 (Summary)", "", combined_prompt)
+    raw = await call_llm("", combined_prompt, model=OPENROUTER_MODEL_SYNTHESIS, max_tokens=200)
+    summary = raw.get("reasoning_summary")
+    if not isinstance(summary, str) or not summary.strip():
+        raise ValueError("LLM summary missing reasoning_summary")
+    return summary.strip()
 
-    # Ensure decision_matrix keys are strings
-    if "decision_matrix" in raw:
-        raw["decision_matrix"] = {str(k): v for k, v in raw["decision_matrix"].items()}
 
-    return Model9Result(**raw)
+async def run_model_9(
+    context: AnalysisContext,
+    m1: Model1Result,
+    m2: Model2Result,
+    m3: Model3Result,
+    m4: Model4Result,
+    m5: Model5Result,
+    m6: Model6Result,
+    m7: Model7Result,
+    m8: Model8Result,
+    use_llm_summary: bool = MODEL9_LLM_SUMMARY,
+) -> Model9Result:
+    """Run Final Synthesis (local), optionally with an LLM-written summary."""
+    logger.info("Model 9 (Synthesis): computing final decision locally")
+    result = compute_synthesis(context, m1, m2, m3, m4, m5, m6, m7, m8)
+
+    if use_llm_summary:
+        try:
+            result.reasoning_summary = await _llm_reasoning_summary(context, result)
+        except Exception as e:
+            # The decision is already complete; keep the template summary
+            logger.warning(f"Model 9 LLM summary failed, using template summary: {e}")
+
+    return result
@@ -0,0 +1,125 @@
+"""
+Multi-domain batch mode – Models 2–8 in a single LLM call.
+
+Instead of seven round trips that each resend the full AnalysisContext, one
+prompt asks for all seven domain results as sections of one JSON object. Each
+section is split back into its ModelNResult via safe_parse_base_result; any
+section that is missing or malformed falls back to that model's own call.
+When the FAO-56 Model 3 can answer locally (MODEL3_MODE="numeric" and ET₀ in
+the context), the water_balance section is left out of the prompt entirely
+so no output tokens or rate-limit budget are spent on it.
+If the LLM is unavailable (LLMUnavailableError) the error propagates instead,
+so seven per-model calls aren't spent hitting the same quota wall.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Type
+
+from backend.services.openrouter_client import LLMUnavailableError, call_llm
+from backend.services.models.schemas import (
+    AnalysisContext, BaseModelResult,
+    Model2Result, Model3Result, Model4Result,
+    Model5Result, Model6Result, Model7Result, Model8Result,
+)
+from backend.services.models.llm_parse_utils import safe_parse_base_result
+from backend.services.models.prompt_encoder import encode_context, log_prompt_tokens
+from backend.services.models import (
+    model2_soil, model3_water_balance, model4_climate, model5_economic,
+    model6_risk, model7_market_access, model8_demand,
+)
+from backend.config import OPENROUTER_MODEL_SMALL, LLM_BATCH_MAX_TOKENS, MODEL3_MODE
+
+logger = logging.getLogger(__name__)
+
+# section key, job-store key, model_name, result class, module (SYSTEM_PROMPT + fallback runner)
+DOMAINS = [
+    ("soil_moisture", "model_2", "soil_moisture", Model2Result, model2_soil),
+    ("water_balance", "model_3", "water_balance", Model3Result, model3_water_balance),
+    ("climate", "model_4", "climate_thermal", Model4Result, model4_climate),
+    ("economic", "model_5", "economic_viability", Model5Result, model5_economic),
+    ("risk", "model_6", "risk_assessment", Model6Result, model6_risk),
+    ("market_access", "model_7", "market_access", Model7Result, model7_market_access),
+    ("demand", "model_8", "demand_analysis", Model8Result, model8_demand),
+]
+
+
+def _domain_section(section: str, system_prompt: str) -> str:
+    """Reuse a single-model prompt as one section of the batch prompt."""
+    body = system_prompt.split("\n", 1)[1].strip()  # drop the "You are..." line
+    body = body.replace("Return ONLY valid JSON (no markdown, no explanation):", "Section schema:")
+    return f"### Section \"{section}\"\n{body}"
+
+
+def _system_prompt(domains) -> str:
+    return (
+        "You are a specialized multi-domain agricultural intelligence model.\n"
+        "Analyze the farm context ONCE for each of the domains below.\n\n"
+        "Return ONLY valid JSON (no markdown, no explanation): one object whose top-level keys are exactly "
+        + ", ".join(f'"{section}"' for section, *_ in domains)
+        + ". Each value must follow that section's schema.\n\n"
+        + "\n\n".join(_domain_section(section, module.SYSTEM_PROMPT) for section, _, _, _, module in domains)
+    )
+
+
+SYSTEM_PROMPT = _system_prompt(DOMAINS)
+# Model 3 answered by the FAO-56 balance: don't ask the LLM for it
+DOMAINS_BUT_WATER = [d for d in DOMAINS if d[1] != "model_3"]
+SYSTEM_PROMPT_BUT_WATER = _system_prompt(DOMAINS_BUT_WATER)
+
+
+def _parse_section(raw: Any, model_name: str, result_cls: Type[BaseModelResult]) -> BaseModelResult:
+    """Validate one section; raises ValueError if it cannot stand in for the model's own call."""
+    if not isinstance(raw, dict) or not isinstance(raw.get("crop_scores"), dict) or not raw["crop_scores"]:
+        raise ValueError("section missing or has no crop_scores")
+    try:
+        return result_cls(**safe_parse_base_result(raw, model_name))
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"section failed validation: {e}") from e
+
+
+async def run_models_2_to_8_batched(context: AnalysisContext) -> Dict[str, BaseModelResult]:
+    """
+    Run Models 2–8 with one LLM call. Returns results keyed "model_2".."model_8";
+    sections that fail to parse are re-run with that model's own prompt.
+    """
+    numeric_water = MODEL3_MODE == "numeric" and model3_water_balance.numeric_available(context)
+    if numeric_water:
+        domains, system_prompt = DOMAINS_BUT_WATER, SYSTEM_PROMPT_BUT_WATER
+        user_prompt = encode_context(context, "all_but_water")
+    else:
+        domains, system_prompt = DOMAINS, SYSTEM_PROMPT
+        user_prompt = encode_context(context, "all")
+    logger.info(
+        f"Models 2–8 (batched): analyzing {len(context.selected_crops)} crops in one call"
+        + (" (Model 3 from the FAO-56 balance)" if numeric_water else "")
+    )
+    log_prompt_tokens("Models 2–8 (batched)", system_prompt, user_prompt)
+
+    try:
+        raw = await call_llm(system_prompt, user_prompt, model=OPENROUTER_MODEL_SMALL, max_tokens=LLM_BATCH_MAX_TOKENS)
+    except LLMUnavailableError:
+        raise
+    except Exception as e:
+        logger.warning(f"Batched call failed, falling back to per-model calls: {e}")
+        raw = {}
+    if not isinstance(raw, dict):
+        raw = {}
+
+    results: Dict[str, BaseModelResult] = {}
+    fallbacks = {}
+    for section, model_key, model_name, result_cls, module in domains:
+        try:
+            results[model_key] = _parse_section(raw.get(section), model_name, result_cls)
+        except ValueError as e:
+            logger.warning(f"Batched section '{section}' unusable ({e}) — running {model_key} on its own")
+            fallbacks[model_key] = getattr(module, f"run_{model_key}")(context)
+
+    if fallbacks:
+        fallback_results = await asyncio.gather(*fallbacks.values())
+        results.update(zip(fallbacks.keys(), fallback_results))
+
+    if numeric_water:
+        results["model_3"] = model3_water_balance.run_numeric_model_3(context)
+
+    return {key: results[key] for _, key, *_ in DOMAINS}
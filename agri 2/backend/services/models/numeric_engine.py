@@ -0,0 +1,385 @@
+"""
+Numeric Models 1–8 – deterministic estimates without the LLM.
+
+Used two ways (see llm_orchestrator):
+- "instant" analysis mode: every domain result comes from here
+- automatic degradation: a model whose LLM call raises LLMUnavailableError
+  (no key, 402, 429 / quota) is replaced by its numeric estimate
+
+Models 2, 4 and 6 reuse the rule-based scorers of the legacy /farm/analyze
+pipeline (model_engine, RiskService). The other domains have no per-crop
+scorer there that fits the LLM schema, so they read the prescreen arithmetic:
+the selected crops are compiled into a CropMatrix and scored once against the
+farm (row 0 = rain only, row 1 = rain + irrigation):
+- Model 1 rainfall:    rain-only water fit, rainfall variability, dry spells
+- Model 2 soil:        SoilAnalysisModel soil-type match + root-zone moisture vs crop demand
+- Model 3 water:       FAO-56 balance when ET₀ is known, else rain + irrigation fit
+- Model 4 climate:     ClimateModel (temperature, rainfall, GDD, heat stress)
+- Model 5 economic:    ROI ratio, price position, budget vs input cost
+- Model 6 risk:        RiskAssessmentModel safety less RiskService's penalty (score = safety)
+- Model 7/8 market:    catalog market potential, perishability, season timing
+Results use the same model_name / risk_factors schema as the LLM models, so
+Model 9 and the frontend read them unchanged, tagged provenance="numeric"
+(except the FAO-56 Model 3, which is already final: "computed").
+Models 7–8 have no market data beyond the catalog and report a low confidence.
+"""
+
+import logging
+from typing import Dict, List
+
+import numpy as np
+
+from backend.models import EnvironmentalData
+from backend.pydantic_models import WaterAvailability
+from backend.services.crop_matrix import CropMatrix, FarmBatch
+from backend.services.crop_selection_engine import CropSelectionEngine
+from backend.services.input_processor import InputProcessor
+from backend.services.model_engine import ClimateModel, RiskAssessmentModel, SoilAnalysisModel
+from backend.services.models import model3_water_balance
+from backend.services.models.schemas import (
+    AnalysisContext, BaseModelResult,
+    Model1Result, Model2Result, Model3Result, Model4Result,
+    Model5Result, Model6Result, Model7Result, Model8Result,
+)
+from backend.services.risk_service import RiskService
+
+logger = logging.getLogger(__name__)
+
+POTENTIAL_SCORE = {"High": 75.0, "Medium": 60.0, "Low": 45.0}
+
+
+def _clip_score(values) -> List[int]:
+    return [int(v) for v in np.clip(np.round(values), 0, 100)]
+
+
+def _level(value: float, moderate: float, high: float) -> str:
+    return "High" if value >= high else "Moderate" if value >= moderate else "Low"
+
+
+def _best(context: AnalysisContext, scores: List[int]) -> str:
+    i = int(np.argmax(scores))
+    return f"{context.selected_crops[i].name} ({scores[i]}/100)"
+
+
+class NumericInputs:
+    """Prescreen components for the selected crops, computed once per analysis."""
+
+    def __init__(self, context: AnalysisContext):
+        env, user = context.environment, context.user
+        self.context = context
+        self.crops = context.selected_crops
+        self.ids = [str(c.id) for c in self.crops]
+        self.season = InputProcessor.get_current_season()
+        # The legacy rule-based scorers read EnvironmentalData; CropContext has the Crop fields they use
+        self.env_data = EnvironmentalData(
+            avg_temp=env.avg_temp,
+            min_temp=env.min_temp,
+            max_temp=env.max_temp,
+            rainfall_total=env.rainfall_mm,
+            rainfall_variability=env.rainfall_variability,
+            soil_moisture_index=env.soil_moisture_percent,
+            avg_humidity=env.humidity_percent,
+            gdd=env.gdd or 0.0,
+            heat_stress_days=env.heat_stress_days,
+            cold_stress_days=env.cold_stress_days,
+            dry_spell_days=env.dry_spell_days,
+            et0_mm_day=env.et0_mm_day,
+        )
+
+        # NASA fetches 6 months of data — annualized like the prescreen does
+        self.annual_rain = env.rainfall_mm * 2.0
+        try:
+            bonus = CropSelectionEngine.IRRIGATION_BONUS[WaterAvailability(user.water_availability)]
+        except (KeyError, ValueError):
+            bonus = CropSelectionEngine.IRRIGATION_BONUS[WaterAvailability.LIMITED]
+        self.available_water = self.annual_rain + bonus
+
+        self.matrix = CropMatrix.from_crops(self.crops)
+        column = lambda value: np.full((2, 1), float(value))
+        farms = FarmBatch(
+            avg_temp=column(env.avg_temp),
+            gdd=column(env.gdd or 0.0),
+            heat_stress_days=column(env.heat_stress_days),
+            rainfall_variability=column(env.rainfall_variability),
+            dry_spell_days=column(env.dry_spell_days),
+            available_water=np.array([[self.annual_rain], [self.available_water]]),
+            budget=column(user.budget_per_acre),
+            soils=[(user.soil_type or "").strip().lower()] * 2,
+        )
+        max_price = np.full((2, 1), max((c.market_price_per_quintal for c in self.crops), default=1.0))
+        scores = self.matrix.score(farms, self.season, max_price)
+        self.rain_fit = scores["water"][0]          # 0–20, rain only
+        self.water_fit = scores["water"][1]         # 0–20, rain + irrigation
+        self.components = {k: v[1] for k, v in scores.items()}
+
+        cost = np.maximum(self.matrix.input_cost, 1)
+        self.roi_ratio = (self.matrix.yield_q * self.matrix.price - cost) / cost
+        # Root-zone moisture as a 0–1 fraction (NASA GWET index or a percentage)
+        moisture = env.soil_moisture_percent
+        self.moisture = float(np.clip(moisture / 100 if moisture > 1 else moisture, 0, 1))
+
+
+# ─── Models ───────────────────────────────────────────────────────────────────
+
+def numeric_model_1(inputs: NumericInputs) -> Model1Result:
+    env = inputs.context.environment
+    cv_penalty = np.clip((env.rainfall_variability - 40) / 60 * 20, 0, 20)
+    dry_penalty = np.where(inputs.matrix.min_rainfall > 400, np.clip((env.dry_spell_days - 10) / 20 * 15, 0, 15), 0)
+    scores = _clip_score(inputs.rain_fit * 5 - cv_penalty - dry_penalty)
+
+    risk_factors = {}
+    for cid, crop in zip(inputs.ids, inputs.crops):
+        cover = inputs.annual_rain / max(crop.min_rainfall, 1)
+        risk_factors[cid] = {
+            "drought_risk": "High" if cover < 0.6 else "Moderate" if cover < 0.9 else "Low",
+            "excess_rainfall_risk": _level(inputs.annual_rain / max(crop.max_rainfall, 1), 1.0, 1.3),
+            "rainfall_adequacy": "Deficit" if cover < 1 else
+                                 "Excess" if inputs.annual_rain > crop.max_rainfall else "Adequate",
+        }
+    return Model1Result(
+        model_name="rainfall_feasibility",
+        crop_scores=dict(zip(inputs.ids, scores)),
+        risk_factors=risk_factors,
+        key_findings=[
+            f"Annualized rainfall ≈ {inputs.annual_rain:.0f} mm with {env.rainfall_variability:.0f}% variability "
+            f"and {env.dry_spell_days} dry-spell days",
+            f"Best rain-fed fit: {_best(inputs.context, scores)}",
+        ],
+        confidence=70 if env.rainfall_variability <= 40 else 60,
+        provenance="numeric",
+    )
+
+
+def numeric_model_2(inputs: NumericInputs) -> Model2Result:
+    soil_type = inputs.context.user.soil_type
+    matches = [SoilAnalysisModel.assess(soil_type, c.soil_type) for c in inputs.crops]
+    # Water-hungry crops want a wetter root zone
+    target = np.clip(np.array([c.water_requirement_mm for c in inputs.crops]) / 1000, 0.3, 0.8)
+    moisture_fit = np.clip(inputs.moisture / target, 0, 1) * 100 - np.where(inputs.moisture > 0.9, 20, 0)
+    # Soil-type match (legacy SoilAnalysisModel) and root-zone moisture weigh equally
+    scores = _clip_score((np.array([score for score, _ in matches]) + moisture_fit) / 2)
+
+    status = "Deficit" if inputs.moisture < 0.3 else "Excess" if inputs.moisture > 0.85 else "Adequate"
+    risk_factors = {
+        cid: {
+            "moisture_status": status,
+            "root_zone_health": "Excellent" if s >= 80 else "Good" if s >= 65 else "Fair" if s >= 45 else "Poor",
+            "soil_compatibility": {"Excellent": "Good", "Sub-optimal": "Poor"}.get(quality, "Moderate"),
+        }
+        for cid, s, (_, quality) in zip(inputs.ids, scores, matches)
+    }
+    return Model2Result(
+        model_name="soil_moisture",
+        crop_scores=dict(zip(inputs.ids, scores)),
+        risk_factors=risk_factors,
+        key_findings=[
+            f"Root-zone moisture ≈ {inputs.moisture * 100:.0f}% ({status.lower()}) on {soil_type or 'unspecified'} soil",
+            f"Best soil fit: {_best(inputs.context, scores)}",
+        ],
+        confidence=60 if soil_type else 45,
+        provenance="numeric",
+    )
+
+
+def numeric_model_3(inputs: NumericInputs) -> Model3Result:
+    if model3_water_balance.numeric_available(inputs.context):
+        return model3_water_balance.run_numeric_model_3(inputs.context)
+
+    scores = _clip_score(inputs.water_fit * 5)
+    risk_factors = {}
+    for cid, crop in zip(inputs.ids, inputs.crops):
+        deficit = max(0.0, crop.water_requirement_mm - inputs.available_water)
+        surplus = max(0.0, inputs.available_water - crop.max_rainfall)
+        risk_factors[cid] = {
+            "deficit_mm": round(deficit, 1),
+            "surplus_mm": round(surplus, 1),
+            "status": "Deficit" if deficit > 0.1 * crop.water_requirement_mm else
+                      "Surplus" if surplus > 0.25 * crop.max_rainfall else "Balanced",
+        }
+    return Model3Result(
+        model_name="water_balance",
+        crop_scores=dict(zip(inputs.ids, scores)),
+        risk_factors=risk_factors,
+        key_findings=[
+            f"Rain + {inputs.context.user.water_availability.lower()} irrigation supplies "
+            f"≈ {inputs.available_water:.0f} mm",
+            f"Best water balance: {_best(inputs.context, scores)}",
+        ],
+        confidence=55,
+        provenance="numeric",
+    )
+
+
+def numeric_model_4(inputs: NumericInputs) -> Model4Result:
+    env = inputs.context.environment
+    assessed = [ClimateModel.assess(inputs.env_data, crop) for crop in inputs.crops]
+    scores = [score for score, _ in assessed]
+
+    risk_factors = {}
+    for cid, crop in zip(inputs.ids, inputs.crops):
+        required = crop.duration_days * 8.0
+        risk_factors[cid] = {
+            "gdd_adequacy": "Insufficient" if env.gdd < required else
+                            "Excess" if env.gdd > required * 1.5 else "Adequate",
+            "heat_stress_risk": "High" if env.max_temp > crop.max_temp + 3 else
+                                "Moderate" if env.max_temp > crop.max_temp or env.heat_stress_days > 5 else "Low",
+            "cold_stress_risk": "High" if env.min_temp < crop.min_temp - 3 else
+                                "Moderate" if env.min_temp < crop.min_temp or env.cold_stress_days > 0 else "Low",
+        }
+    best = int(np.argmax(scores))
+    return Model4Result(
+        model_name="climate_thermal",
+        crop_scores=dict(zip(inputs.ids, scores)),
+        risk_factors=risk_factors,
+        key_findings=[
+            f"Mean temperature {env.avg_temp:.1f}°C ({env.min_temp:.0f}–{env.max_temp:.0f}°C), "
+            f"{env.gdd:.0f} GDD, {env.heat_stress_days} heat-stress days",
+            f"Best thermal fit: {_best(inputs.context, scores)} — {' '.join(assessed[best][1])}",
+        ],
+        confidence=70,
+        provenance="numeric",
+    )
+
+
+def numeric_model_5(inputs: NumericInputs) -> Model5Result:
+    budget = inputs.context.user.budget_per_acre
+    cost = inputs.matrix.input_cost
+    # No budget given (0) is treated as enough, as in the prescreen hard filter
+    capital = np.where((budget <= 0) | (budget >= cost), 100.0, np.where(budget >= cost * 0.75, 60.0, 20.0))
+    c = inputs.components
+    scores = _clip_score(c["roi"] * 10 * 0.5 + c["market"] * 10 * 0.3 + capital * 0.2)
+    roi_probability = _clip_score(np.clip(50 + inputs.roi_ratio * 20, 5, 95))
+
+    risk_factors = {
+        cid: {
+            "roi_probability": roi_probability[i],
+            "capital_adequacy": "Sufficient" if capital[i] == 100 else "Tight" if capital[i] == 60 else "Insufficient",
+            "breakeven_likelihood": "High" if inputs.roi_ratio[i] >= 1 else
+                                    "Medium" if inputs.roi_ratio[i] >= 0.3 else "Low",
+        }
+        for i, cid in enumerate(inputs.ids)
+    }
+    best = int(np.argmax(inputs.roi_ratio))
+    return Model5Result(
+        model_name="economic_viability",
+        crop_scores=dict(zip(inputs.ids, scores)),
+        risk_factors=risk_factors,
+        key_findings=[
+            f"Highest catalog ROI: {inputs.crops[best].name} "
+            f"(≈{inputs.roi_ratio[best] * 100:.0f}% over input cost)",
+            f"Budget ₹{budget:,.0f}/acre against input costs of "
+            f"₹{cost.min():,.0f}–₹{cost.max():,.0f}/acre",
+        ],
+        confidence=65,
+        provenance="numeric",
+    )
+
+
+def numeric_model_6(inputs: NumericInputs) -> Model6Result:
+    # Legacy RiskAssessmentModel safety (crop risk, dry spells, rainfall variability),
+    # less RiskService's crop-specific heat / dry-spell penalty
+    env = inputs.env_data
+    assessed = [RiskAssessmentModel.assess(env, crop) for crop in inputs.crops]
+    penalty = [-RiskService.calculate_risk_penalty(crop, env) for crop in inputs.crops]
+    weather_flags = int(env.dry_spell_days > 10) + int(env.rainfall_variability > 50)
+    scores = _clip_score([safety - p for (safety, _), p in zip(assessed, penalty)])  # higher = safer
+    risk_index = [100 - s for s in scores]
+
+    risk_factors = {
+        cid: {
+            "risk_index": risk_index[i],
+            "weather_risk": _level(weather_flags + int(penalty[i] > 0), 1, 2),
+            "pest_risk": {"Low": "Low", "High": "High"}.get(crop.risk_factor, "Moderate"),
+            "market_volatility": "High" if crop.perishability == "High" else
+                                 "Low" if crop.market_potential == "High" else "Moderate",
+        }
+        for i, (cid, crop) in enumerate(zip(inputs.ids, inputs.crops))
+    }
+    safest = int(np.argmin(risk_index))
+    return Model6Result(
+        model_name="risk_assessment",
+        crop_scores=dict(zip(inputs.ids, scores)),
+        risk_factors=risk_factors,
+        key_findings=[
+            f"Lowest risk: {inputs.crops[safest].name} (risk index {risk_index[safest]})",
+            " ".join(assessed[safest][1]) or "Low risk conditions.",
+        ],
+        confidence=60,
+        provenance="numeric",
+    )
+
+
+def numeric_model_7(inputs: NumericInputs) -> Model7Result:
+    potential = np.array([POTENTIAL_SCORE.get(c.market_potential, 60.0) for c in inputs.crops])
+    perishable = np.array([c.perishability == "High" for c in inputs.crops])
+    scores = _clip_score(potential - np.where(perishable, 15, 0))
+
+    risk_factors = {
+        cid: {
+            "logistics_rating": "Good" if s >= 70 else "Fair" if s >= 50 else "Poor",
+            "market_proximity": "Moderate",
+            "infrastructure_quality": "Fair",
+        }
+        for cid, s in zip(inputs.ids, scores)
+    }
+    return Model7Result(
+        model_name="market_access",
+        crop_scores=dict(zip(inputs.ids, scores)),
+        risk_factors=risk_factors,
+        key_findings=[
+            "Estimated from catalog market potential and perishability (no location market data)",
+            f"Easiest to market: {_best(inputs.context, scores)}",
+        ],
+        confidence=40,
+        provenance="numeric",
+    )
+
+
+def numeric_model_8(inputs: NumericInputs) -> Model8Result:
+    potential = np.array([POTENTIAL_SCORE.get(c.market_potential, 60.0) for c in inputs.crops])
+    c = inputs.components
+    scores = _clip_score(potential + (c["market"] / 10 - 0.5) * 20)
+
+    risk_factors = {
+        cid: {
+            "oversupply_risk": {"High": "Low", "Low": "High"}.get(crop.market_potential, "Moderate"),
+            "price_outlook": "Bullish" if inputs.roi_ratio[i] >= 1.5 else
+                             "Bearish" if inputs.roi_ratio[i] < 0.3 else "Neutral",
+            "demand_cycle": "Peak" if c["season"][i] >= 10 else "Normal" if c["season"][i] >= 8 else "Off-Peak",
+        }
+        for i, (cid, crop) in enumerate(zip(inputs.ids, inputs.crops))
+    }
+    return Model8Result(
+        model_name="demand_analysis",
+        crop_scores=dict(zip(inputs.ids, scores)),
+        risk_factors=risk_factors,
+        key_findings=[
+            f"Current season: {inputs.season}; demand estimated from catalog market potential and prices",
+            f"Strongest demand: {_best(inputs.context, scores)}",
+        ],
+        confidence=45,
+        provenance="numeric",
+    )
+
+
+NUMERIC_MODELS = {
+    "model_1": numeric_model_1,
+    "model_2": numeric_model_2,
+    "model_3": numeric_model_3,
+    "model_4": numeric_model_4,
+    "model_5": numeric_model_5,
+    "model_6": numeric_model_6,
+    "model_7": numeric_model_7,
+    "model_8": numeric_model_8,
+}
+
+
+def run_numeric_model(context: AnalysisContext, model_key: str) -> BaseModelResult:
+    return NUMERIC_MODELS[model_key](NumericInputs(context))
+
+
+def run_numeric_models(context: AnalysisContext) -> Dict[str, BaseModelResult]:
+    """Numeric estimates for Models 1–8, keyed "model_1".."model_8"."""
+    inputs = NumericInputs(context)
+    logger.info(f"Numeric Models 1–8: estimating {len(inputs.crops)} crops")
+    return {key: model(inputs) for key, model in NUMERIC_MODELS.items()}
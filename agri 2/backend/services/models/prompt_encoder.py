@@ -0,0 +1,128 @@
+"""
+Compact prompt encoder shared by the modelN_*.py modules.
+
+Replaces json.dumps(context.model_dump(), indent=2) with a short text block:
+
+    ENV rainfall_mm=324 rainfall_variability=28.5 dry_spell_days=4
+    FARM water_availability=Adequate
+    CROPS
+    id,name,season,min_rainfall,max_rainfall
+    1,Maize,Kharif,500,800
+
+Only the fields a domain actually reasons about are included, crops become
+CSV rows (one header, no repeated keys) and numbers are printed without
+trailing zeros. Input tokens are what hit provider TPM limits, so every
+model logs the prompt token count before sending.
+"""
+
+import logging
+from typing import Dict, List, Sequence
+
+from backend.services.models.schemas import AnalysisContext
+from backend.services.rate_limiter import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Per-domain field selection: (environment fields, user fields, crop columns).
+# id and name are always the first two crop columns.
+DOMAIN_FIELDS: Dict[str, tuple] = {
+    "rainfall": (
+        ["rainfall_mm", "rainfall_variability", "dry_spell_days", "soil_moisture_percent", "humidity_percent"],
+        ["water_availability"],
+        ["season", "min_rainfall", "max_rainfall", "water_requirement_mm", "duration_days"],
+    ),
+    "soil": (
+        ["soil_moisture_percent", "rainfall_mm", "dry_spell_days"],
+        ["soil_type", "water_availability"],
+        ["soil_type", "water_requirement_mm", "duration_days"],
+    ),
+    "water_balance": (
+        ["rainfall_mm", "dry_spell_days", "soil_moisture_percent", "avg_temp", "humidity_percent", "et0_mm_day"],
+        ["water_availability", "land_area"],
+        ["water_requirement_mm", "min_rainfall", "max_rainfall", "duration_days"],
+    ),
+    "climate": (
+        ["avg_temp", "min_temp", "max_temp", "gdd", "heat_stress_days", "cold_stress_days", "humidity_percent"],
+        [],
+        ["season", "min_temp", "max_temp", "duration_days"],
+    ),
+    "economic": (
+        [],
+        ["budget_per_acre", "land_area"],
+        ["input_cost_per_acre", "market_price_per_quintal", "yield_quintal_per_acre",
+         "market_potential", "risk_factor", "duration_days"],
+    ),
+    "risk": (
+        ["heat_stress_days", "cold_stress_days", "dry_spell_days", "rainfall_variability", "humidity_percent"],
+        ["water_availability", "budget_per_acre"],
+        ["risk_factor", "perishability", "market_potential", "min_temp", "max_temp", "min_rainfall"],
+    ),
+    "market_access": (
+        [],
+        ["land_area"],
+        ["perishability", "market_potential", "market_price_per_quintal", "yield_quintal_per_acre"],
+    ),
+    "demand": (
+        [],
+        [],
+        ["season", "market_potential", "market_price_per_quintal", "perishability", "duration_days"],
+    ),
+    "synthesis": (
+        ["avg_temp", "rainfall_mm", "heat_stress_days", "dry_spell_days"],
+        ["water_availability", "budget_per_acre"],
+        [],
+    ),
+}
+
+
+def _all_fields(exclude: Sequence[str] = ()) -> tuple:
+    """Union of every domain's fields, order preserved (batched multi-domain mode)."""
+    merged: List[List[str]] = [[], [], []]
+    for domain, fields in DOMAIN_FIELDS.items():
+        if domain in exclude:
+            continue
+        for bucket, names in zip(merged, fields):
+            bucket.extend(n for n in names if n not in bucket)
+    return tuple(merged)
+
+
+# "all_but_water": batched mode when the numeric Model 3 answers the water balance locally
+DOMAIN_FIELDS["all"], DOMAIN_FIELDS["all_but_water"] = _all_fields(), _all_fields(exclude=("water_balance",))
+
+
+def _fmt(value) -> str:
+    if value is None:
+        return "na"
+    if isinstance(value, float):
+        return f"{value:g}"
+    # Keep CSV cells single-valued: "Black, Loamy" → "Black/Loamy"
+    return str(value).replace(", ", "/").replace(",", "/")
+
+
+def _key_values(label: str, data: dict, fields: Sequence[str]) -> str:
+    pairs = " ".join(f"{f}={_fmt(data.get(f))}" for f in fields if f in data)
+    return f"{label} {pairs}" if pairs else ""
+
+
+def encode_context(context: AnalysisContext, domain: str) -> str:
+    """Compact, domain-filtered text encoding of an AnalysisContext."""
+    env_fields, user_fields, crop_fields = DOMAIN_FIELDS[domain]
+    columns = ["id", "name", *crop_fields]
+
+    lines = [
+        _key_values("ENV", context.environment.model_dump(), env_fields),
+        _key_values("FARM", context.user.model_dump(), user_fields),
+        "CROPS",
+        ",".join(columns),
+    ]
+    for crop in context.selected_crops:
+        row = crop.model_dump()
+        lines.append(",".join(_fmt(row[c]) for c in columns))
+    return "\n".join(line for line in lines if line)
+
+
+def log_prompt_tokens(label: str, system_prompt: str, user_prompt: str) -> int:
+    """Log (and return) the prompt token count just before a call is sent."""
+    tokens = estimate_tokens(system_prompt) + estimate_tokens(user_prompt)
+    logger.info(f"{label}: ~{tokens} prompt tokens")
+    return tokens
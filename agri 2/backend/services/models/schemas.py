@@ -3,7 +3,7 @@ Pydantic schemas for the 9-model LLM agricultural decision pipeline.
 Every model receives AnalysisContext and returns a strictly typed result.
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from pydantic import BaseModel, Field
 
 
@@ -23,6 +23,10 @@ class EnvironmentContext(BaseModel):
     soil_moisture_percent: float
     gdd: float                        # Growing Degree Days
     humidity_percent: Optional[float] = None
+    et0_mm_day: Optional[float] = None          # FAO-56 reference ET, mm/day
+    # Recent window, one value per day (numeric Model 3 input; kept out of dumps)
+    daily_et0_mm: Optional[List[float]] = Field(default=None, exclude=True)
+    daily_rain_mm: Optional[List[float]] = Field(default=None, exclude=True)
 
 
 class UserContext(BaseModel):
@@ -49,6 +53,8 @@ class CropContext(BaseModel):
     yield_quintal_per_acre: float
     risk_factor: str                  # "Low" | "Medium" | "High"
     perishability: str                # "Low" | "High"
+    # Growth-stage Kc from GrowthStageTemplate: [{"start_day", "end_day", "kc"}]
+    kc_stages: Optional[List[Dict[str, float]]] = None
 
 
 class AnalysisContext(BaseModel):
@@ -68,6 +74,8 @@ class FullAnalysisRequest(BaseModel):
     budget_per_acre: float
     selected_crop_ids: List[int]
     soil_type: Optional[str] = None
+    # "refine": numeric estimate first, then LLM (any LLM error keeps the estimate); None = ANALYSIS_MODE
+    mode: Optional[Literal["llm", "instant", "refine"]] = None
 
 
 # ─────────────────────────────────────────────
@@ -80,6 +88,7 @@ class BaseModelResult(BaseModel):
     risk_factors: Dict[str, Any]      # Flexible risk dictionary
     key_findings: List[str]
     confidence: int = Field(..., ge=0, le=100)
+    provenance: Optional[str] = None  # "llm" | "computed" (FAO-56 Model 3) | "numeric" | "numeric_fallback"
 
 # Aliases for type safety in Orchestrator
 class Model1Result(BaseModelResult): pass
@@ -112,6 +121,7 @@ class Model9Result(BaseModel):
     cropping_system: str              # "Standalone" | "Intercrop" | "Sequential"
     decision_matrix: Dict[str, DecisionMatrixEntry] # crop_id -> Analysis
     reasoning_summary: str
+    provenance: Optional[str] = None  # provenance of Models 1–8, "mixed" if they differ
 
 
 # ─────────────────────────────────────────────
@@ -1,61 +1,126 @@
 import httpx
 from datetime import datetime, timedelta
-import statistics
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Tuple
 import logging
 
+import backend.config as _cfg
 from backend.config import NASA_POWER_API_URL, NASA_COMMUNITY, NASA_PARAMETERS
 from backend.models import EnvironmentalData
+from backend.services.response_cache import TieredCache, make_cache_key
+from backend.services.climatology import ClimatologyStore
+from backend.services.environment_metrics import compute_environmental_data
+from backend.services.power_series_store import CellSeries, PowerSeriesStore
 
 # Setup basic logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def snap_to_grid(lat: float, lon: float) -> Tuple[float, float]:
+    """Centre of the POWER grid cell (0.5° × 0.625°) that contains lat/lon."""
+    cell_lat = round(lat / _cfg.NASA_GRID_LAT_DEG) * _cfg.NASA_GRID_LAT_DEG
+    cell_lon = round(lon / _cfg.NASA_GRID_LON_DEG) * _cfg.NASA_GRID_LON_DEG
+    return round(cell_lat, 4), round(cell_lon, 4)
+
+
+def default_window(end_date: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """The standard analysis window: NASA_WINDOW_DAYS ending yesterday (POWER data latency)."""
+    if end_date is None:
+        end_date = datetime.now() - timedelta(days=1)
+    return end_date - timedelta(days=_cfg.NASA_WINDOW_DAYS), end_date
+
+
+def power_cache_key(cell_lat: float, cell_lon: float, start: str, end: str, parameters: str = NASA_PARAMETERS) -> str:
+    return make_cache_key("power_daily", cell_lat, cell_lon, start, end, parameters, NASA_COMMUNITY)
+
+
+# Shared by every NASAService instance (memory LRU + SQLite tier)
+power_cache = TieredCache(
+    namespace="nasa_power",
+    db_path=_cfg.CACHE_DB_PATH,
+    ttl_seconds=_cfg.NASA_CACHE_TTL_SECONDS,
+    max_memory_entries=_cfg.NASA_CACHE_MAX_MEMORY_ENTRIES,
+    max_disk_entries=_cfg.NASA_CACHE_MAX_DISK_ENTRIES,
+    enabled=_cfg.NASA_CACHE_ENABLED,
+)
+
+
 class NASAService:
     """
     NASA POWER API client for agricultural environmental data.
     Uses httpx for asynchronous requests.
+
+    Requests are snapped to the POWER grid cell and cached per cell + date
+    window, so repeat lookups from the same area never touch the network.
+    With a series store, only dates the cell has not stored yet are fetched.
+    With a climatology store, climate_deviation compares the window's rainfall
+    to the cell's multi-year baseline.
+    `transport` lets tests substitute a stand-in POWER server.
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        cache: Optional[TieredCache] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        series_store: Optional[PowerSeriesStore] = None,
+        climatology: Optional[ClimatologyStore] = None,
+    ):
         self.base_url = NASA_POWER_API_URL
-        self.timeout = 30.0
+        self.timeout = _cfg.NASA_TIMEOUT
+        self.cache = cache if cache is not None else power_cache
+        self.transport = transport
+        if series_store is None and _cfg.NASA_SERIES_ENABLED:
+            series_store = PowerSeriesStore(_cfg.NASA_SERIES_DIR, NASA_PARAMETERS.split(","))
+        self.series_store = series_store
+        if climatology is None and _cfg.CLIMATOLOGY_ENABLED:
+            climatology = ClimatologyStore(_cfg.CLIMATOLOGY_DIR)
+        self.climatology = climatology
     
     async def fetch_power_data(
         self,
         lat: float,
         lon: float,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
+        end_date: Optional[datetime] = None,
+        parameters: str = NASA_PARAMETERS,
+        use_cache: bool = True,
     ) -> Dict[str, Any]:
         """
         Fetch data from NASA POWER API.
+        `use_cache=False` skips the response cache (e.g. multi-year baseline pulls).
         """
         if end_date is None:
             end_date = datetime.now() - timedelta(days=1)  # Yesterday (data latency)
         if start_date is None:
             # Default to 6 months for clear trends, consistent with previous logic
-            start_date = end_date - timedelta(days=180) 
+            start_date = end_date - timedelta(days=_cfg.NASA_WINDOW_DAYS)
         
         # Format dates
         start_str = start_date.strftime("%Y%m%d")
         end_str = end_date.strftime("%Y%m%d")
+
+        # Every point in a grid cell gets the same POWER values: fetch the cell once
+        cell_lat, cell_lon = snap_to_grid(lat, lon)
+        cache_key = power_cache_key(cell_lat, cell_lon, start_str, end_str, parameters)
+        cached = await self.cache.get(cache_key) if use_cache else None
+        if cached is not None:
+            logger.info(f"NASA POWER cache hit: cell ({cell_lat}, {cell_lon}) {start_str}-{end_str}")
+            return cached
         
         params = {
-            "parameters": NASA_PARAMETERS,
+            "parameters": parameters,
             "community": NASA_COMMUNITY,
-            "longitude": lon,
-            "latitude": lat,
+            "longitude": cell_lon,
+            "latitude": cell_lat,
             "start": start_str,
             "end": end_str,
             "format": "JSON"
         }
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with httpx.AsyncClient(timeout=self.timeout, transport=self.transport) as client:
             try:
                 response = await client.get(self.base_url, params=params)
                 response.raise_for_status() # Raise exception for 4xx/5xx errors
-                return response.json()
+                data = response.json()
             except httpx.HTTPStatusError as e:
                 logger.error(f"NASA API HTTP Error: {e.response.status_code} - {e.response.text}")
                 raise
@@ -63,41 +128,48 @@ class NASAService:
                 logger.error(f"NASA API Request Error: {e}")
                 raise
 
-    @staticmethod
-    def calculate_cv(values: List[float]) -> float:
+        if use_cache and data.get("properties", {}).get("parameter"):
+            await self.cache.set(cache_key, data)
+        return data
+
+    async def fetch_power_series(
+        self,
+        lat: float,
+        lon: float,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> CellSeries:
         """
-        Calculate Coefficient of Variation (CV) for rainfall consistency.
-        CV = (Standard Deviation / Mean) * 100
+        Daily series for the cell containing lat/lon. Reads the local series
+        store and requests only the missing date range(s) from POWER.
         """
-        # Filter out invalid values (-999 is NASA's missing data indicator)
-        valid_values = [v for v in values if v >= 0]
-        if not valid_values or len(valid_values) < 2:
-            return 0.0 
-        
-        mean = statistics.mean(valid_values)
-        if mean == 0:
-            return 100.0  # No rainfall = maximum variability context
-        
-        stdev = statistics.stdev(valid_values)
-        cv = (stdev / mean) * 100
-        return min(cv, 100.0)
-
-    @staticmethod
-    def _aggregate_monthly(daily_data: Dict[str, float]) -> List[float]:
-        """Aggregate daily precipitation to monthly totals."""
-        monthly = {}
-        for date_str, value in daily_data.items():
-            if not isinstance(value, (int, float)) or value < 0:
-                continue
-            try:
-                # Date format: YYYYMMDD
-                month_key = date_str[:6]  # YYYYMM
-                if month_key not in monthly:
-                    monthly[month_key] = 0.0
-                monthly[month_key] += value
-            except (ValueError, TypeError):
-                continue
-        return list(monthly.values())
+        if start_date is None or end_date is None:
+            default_start, default_end = default_window(end_date)
+            start_date, end_date = start_date or default_start, default_end
+        start, end = start_date.date(), end_date.date()
+        cell = snap_to_grid(lat, lon)
+        parameters = NASA_PARAMETERS.split(",")
+
+        if self.series_store is None:
+            data = await self.fetch_power_data(lat, lon, start_date, end_date)
+            return CellSeries.from_power_payload(data, parameters, start, end)
+
+        # The series store is the persistent copy: skip the response cache for gap fetches
+        for gap_start, gap_end in self.series_store.missing_ranges(cell, start, end):
+            logger.info(f"NASA POWER series: cell {cell} fetching {gap_start} → {gap_end}")
+            data = await self.fetch_power_data(
+                cell[0], cell[1],
+                datetime.combine(gap_start, datetime.min.time()),
+                datetime.combine(gap_end, datetime.min.time()),
+                use_cache=False,
+            )
+            fresh = CellSeries.from_power_payload(data, parameters, gap_start, gap_end)
+            self.series_store.merge(cell, fresh)
+
+        stored = self.series_store.load(cell)
+        if stored is None:
+            raise ValueError("No valid temperature data received from NASA")
+        return stored.window(start, end)
 
     async def get_environmental_data(
         self,
@@ -109,113 +181,20 @@ class NASAService:
         Returns EnvironmentalData ready for model analysis.
         PROPGATES EXCEPTIONS - No Mock Data.
         """
-        # 1. Fetch Data
-        data = await self.fetch_power_data(lat, lon)
-        
-        params = data.get("properties", {}).get("parameter", {})
-        
-        # Extract parameter dictionaries (Date -> Value)
-        t2m = params.get("T2M", {})
-        t2m_min = params.get("T2M_MIN", {})
-        t2m_max = params.get("T2M_MAX", {})
-        precip = params.get("PRECTOTCORR", {})
-        # gwettop = params.get("GWETTOP", {}) # Disabled for now as it might be missing in some queries? Re-enabling if properly requested.
-        # Actually, let's check if it exists in the fetched data. 
-        # The user requested GWETTOP in config, so it should be there.
-        gwettop = params.get("GWETTOP", {})
-
-        # Helper to get valid list
-        def get_valid_values(d: dict, min_val: float = -900) -> List[float]:
-            return [v for v in d.values() if isinstance(v, (int, float)) and v > min_val]
-
-        t2m_values = get_valid_values(t2m)
-        t2m_min_values = get_valid_values(t2m_min)
-        t2m_max_values = get_valid_values(t2m_max)
-        precip_values = get_valid_values(precip, min_val=0) # Precip can be 0
-        gwettop_values = get_valid_values(gwettop, min_val=0)
-        
-        # Relative Humidity
-        rh2m = params.get("RH2M", {})
-        rh2m_values = get_valid_values(rh2m, min_val=0)
-
-        if not t2m_values:
-            raise ValueError("No valid temperature data received from NASA")
-
-        # --- Calculations ---
-
-        # Averages
-        avg_temp = statistics.mean(t2m_values)
-        min_temp_avg = statistics.mean(t2m_min_values) if t2m_min_values else avg_temp - 5
-        max_temp_avg = statistics.mean(t2m_max_values) if t2m_max_values else avg_temp + 5
-        avg_humidity = statistics.mean(rh2m_values) if rh2m_values else 0.0
-        rainfall_total = sum(precip_values)
-
-        # Rainfall Consistency
-        monthly_precip = self._aggregate_monthly(precip)
-        cv = self.calculate_cv(monthly_precip)
-        rainfall_stability = (100.0 / cv) if cv > 1.0 else 100.0 # Inverse of variability
-
-        # Heat/Cold Stress
-        # Heat stress > 35C, Cold stress < 10C
-        heat_stress_days = sum(1 for v in t2m_max_values if v > 35)
-        cold_stress_days = sum(1 for v in t2m_min_values if v < 10)
-
-        # GDD (Growing Degree Days)
-        # Base temp 10C
-        gdd_total = 0.0
-        # iterate safely assuming keys match, or just zip sorted values if dates align. 
-        # Keys are YYYYMMDD.
-        sorted_keys = sorted(t2m.keys())
-        for k in sorted_keys:
-            tmax = t2m_max.get(k, -999)
-            tmin = t2m_min.get(k, -999)
-            if tmax > -900 and tmin > -900:
-                day_gdd = ((tmax + tmin) / 2) - 10.0
-                gdd_total += max(0, day_gdd)
-
-        # Dry Spells
-        # Consecutive days < 2.5mm
-        dry_spell_days = 0
-        current_dry_sequence = 0
-        sorted_precip_keys = sorted(precip.keys())
-        for k in sorted_precip_keys:
-            val = precip.get(k, -999)
-            if val > -0.1 and val < 2.5: # 0 to 2.5mm is dry
-                current_dry_sequence += 1
-            else:
-                dry_spell_days = max(dry_spell_days, current_dry_sequence)
-                current_dry_sequence = 0
-        dry_spell_days = max(dry_spell_days, current_dry_sequence)
-
-        # Soil Moisture
-        # If GWETTOP available (0-1), use it. Else estimate.
-        if gwettop_values:
-            soil_moisture_index = statistics.mean(gwettop_values) # 0-1
-        else:
-             # Fallback estimation if parameter missing
-             # Estimated Soil Moisture = Cumulative Rain - Cumulative Evap (Temp based proxy)
-             # Very rough proxy
-             estimated_val = max(0, rainfall_total * 0.7 - (avg_temp * 5)) 
-             soil_moisture_index = min(1.0, estimated_val / 500.0) # Normalize generic
-
-        
-        # Populate Model
-        return EnvironmentalData(
-            avg_temp=round(avg_temp, 2),
-            min_temp=round(min_temp_avg, 2),
-            max_temp=round(max_temp_avg, 2),
-            rainfall_total=round(rainfall_total, 2),
-            rainfall_variability=round(cv, 2),
-            rainfall_stability=round(rainfall_stability, 2),
-            soil_moisture_index=round(soil_moisture_index, 2),
-            soil_moisture_estimate=round(soil_moisture_index * 100, 2), # approx mm or %
-            avg_humidity=round(avg_humidity, 2),
-            gdd=round(gdd_total, 2),
-            forecast_rain_next_14_days=None, # Not available in historical API
-            heat_stress_days=heat_stress_days,
-            cold_stress_days=cold_stress_days,
-            dry_spell_days=dry_spell_days,
-            climate_deviation=0.0 # Needs long term baseline
+        # 1. Fetch Data (local series store + only the missing days from POWER)
+        series = await self.fetch_power_series(lat, lon)
+
+        # 2. Deviation from the cell's multi-year baseline (precomputed, O(1))
+        cell = snap_to_grid(lat, lon)
+        deviation = None
+        if self.climatology is not None:
+            deviation = self.climatology.rainfall_deviation(cell, series)
+
+        # 3. Metrics (incl. FAO-56 ET₀), vectorized over the aligned daily arrays
+        return compute_environmental_data(
+            series,
+            climate_deviation=round(deviation, 2) if deviation is not None else 0.0,
+            latitude=cell[0],
         )
 
 
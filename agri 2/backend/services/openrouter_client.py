@@ -2,37 +2,152 @@
 Shared async OpenRouter LLM client.
 
 Safety guarantees:
-  - temperature=0.2 (near-deterministic)
+  - temperature=OPENROUTER_TEMPERATURE (0.6, see backend.config)
   - Strict JSON parsing with up to 3 retries on malformed output
-  - Exponential backoff on 429 rate-limit errors (15s → 30s → 60s)
+  - Every request passes the shared token-bucket rate limiter (rpm/tpm)
+  - On 429, waits for Retry-After (or backs off 15s → 30s → 60s) before retrying
   - Raises ValueError if all retries fail
+  - Raises LLMUnavailableError (a ValueError) when no answer can come soon:
+    missing key, 402 (credits), 429 on the last attempt or with a Retry-After
+    beyond OPENROUTER_MAX_429_WAIT_SECONDS — callers degrade to numeric models
   - Never returns raw string — always returns parsed dict
+  - One pooled keep-alive connection pool per process (no per-call handshake)
+  - Identical requests are answered from the two-tier response cache
+  - Identical concurrent requests share one in-flight call (single-flight)
 """
 
 import asyncio
+import copy
+import importlib.util
 import json
 import logging
 import httpx
 from typing import Any, Dict, Optional
 
 import backend.config as _cfg
+from backend.services.rate_limiter import LLMRateLimiter, estimate_tokens
+from backend.services.response_cache import TieredCache, make_cache_key
+from backend.services.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
 
+class LLMUnavailableError(ValueError):
+    """The LLM cannot answer now (no key, out of credits, throttled)."""
+
+
+# ─── Response cache ───────────────────────────────────────────────────────────
+# Keyed by (model, system prompt, user prompt, temperature, max_tokens), so
+# identical farm/crop contexts skip the round trip entirely.
+llm_cache = TieredCache(
+    namespace="llm_response",
+    db_path=_cfg.CACHE_DB_PATH,
+    ttl_seconds=_cfg.LLM_CACHE_TTL_SECONDS,
+    max_memory_entries=_cfg.LLM_CACHE_MAX_MEMORY_ENTRIES,
+    max_disk_entries=_cfg.LLM_CACHE_MAX_DISK_ENTRIES,
+    enabled=_cfg.LLM_CACHE_ENABLED,
+)
+
+# Concurrent identical requests (e.g. two farmers from one village submitting
+# the same crops) await a single OpenRouter call, keyed like the cache.
+llm_inflight = SingleFlight("llm_request")
+
+# Shared requests/tokens-per-minute budget, tightened by provider headers.
+rate_limiter = LLMRateLimiter(_cfg.LLM_RATE_LIMITS)
+
+# ─── Shared connection pool ───────────────────────────────────────────────────
+# Opened/closed by the FastAPI lifespan in backend/main.py. Scripts and tests
+# that never run the lifespan get a lazily created client instead. The client
+# is tied to the event loop it was created on, so a new loop gets a new pool.
+_CLIENT: httpx.AsyncClient | None = None
+_CLIENT_LOOP: asyncio.AbstractEventLoop | None = None
+
+
+def _http2_enabled() -> bool:
+    """HTTP/2 needs the optional `h2` package (pip install httpx[http2])."""
+    return _cfg.OPENROUTER_HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+def create_client() -> httpx.AsyncClient:
+    """Build a keep-alive AsyncClient sized from backend.config."""
+    limits = httpx.Limits(
+        max_connections=_cfg.OPENROUTER_MAX_CONNECTIONS,
+        max_keepalive_connections=_cfg.OPENROUTER_MAX_KEEPALIVE,
+        keepalive_expiry=_cfg.OPENROUTER_KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(
+        timeout=_cfg.OPENROUTER_TIMEOUT,
+        limits=limits,
+        http2=_http2_enabled(),
+    )
+
+
+def _retire_client(client: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+    """
+    Release a pool that belongs to another event loop. It can only be closed
+    on its own loop: schedule aclose() there if that loop still runs,
+    otherwise its sockets went down with the loop and only the reference is left.
+    """
+    if client.is_closed:
+        return
+    if loop is not None and not loop.is_closed() and loop.is_running():
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        logger.info("OpenRouter client pool replaced for a new event loop; closing the old pool on its loop")
+    else:
+        logger.warning("OpenRouter client pool replaced for a new event loop; old loop is gone, dropping its pool")
+
+
+def open_client() -> httpx.AsyncClient:
+    """Create the process-wide client (called on app startup)."""
+    global _CLIENT, _CLIENT_LOOP
+    if _CLIENT is not None:
+        old_client, old_loop = _CLIENT, _CLIENT_LOOP
+        _CLIENT, _CLIENT_LOOP = None, None
+        _retire_client(old_client, old_loop)
+    _CLIENT = create_client()
+    _CLIENT_LOOP = asyncio.get_running_loop()
+    logger.info(
+        f"OpenRouter client pool opened "
+        f"(max_connections={_cfg.OPENROUTER_MAX_CONNECTIONS}, http2={_http2_enabled()})"
+    )
+    return _CLIENT
+
+
+async def close_client() -> None:
+    """Close the process-wide client (called on app shutdown)."""
+    global _CLIENT, _CLIENT_LOOP
+    if _CLIENT is not None:
+        await _CLIENT.aclose()
+    _CLIENT = None
+    _CLIENT_LOOP = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it on first use in this event loop."""
+    loop = asyncio.get_running_loop()
+    if _CLIENT is None or _CLIENT.is_closed or _CLIENT_LOOP is not loop:
+        return open_client()
+    return _CLIENT
+
+
 async def call_llm(
     system_prompt: str,
     user_prompt: str,
     model: Optional[str] = None,
     max_tokens: Optional[int] = None,
+    client: Optional[httpx.AsyncClient] = None,
+    use_cache: bool = True,
 ) -> Dict[str, Any]:
     """
     Call OpenRouter LLM and return parsed JSON dict.
     Retries up to OPENROUTER_MAX_RETRIES times with exponential backoff on 429.
+    Uses the shared pooled client unless an explicit `client` is injected.
+    Successful responses are cached and identical concurrent calls share one
+    request; pass use_cache=False to force a fresh, uncoalesced call.
     """
     api_key = _cfg.OPENROUTER_API_KEY
     if not api_key or api_key.startswith("sk-or-YOUR"):
-        raise ValueError(
+        raise LLMUnavailableError(
             "OPENROUTER_API_KEY is not set. "
             "Add it to backend/.env: OPENROUTER_API_KEY=sk-or-..."
         )
@@ -59,64 +174,106 @@ async def call_llm(
         # system prompt ("Return ONLY valid JSON") + retry/parse logic below.
     }
 
+    if not use_cache:
+        return await _post_with_retries(client or get_client(), headers, payload)
+
+    cache_key = make_cache_key(
+        payload["model"], system_prompt, user_prompt,
+        payload["temperature"], payload["max_tokens"],
+    )
+    cached = await llm_cache.get(cache_key)
+    if cached is not None:
+        logger.debug(f"OpenRouter cache hit model={payload['model']}")
+        return cached
+
+    async def _fetch() -> Dict[str, Any]:
+        parsed = await _post_with_retries(client or get_client(), headers, payload)
+        await llm_cache.set(cache_key, parsed)
+        return parsed
+
+    # Waiters share one dict — hand each caller its own copy
+    return copy.deepcopy(await llm_inflight.do(cache_key, _fetch))
+
+
+async def _post_with_retries(
+    client: httpx.AsyncClient,
+    headers: Dict[str, str],
+    payload: Dict[str, Any],
+) -> Dict[str, Any]:
+    """POST the chat completion, retrying on 429 / malformed JSON."""
     max_retries = _cfg.OPENROUTER_MAX_RETRIES
-    backoff_seconds = [15, 30, 60]  # wait times between retries on 429
-
-    async with httpx.AsyncClient(timeout=90.0) as client:
-        for attempt in range(1, max_retries + 1):
-            try:
-                logger.debug(f"OpenRouter call attempt {attempt}/{max_retries} model={model or _cfg.OPENROUTER_MODEL}")
-                resp = await client.post(
-                    _cfg.OPENROUTER_BASE_URL,
-                    headers=headers,
-                    json=payload,
-                )
+    backoff_seconds = [15, 30, 60]  # fallback waits on 429 without Retry-After
 
-                # Handle 429 with backoff before raising
-                if resp.status_code == 429:
-                    wait = backoff_seconds[min(attempt - 1, len(backoff_seconds) - 1)]
-                    logger.warning(
-                        f"Attempt {attempt}: 429 rate limit — waiting {wait}s before retry..."
-                    )
-                    if attempt < max_retries:
-                        await asyncio.sleep(wait)
-                        continue
-                    else:
-                        resp.raise_for_status()  # raise after final attempt
-
-                resp.raise_for_status()
-
-                data = resp.json()
-                content = data["choices"][0]["message"]["content"]
-
-                # Strip markdown code fences if present
-                content = content.strip()
-                if content.startswith("```"):
-                    lines = content.split("\n")
-                    content = "\n".join(lines[1:-1])
-
-                parsed = json.loads(content)
-                logger.debug(f"OpenRouter call succeeded on attempt {attempt}")
-                return parsed
-
-            except json.JSONDecodeError as e:
-                logger.warning(f"Attempt {attempt}: JSON parse failed — {e}")
-                if attempt == max_retries:
-                    raise ValueError(
-                        f"LLM returned non-JSON after {max_retries} attempts. "
-                        f"Last error: {e}"
-                    )
+    model = payload["model"]
+    prompt_text = "".join(m["content"] for m in payload["messages"])
+    tokens = estimate_tokens(prompt_text) + payload["max_tokens"]
 
-            except httpx.HTTPStatusError as e:
-                logger.error(f"OpenRouter HTTP error: {e.response.status_code} — {e.response.text[:200]}")
-                raise
+    for attempt in range(1, max_retries + 1):
+        try:
+            logger.debug(f"OpenRouter call attempt {attempt}/{max_retries} model={model}")
+            await rate_limiter.acquire(model, tokens)
+            resp = await client.post(
+                _cfg.OPENROUTER_BASE_URL,
+                headers=headers,
+                json=payload,
+            )
+            retry_after = rate_limiter.observe(model, resp.headers, resp.status_code)
 
-            except Exception as e:
-                logger.warning(f"Attempt {attempt}: Unexpected error — {e}")
-                if attempt == max_retries:
-                    raise ValueError(
-                        f"LLM call failed after {max_retries} attempts. "
-                        f"Last error: {e}"
+            if resp.status_code == 402:
+                raise LLMUnavailableError(f"OpenRouter 402 — out of credits: {resp.text[:200]}")
+
+            # Handle 429 by pausing the limiter group; acquire() does the waiting
+            if resp.status_code == 429:
+                wait = retry_after if retry_after is not None else \
+                    backoff_seconds[min(attempt - 1, len(backoff_seconds) - 1)]
+                if attempt == max_retries or wait > _cfg.OPENROUTER_MAX_429_WAIT_SECONDS:
+                    raise LLMUnavailableError(
+                        f"OpenRouter 429 rate limit on attempt {attempt} (retry after {wait:.0f}s)"
                     )
+                logger.warning(
+                    f"Attempt {attempt}: 429 rate limit — waiting {wait:.1f}s before retry..."
+                )
+                if retry_after is None:
+                    rate_limiter.block(model, wait)
+                continue
+
+            resp.raise_for_status()
+
+            data = resp.json()
+            content = data["choices"][0]["message"]["content"]
+
+            # Strip markdown code fences if present
+            content = content.strip()
+            if content.startswith("```"):
+                lines = content.split("\n")
+                content = "\n".join(lines[1:-1])
+
+            parsed = json.loads(content)
+            logger.debug(f"OpenRouter call succeeded on attempt {attempt}")
+            return parsed
+
+        except json.JSONDecodeError as e:
+            logger.warning(f"Attempt {attempt}: JSON parse failed — {e}")
+            if attempt == max_retries:
+                raise ValueError(
+                    f"LLM returned non-JSON after {max_retries} attempts. "
+                    f"Last error: {e}"
+                )
+
+        except LLMUnavailableError as e:
+            logger.warning(f"OpenRouter unavailable: {e}")
+            raise
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"OpenRouter HTTP error: {e.response.status_code} — {e.response.text[:200]}")
+            raise
+
+        except Exception as e:
+            logger.warning(f"Attempt {attempt}: Unexpected error — {e}")
+            if attempt == max_retries:
+                raise ValueError(
+                    f"LLM call failed after {max_retries} attempts. "
+                    f"Last error: {e}"
+                )
 
     raise ValueError("LLM call failed: exhausted all retries")
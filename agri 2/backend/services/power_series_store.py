@@ -0,0 +1,170 @@
+"""
+Per-grid-cell daily time-series store for NASA POWER data.
+
+Each POWER grid cell (see nasa_service.snap_to_grid) owns one .npz file with
+a contiguous run of days: one float32 column per parameter (NaN = missing)
+plus the first day's ordinal and the cell elevation. NASAService asks the
+store which dates it lacks, fetches only those from POWER and merges them, so
+a cell that was seen yesterday needs a one-day request today instead of a
+full 180-day window.
+
+- Coverage only grows at the edges, so it is always one contiguous range
+- Trailing days where any parameter is missing (POWER publishes with a few
+  days' latency, some parameters later than others, and fills them with
+  -999) are never persisted; they are requested again next time instead of
+  being frozen as gaps
+- Files are written to a temp name and os.replace()d, so readers never see
+  a partial file
+"""
+
+import logging
+import os
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MISSING = -999.0
+Cell = Tuple[float, float]
+
+
+@dataclass
+class CellSeries:
+    """Aligned daily arrays starting at `first_day` (NaN marks missing values)."""
+    first_day: date
+    values: Dict[str, np.ndarray]
+    elevation: Optional[float] = None
+
+    @property
+    def n_days(self) -> int:
+        return len(next(iter(self.values.values()))) if self.values else 0
+
+    @property
+    def last_day(self) -> date:
+        return self.first_day + timedelta(days=self.n_days - 1)
+
+    def dates(self) -> List[str]:
+        return [(self.first_day + timedelta(days=i)).strftime("%Y%m%d") for i in range(self.n_days)]
+
+    @classmethod
+    def from_power_payload(cls, payload: Dict[str, Any], parameters: Sequence[str], start: date, end: date) -> "CellSeries":
+        """Parse a POWER daily/point JSON response into arrays covering start..end."""
+        raw = payload.get("properties", {}).get("parameter", {})
+        n_days = (end - start).days + 1
+        keys = [(start + timedelta(days=i)).strftime("%Y%m%d") for i in range(n_days)]
+        values = {}
+        for name in parameters:
+            by_day = raw.get(name, {})
+            column = np.array([by_day.get(k, MISSING) for k in keys], dtype=np.float32)
+            column[column <= -900] = np.nan
+            values[name] = column
+        coordinates = payload.get("geometry", {}).get("coordinates") or []
+        elevation = float(coordinates[2]) if len(coordinates) > 2 and coordinates[2] is not None else None
+        return cls(start, values, elevation)
+
+    def trim_trailing_missing(self) -> "CellSeries":
+        """
+        Drop trailing days on which any parameter is missing (e.g. T2M is out but
+        PRECTOTCORR still -999). Parameters with no values at all in the series
+        are ignored, so one that POWER never reports for the cell can't empty it.
+        """
+        if not self.values:
+            return self
+        stacked = np.vstack(list(self.values.values()))
+        reported = ~np.all(np.isnan(stacked), axis=1)
+        complete = ~np.any(np.isnan(stacked[reported]), axis=0)
+        keep = int(np.flatnonzero(complete)[-1]) + 1 if complete.any() else 0
+        return CellSeries(self.first_day, {k: v[:keep] for k, v in self.values.items()}, self.elevation)
+
+    def window(self, start: date, end: date) -> "CellSeries":
+        """Slice start..end; days outside the stored range come back as NaN."""
+        n_days = (end - start).days + 1
+        offset = (start - self.first_day).days
+        out = {}
+        for name, column in self.values.items():
+            sliced = np.full(n_days, np.nan, dtype=np.float32)
+            lo, hi = max(offset, 0), min(offset + n_days, len(column))
+            if hi > lo:
+                sliced[lo - offset:hi - offset] = column[lo:hi]
+            out[name] = sliced
+        return CellSeries(start, out, self.elevation)
+
+    def to_power_parameters(self) -> Dict[str, Dict[str, float]]:
+        """Back to POWER's {parameter: {YYYYMMDD: value}} shape (-999 = missing)."""
+        keys = self.dates()
+        return {
+            name: {k: (MISSING if np.isnan(v) else float(v)) for k, v in zip(keys, column.tolist())}
+            for name, column in self.values.items()
+        }
+
+
+class PowerSeriesStore:
+    def __init__(self, root: Path, parameters: Sequence[str]):
+        self.root = Path(root)
+        self.parameters = list(parameters)
+
+    def path(self, cell: Cell) -> Path:
+        return self.root / f"cell_{cell[0]:+09.4f}_{cell[1]:+010.4f}.npz"
+
+    def load(self, cell: Cell) -> Optional[CellSeries]:
+        path = self.path(cell)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                values = {name: data[name] for name in self.parameters if name in data.files}
+                if len(values) != len(self.parameters):
+                    return None  # parameter set changed: refetch the cell
+                elevation = float(data["elevation"]) if "elevation" in data.files else None
+                first_day = date.fromordinal(int(data["first_day"]))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Unreadable POWER series {path.name}, refetching: {e}")
+            return None
+        return CellSeries(first_day, values, None if elevation is None or np.isnan(elevation) else elevation)
+
+    def missing_ranges(self, cell: Cell, start: date, end: date) -> List[Tuple[date, date]]:
+        """Date ranges within start..end that are not stored yet (at most two)."""
+        stored = self.load(cell)
+        if stored is None or stored.n_days == 0:
+            return [(start, end)]
+        ranges = []
+        if start < stored.first_day:
+            ranges.append((start, min(end, stored.first_day - timedelta(days=1))))
+        if end > stored.last_day:
+            ranges.append((max(start, stored.last_day + timedelta(days=1)), end))
+        return ranges
+
+    def merge(self, cell: Cell, fresh: CellSeries) -> CellSeries:
+        """Union of stored and fresh days (fresh wins on overlap), persisted atomically."""
+        stored = self.load(cell)
+        if stored is not None and stored.n_days:
+            first = min(stored.first_day, fresh.first_day)
+            last = max(stored.last_day, fresh.last_day)
+            merged = stored.window(first, last)
+            fresh_part = fresh.window(first, last)
+            for name in self.parameters:
+                column, update = merged.values[name], fresh_part.values[name]
+                mask = ~np.isnan(update)
+                column[mask] = update[mask]
+            merged.elevation = fresh.elevation if fresh.elevation is not None else stored.elevation
+        else:
+            merged = fresh
+        merged = merged.trim_trailing_missing()
+        self._save(cell, merged)
+        return merged
+
+    def _save(self, cell: Cell, series: CellSeries) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path(cell)
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+        np.savez(
+            tmp,
+            first_day=np.int64(series.first_day.toordinal()),
+            elevation=np.float64(np.nan if series.elevation is None else series.elevation),
+            **series.values,
+        )
+        os.replace(tmp, path)
@@ -0,0 +1,130 @@
+"""
+Memo of finished prescreen responses.
+
+A prescreen is a pure function of the environment metrics, the farm profile
+(water availability, budget, soil, requested page), the current season and
+the crop catalog version, so repeat requests from the same grid cell and
+profile can reuse the ready PrescreenResponse and its JSON bytes:
+  - Key:    quantized fingerprint of those inputs (prescreen_fingerprint)
+  - Store:  OrderedDict LRU, bounded by max_entries
+  - Valid:  one catalog snapshot; a new snapshot (seed / migration) clears it
+  - Values are shared between requests — callers must not mutate them
+
+Floats are quantized to 0.01, the precision environment_metrics already
+rounds NASA metrics to, so a hit always returns exactly what scoring would.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from backend.config import PRESCREEN_MEMO_ENABLED, PRESCREEN_MEMO_MAX_ENTRIES
+from backend.models import EnvironmentalData
+from backend.pydantic_models import PrescreenRequest, PrescreenResponse
+
+QUANTUM = 0.01
+
+# EnvironmentalData fields that reach the scores or the environmental_summary
+_ENV_FIELDS = (
+    "avg_temp", "rainfall_total", "gdd", "heat_stress_days", "rainfall_variability",
+    "dry_spell_days", "soil_moisture_index",
+)
+
+
+def _q(value: Optional[float]) -> Optional[int]:
+    return None if value is None else int(round(value / QUANTUM))
+
+
+def prescreen_fingerprint(
+    env: EnvironmentalData,
+    request: PrescreenRequest,
+    current_season: str,
+    catalog_version: int,
+) -> Tuple:
+    return (
+        catalog_version,
+        current_season,
+        request.water_availability.value,
+        _q(request.budget_per_acre),
+        (request.soil_type or "").strip().lower(),
+        request.limit,
+        request.offset,
+        *(_q(getattr(env, name)) for name in _ENV_FIELDS),
+    )
+
+
+class PrescreenEntry:
+    """A cached response plus its serialized JSON, rendered on first use."""
+
+    __slots__ = ("response", "_json")
+
+    def __init__(self, response: PrescreenResponse):
+        self.response = response
+        self._json: Optional[bytes] = None
+
+    @property
+    def json(self) -> bytes:
+        if self._json is None:
+            self._json = self.response.model_dump_json().encode("utf-8")
+        return self._json
+
+
+class PrescreenMemo:
+    def __init__(self, max_entries: int = PRESCREEN_MEMO_MAX_ENTRIES, enabled: bool = PRESCREEN_MEMO_ENABLED):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries: "OrderedDict[Tuple, PrescreenEntry]" = OrderedDict()
+        self._snapshot: Any = None  # catalog snapshot the entries were computed from
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def sync(self, snapshot: Any) -> None:
+        """Drop every entry if the catalog snapshot changed since they were stored."""
+        with self._lock:
+            if snapshot is not self._snapshot:
+                if self._entries:
+                    self._counters["invalidations"] += 1
+                self._entries.clear()
+                self._snapshot = snapshot
+
+    def get(self, key: Tuple) -> Optional[PrescreenEntry]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry
+
+    def put(self, key: Tuple, response: PrescreenResponse) -> PrescreenEntry:
+        entry = PrescreenEntry(response)
+        if not self.enabled:
+            return entry
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "enabled": self.enabled,
+                **self._counters,
+                "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+prescreen_memo = PrescreenMemo()
@@ -0,0 +1,220 @@
+"""
+Token-bucket rate limiter shared by every call_llm request.
+
+Each limit group (exact model id → provider prefix → "default", see
+config.LLM_RATE_LIMITS) owns two buckets:
+  - requests per minute (rpm)
+  - tokens per minute   (tpm, prompt + completion budget; 0 = unlimited)
+
+acquire() waits only as long as the buckets require, so a job runs as fast as
+the quota allows. Provider feedback tightens the buckets on the fly:
+  - Retry-After on 429 pauses the whole group until the given time
+  - x-ratelimit-remaining-* / x-ratelimit-reset-* headers (OpenRouter and
+    Groq/OpenAI style) clamp the local estimate to what the server reports
+"""
+
+import asyncio
+import logging
+import re
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNIT_SECONDS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English/JSON)."""
+    return max(1, len(text) // 4)
+
+
+def _parse_reset_seconds(value: str) -> Optional[float]:
+    """
+    Seconds until a rate-limit window resets. Accepts plain seconds ("7"),
+    epoch seconds/milliseconds (OpenRouter) or durations like "1m30.5s" (Groq).
+    """
+    value = value.strip()
+    try:
+        number = float(value)
+    except ValueError:
+        parts = _DURATION_PART.findall(value)
+        if not parts:
+            return None
+        return sum(float(n) * _UNIT_SECONDS[unit] for n, unit in parts)
+    if number > 1e12:   # epoch milliseconds
+        return max(0.0, number / 1000.0 - time.time())
+    if number > 1e9:    # epoch seconds
+        return max(0.0, number - time.time())
+    return max(0.0, number)
+
+
+def _parse_retry_after(value: str) -> Optional[float]:
+    """Retry-After is either delta-seconds or an HTTP date."""
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `per_minute / 60` per second."""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(per_minute)
+        self.rate = float(per_minute) / 60.0
+        self.tokens = float(per_minute)
+        self._clock = clock
+        self._updated = clock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        if not self.unlimited:
+            self._refill()
+            self.tokens -= min(amount, self.capacity)
+
+    def clamp(self, remaining: float) -> None:
+        """Never believe we have more tokens than the server says remain."""
+        if not self.unlimited:
+            self._refill()
+            self.tokens = min(self.tokens, float(remaining))
+
+
+class _LimitGroup:
+    def __init__(self, rpm: float, tpm: float, clock: Callable[[], float]):
+        self.requests = TokenBucket(rpm, clock)
+        self.tokens = TokenBucket(tpm, clock)
+        self.blocked_until = 0.0
+        self.waited_seconds = 0.0
+        self.acquired = 0
+
+
+class LLMRateLimiter:
+    def __init__(
+        self,
+        limits: Mapping[str, Mapping[str, float]],
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.limits = {k: dict(v) for k, v in limits.items()}
+        self._clock = clock
+        self._groups: Dict[str, _LimitGroup] = {}
+
+    def _group_key(self, model: str) -> str:
+        """Exact model id, then provider prefix ("meta-llama"), then "default"."""
+        if model in self.limits:
+            return model
+        provider = model.split("/", 1)[0]
+        if provider in self.limits:
+            return provider
+        return "default"
+
+    def _group(self, model: str) -> Tuple[str, _LimitGroup]:
+        key = self._group_key(model)
+        group = self._groups.get(key)
+        if group is None:
+            limit = self.limits.get(key, {})
+            group = _LimitGroup(limit.get("rpm", 0), limit.get("tpm", 0), self._clock)
+            self._groups[key] = group
+        return key, group
+
+    async def acquire(self, model: str, tokens: int) -> float:
+        """
+        Wait until one request and `tokens` tokens fit the model's budget,
+        then consume them. Returns the seconds spent waiting.
+        Check-and-consume has no await in between, so it is atomic on the loop.
+        """
+        key, group = self._group(model)
+        waited = 0.0
+        while True:
+            wait = max(
+                group.blocked_until - self._clock(),
+                group.requests.wait_time(1),
+                group.tokens.wait_time(tokens),
+            )
+            if wait <= 0:
+                group.requests.consume(1)
+                group.tokens.consume(tokens)
+                group.acquired += 1
+                group.waited_seconds += waited
+                if waited > 0:
+                    logger.debug(f"Rate limiter [{key}]: waited {waited:.2f}s")
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def block(self, model: str, seconds: float) -> None:
+        """Pause every request in the model's group for `seconds`."""
+        key, group = self._group(model)
+        group.blocked_until = max(group.blocked_until, self._clock() + seconds)
+        logger.warning(f"Rate limiter [{key}]: paused for {seconds:.1f}s")
+
+    def observe(self, model: str, headers: Mapping[str, str], status_code: int) -> Optional[float]:
+        """
+        Feed provider rate-limit headers back into the buckets.
+        Returns the Retry-After delay in seconds when the provider sent one.
+        """
+        _, group = self._group(model)
+        lowered = {k.lower(): v for k, v in headers.items()}
+
+        for suffix, bucket in (("requests", group.requests), ("tokens", group.tokens)):
+            remaining = lowered.get(f"x-ratelimit-remaining-{suffix}")
+            if suffix == "requests" and remaining is None:
+                remaining = lowered.get("x-ratelimit-remaining")  # OpenRouter
+            if remaining is None:
+                continue
+            try:
+                remaining_value = float(remaining)
+            except ValueError:
+                continue
+            bucket.clamp(remaining_value)
+            if remaining_value <= 0:
+                reset = lowered.get(f"x-ratelimit-reset-{suffix}") or lowered.get("x-ratelimit-reset")
+                reset_seconds = _parse_reset_seconds(reset) if reset else None
+                if reset_seconds:
+                    self.block(model, reset_seconds)
+
+        retry_after = lowered.get("retry-after")
+        if retry_after is not None:
+            delay = _parse_retry_after(retry_after)
+            if delay is not None and status_code == 429:
+                self.block(model, delay)
+            return delay
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        now = self._clock()
+        return {
+            key: {
+                "rpm": group.requests.capacity,
+                "tpm": group.tokens.capacity,
+                "requests_available": round(group.requests.tokens, 2),
+                "tokens_available": round(group.tokens.tokens, 2),
+                "paused_for_seconds": round(max(0.0, group.blocked_until - now), 2),
+                "acquired": group.acquired,
+                "waited_seconds": round(group.waited_seconds, 2),
+            }
+            for key, group in self._groups.items()
+        }
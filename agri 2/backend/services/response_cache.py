@@ -0,0 +1,206 @@
+"""
+Two-tier response cache: in-memory LRU in front of a persistent SQLite table.
+
+Values are JSON-serializable objects keyed by a content hash (see make_cache_key).
+  - Memory tier: OrderedDict LRU, bounded by max_memory_entries
+  - Disk tier:   one SQLite table shared by all caches, partitioned by namespace,
+                 bounded by max_disk_entries (oldest rows evicted first)
+  - Both tiers honour the same TTL; expired entries are treated as misses
+  - Hit/miss/eviction counters are exposed via stats()
+  - get() always returns a private copy, so callers may mutate what they receive
+  - get()/set() are coroutines: the memory tier is served inline, SQLite work
+    runs in a worker thread (asyncio.to_thread) so it never blocks the event loop
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Stable SHA-256 over the JSON encoding of `parts`."""
+    encoded = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class TieredCache:
+    def __init__(
+        self,
+        namespace: str,
+        db_path: Path,
+        ttl_seconds: float,
+        max_memory_entries: int = 512,
+        max_disk_entries: int = 20000,
+        enabled: bool = True,
+    ):
+        self.namespace = namespace
+        self.db_path = Path(db_path)
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.enabled = enabled
+
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # _lock guards the memory tier and counters; _db_lock the SQLite connection
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0,
+        }
+
+    # ─── SQLite tier ─────────────────────────────────────────────────────────
+    # The connection is opened lazily so importing this module never touches disk.
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_cache_entries_created"
+                " ON cache_entries (namespace, created_at)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _remember(self, key: str, expires_at: float, value: Any) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    # ─── Public API ──────────────────────────────────────────────────────────
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None on a miss/expired entry."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return copy.deepcopy(value)
+                del self._memory[key]
+
+        row = await asyncio.to_thread(self._disk_get, key)
+        with self._lock:
+            if row is None or row[1] <= now:
+                self._counters["misses"] += 1
+                return None
+
+            value = json.loads(row[0])
+            self._remember(key, row[1], value)
+            self._counters["disk_hits"] += 1
+            return copy.deepcopy(value)
+
+    async def set(self, key: str, value: Any) -> None:
+        """Store a value in both tiers."""
+        if not self.enabled:
+            return
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        with self._lock:
+            self._remember(key, expires_at, copy.deepcopy(value))
+            self._counters["sets"] += 1
+        await asyncio.to_thread(self._disk_put, key, json.dumps(value), now, expires_at)
+
+    async def clear(self) -> None:
+        """Drop every entry in this namespace from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        await asyncio.to_thread(self._disk_clear)
+
+    # ─── Disk operations (run in a worker thread) ────────────────────────────
+    def _disk_get(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._db_lock:
+            try:
+                return self._db().execute(
+                    "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"[{self.namespace}] cache read failed: {e}")
+                return None
+
+    def _disk_put(self, key: str, encoded: str, now: float, expires_at: float) -> None:
+        with self._db_lock:
+            try:
+                db = self._db()
+                db.execute(
+                    "INSERT OR REPLACE INTO cache_entries (namespace, key, value, created_at, expires_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (self.namespace, key, encoded, now, expires_at),
+                )
+                self._enforce_disk_cap(db, now)
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"[{self.namespace}] cache write failed: {e}")
+
+    def _disk_clear(self) -> None:
+        with self._db_lock:
+            try:
+                db = self._db()
+                db.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"[{self.namespace}] cache clear failed: {e}")
+
+    def _enforce_disk_cap(self, db: sqlite3.Connection, now: float) -> None:
+        db.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?",
+            (self.namespace, now),
+        )
+        (count,) = db.execute(
+            "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            db.execute(
+                "DELETE FROM cache_entries WHERE rowid IN ("
+                " SELECT rowid FROM cache_entries WHERE namespace = ?"
+                " ORDER BY created_at LIMIT ?)",
+                (self.namespace, overflow),
+            )
+            with self._lock:
+                self._counters["evictions"] += overflow
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters plus current tier sizes."""
+        with self._lock:
+            lookups = self._counters["memory_hits"] + self._counters["disk_hits"] + self._counters["misses"]
+            hits = self._counters["memory_hits"] + self._counters["disk_hits"]
+            return {
+                "namespace": self.namespace,
+                "enabled": self.enabled,
+                **self._counters,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "ttl_seconds": self.ttl_seconds,
+            }
@@ -0,0 +1,48 @@
+"""
+Single-flight request coalescing.
+
+Concurrent callers that ask for the same key share one in-flight task instead
+of each doing the same expensive work (LLM call, NASA fetch, ...). The shared
+task is shielded, so a caller being cancelled never cancels it for the others.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._counters = {"leaders": 0, "coalesced": 0}
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `factory()` unless an identical call is already in flight,
+        in which case await that call's result (or exception) instead.
+        """
+        task = self._inflight.get(key)
+        if task is not None and not task.done():
+            self._counters["coalesced"] += 1
+            logger.debug(f"[{self.name}] coalesced onto in-flight call {key[:12]}")
+        else:
+            self._counters["leaders"] += 1
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved when every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"name": self.name, "in_flight": len(self._inflight), **self._counters}
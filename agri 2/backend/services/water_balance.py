@@ -0,0 +1,148 @@
+"""
+Deterministic crop water balance (numeric Model 3).
+
+For every selected crop:
+  ETc[d]  = Kc[d] × ET₀[d]                      (FAO-56 single crop coefficient)
+  Pe[d]   = EFFECTIVE_RAIN_FRACTION × rain[d]     (runoff / deep percolation losses)
+  a root-zone bucket of ROOT_ZONE_TAW_MM, starting at the current soil
+  moisture index, turns daily Pe − ETc into season deficit and surplus (mm)
+
+The recent POWER window (ET₀ from evapotranspiration.py, rain) stands in for
+the coming season; crops longer than the window cycle through it. All crops
+advance through the season together as NumPy vectors.
+
+Kc curves come from the crop's GrowthStageTemplate rows when present,
+otherwise from FAO-56 Table 11/12 style defaults (ini / mid / end Kc with
+stage lengths as fractions of the crop duration).
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.services.models.schemas import CropContext
+
+EFFECTIVE_RAIN_FRACTION = 0.8
+ROOT_ZONE_TAW_MM = 100.0  # total available water in the root zone
+
+# Share of the irrigation requirement the farm can actually supply
+IRRIGATION_COVER = {"rainfed": 0.0, "limited": 0.5, "adequate": 1.0}
+DEFAULT_IRRIGATION_COVER = 0.5
+
+# (Kc ini, Kc mid, Kc end) and stage fractions (initial, development, mid, late)
+_GENERIC_STAGES = (0.15, 0.25, 0.40, 0.20)
+DEFAULT_KC: Dict[str, Tuple[Tuple[float, float, float], Tuple[float, float, float, float]]] = {
+    "maize": ((0.30, 1.20, 0.60), (0.17, 0.28, 0.33, 0.22)),
+    "rice": ((1.05, 1.20, 0.90), (0.17, 0.17, 0.44, 0.22)),
+    "paddy": ((1.05, 1.20, 0.90), (0.17, 0.17, 0.44, 0.22)),
+    "wheat": ((0.30, 1.15, 0.40), (0.13, 0.27, 0.40, 0.20)),
+    "soybean": ((0.40, 1.15, 0.50), (0.15, 0.15, 0.45, 0.25)),
+    "cotton": ((0.35, 1.20, 0.70), (0.17, 0.28, 0.33, 0.22)),
+    "sugarcane": ((0.40, 1.25, 0.75), (0.08, 0.17, 0.50, 0.25)),
+    "groundnut": ((0.40, 1.15, 0.60), (0.18, 0.23, 0.35, 0.24)),
+    "chickpea": ((0.40, 1.00, 0.35), (0.18, 0.20, 0.40, 0.22)),
+    "sorghum": ((0.30, 1.05, 0.55), (0.16, 0.27, 0.32, 0.25)),
+    "millet": ((0.30, 1.00, 0.30), (0.14, 0.22, 0.40, 0.24)),
+    "potato": ((0.50, 1.15, 0.75), (0.20, 0.25, 0.35, 0.20)),
+    "tomato": ((0.60, 1.15, 0.80), (0.20, 0.27, 0.33, 0.20)),
+    "onion": ((0.70, 1.05, 0.75), (0.10, 0.20, 0.45, 0.25)),
+    "mustard": ((0.35, 1.05, 0.35), (0.15, 0.30, 0.35, 0.20)),
+}
+GENERIC_KC = ((0.40, 1.10, 0.60), _GENERIC_STAGES)
+
+
+def default_kc_curve(crop_name: str, duration_days: int) -> np.ndarray:
+    """FAO-56 piecewise-linear Kc curve: flat ini, ramp, flat mid, ramp to end."""
+    name = crop_name.lower()
+    (kc_ini, kc_mid, kc_end), fractions = next(
+        (params for key, params in DEFAULT_KC.items() if key in name), GENERIC_KC
+    )
+    bounds = np.cumsum(fractions) * duration_days
+    days = np.arange(duration_days) + 0.5
+    return np.interp(
+        days,
+        [0, bounds[0], bounds[1], bounds[2], bounds[3]],
+        [kc_ini, kc_ini, kc_mid, kc_mid, kc_end],
+    )
+
+
+def stage_kc_curve(stages: Sequence[Dict[str, float]], duration_days: int) -> np.ndarray:
+    """Kc per day from growth-stage templates; days past the last stage keep its Kc."""
+    ordered = sorted(stages, key=lambda s: s["start_day"])
+    curve = np.full(duration_days, float(ordered[-1]["kc"]))
+    for stage in ordered:
+        lo = max(int(stage["start_day"]), 0)
+        hi = min(int(stage["end_day"]) + 1, duration_days)
+        curve[lo:hi] = float(stage["kc"])
+    return curve
+
+
+def kc_curve(crop: CropContext, duration_days: Optional[int] = None) -> np.ndarray:
+    duration_days = duration_days or crop.duration_days
+    if crop.kc_stages:
+        return stage_kc_curve(crop.kc_stages, duration_days)
+    return default_kc_curve(crop.name, duration_days)
+
+
+def crop_water_balance(
+    crops: List[CropContext],
+    et0_daily: Sequence[float],
+    rain_daily: Sequence[float],
+    water_availability: str,
+    initial_soil_moisture: Optional[float] = None,
+) -> Dict[str, Dict[str, float]]:
+    """Season ETc, effective rain, deficit, surplus and irrigation need per crop id."""
+    et0 = np.asarray(et0_daily, dtype=np.float64)
+    rain = np.asarray(rain_daily, dtype=np.float64)
+    n_crops = len(crops)
+    durations = np.array([max(int(c.duration_days), 1) for c in crops])
+    max_days = int(durations.max()) if n_crops else 0
+
+    # (crops × days) matrices; the weather window repeats for long-duration crops
+    kc = np.zeros((n_crops, max_days))
+    for i, crop in enumerate(crops):
+        kc[i, :durations[i]] = kc_curve(crop, int(durations[i]))
+    active = np.arange(max_days)[None, :] < durations[:, None]
+    etc = kc * np.resize(et0, max_days)[None, :]
+    pe = np.where(active, EFFECTIVE_RAIN_FRACTION * np.resize(rain, max_days)[None, :], 0.0)
+
+    # Root-zone bucket, all crops stepped together
+    fill = 0.5 if initial_soil_moisture is None else float(np.clip(initial_soil_moisture, 0, 1))
+    storage = np.full(n_crops, ROOT_ZONE_TAW_MM * fill)
+    deficit = np.zeros(n_crops)
+    surplus = np.zeros(n_crops)
+    for d in range(max_days):
+        storage = storage + pe[:, d] - etc[:, d]
+        surplus += np.clip(storage - ROOT_ZONE_TAW_MM, 0, None)
+        deficit += np.clip(-storage, 0, None)
+        storage = np.clip(storage, 0, ROOT_ZONE_TAW_MM)
+
+    cover = IRRIGATION_COVER.get(water_availability.strip().lower(), DEFAULT_IRRIGATION_COVER)
+    etc_total = etc.sum(axis=1)
+    pe_total = pe.sum(axis=1)
+    return {
+        str(crop.id): {
+            "etc_mm": round(float(etc_total[i]), 1),
+            "effective_rain_mm": round(float(pe_total[i]), 1),
+            "deficit_mm": round(float(deficit[i]), 1),
+            "surplus_mm": round(float(surplus[i]), 1),
+            "irrigation_supplied_mm": round(float(deficit[i] * cover), 1),
+            "unmet_deficit_mm": round(float(deficit[i] * (1 - cover)), 1),
+        }
+        for i, crop in enumerate(crops)
+    }
+
+
+def water_balance_score(balance: Dict[str, float]) -> Tuple[int, str]:
+    """0–100 score and Deficit / Balanced / Surplus status from one crop's balance."""
+    etc = max(balance["etc_mm"], 1.0)
+    stress = balance["unmet_deficit_mm"] / etc
+    waterlogging = balance["surplus_mm"] / etc
+    score = 100 * (1 - stress) - min(25.0, 50 * waterlogging)
+    if stress > 0.10:
+        status = "Deficit"
+    elif waterlogging > 0.25:
+        status = "Surplus"
+    else:
+        status = "Balanced"
+    return int(round(float(np.clip(score, 0, 100)))), status
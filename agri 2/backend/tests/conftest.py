@@ -0,0 +1,14 @@
+"""Shared pytest fixtures for the backend test suite."""
+
+import pytest
+
+from backend.services.analysis_job_store import AnalysisJobStore
+from backend.services.job_store_backend import SQLiteJobBackend
+
+
+@pytest.fixture(autouse=True)
+def isolated_job_store(tmp_path):
+    """Each test gets its own SQLite job store instead of backend/analysis_jobs.db."""
+    AnalysisJobStore.configure(SQLiteJobBackend(tmp_path / "analysis_jobs.db"))
+    yield
+    AnalysisJobStore.configure(None)
@@ -0,0 +1,72 @@
+"""
+Tests for the persistent AnalysisJobStore (SQLite backend + hot cache + TTL).
+
+Run with:
+    python -m pytest backend/tests/test_analysis_job_store.py -v
+"""
+
+import time
+
+import backend.config as cfg
+from backend.services.analysis_job_store import AnalysisJobStore, AnalysisStatus
+from backend.services.job_store_backend import MemoryJobBackend, SQLiteJobBackend
+
+
+def restart_worker(db_path):
+    """Simulate a restart / second worker: fresh backend, empty hot cache."""
+    AnalysisJobStore.configure(SQLiteJobBackend(db_path))
+
+
+def test_job_survives_restart_with_incremental_results(tmp_path):
+    db_path = tmp_path / "jobs.db"
+    restart_worker(db_path)
+    job = AnalysisJobStore.create_job({"selected_crop_ids": [1, 4]})
+    AnalysisJobStore.set_crop_names(job.job_id, {1: "Maize", "4": "Soybean"})
+    AnalysisJobStore.set_model_1_result(job.job_id, {"crop_scores": {"1": 80}})
+    AnalysisJobStore.set_model_result(job.job_id, "model_3", {"crop_scores": {"1": 70}})
+    AnalysisJobStore.set_node_timing(job.job_id, "model_3", {"start_ms": 0.0, "duration_ms": 12.5})
+
+    restart_worker(db_path)
+    loaded = AnalysisJobStore.get_job(job.job_id)
+
+    assert loaded is not job
+    assert loaded.status == AnalysisStatus.MODEL_1_COMPLETED
+    assert loaded.request_data == {"selected_crop_ids": [1, 4]}
+    assert loaded.crop_names == {"1": "Maize", "4": "Soybean"}
+    assert set(loaded.model_results) == {"model_1", "model_3"}
+    assert loaded.completed_steps == ["Rainfall Analysis"]
+    assert loaded.node_timings["model_3"]["duration_ms"] == 12.5
+    assert loaded.created_at.replace(microsecond=0) == job.created_at.replace(microsecond=0)
+
+
+def test_running_job_sees_progress_written_by_another_worker(tmp_path):
+    db_path = tmp_path / "jobs.db"
+    reader = SQLiteJobBackend(db_path)
+    AnalysisJobStore.configure(reader)
+    job = AnalysisJobStore.create_job({})
+    assert AnalysisJobStore.get_job(job.job_id).status == AnalysisStatus.PENDING
+
+    # Another worker advances the job directly in the shared DB
+    SQLiteJobBackend(db_path).update(job.job_id, {"status": AnalysisStatus.COMPLETED}, time.time() + 60)
+
+    refreshed = AnalysisJobStore.get_job(job.job_id)
+    assert refreshed is job  # same object, refreshed in place
+    assert job.status == AnalysisStatus.COMPLETED
+
+
+def test_expired_jobs_are_purged(tmp_path, monkeypatch):
+    monkeypatch.setattr(cfg, "JOB_TTL_SECONDS", -1.0)
+    job = AnalysisJobStore.create_job({})
+
+    assert AnalysisJobStore.purge_expired() == 1
+    assert AnalysisJobStore.get_job(job.job_id) is None
+
+
+def test_hot_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(cfg, "JOB_HOT_CACHE_SIZE", 3)
+    AnalysisJobStore.configure(MemoryJobBackend())
+    jobs = [AnalysisJobStore.create_job({}) for _ in range(10)]
+
+    assert len(AnalysisJobStore._hot) == 3
+    # Evicted jobs are still served from the backend
+    assert AnalysisJobStore.get_job(jobs[0].job_id) is jobs[0]
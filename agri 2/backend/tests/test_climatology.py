@@ -0,0 +1,112 @@
+"""
+Tests for the climatology baselines behind climate_deviation.
+
+Run with:
+    python -m pytest backend/tests/test_climatology.py -v
+"""
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from backend.services.climatology import (
+    ClimatologyStore, build_cell_climatology, day_of_year_index,
+)
+from backend.services.environment_prefetch import build_climatologies
+from backend.services.nasa_service import NASAService
+from backend.services.power_series_store import CellSeries, PowerSeriesStore
+from backend.services.response_cache import TieredCache
+from backend.tests.test_nasa_service import PARAMETERS, make_power_transport
+
+CELL = (19.0, 73.125)
+
+
+def seasonal_series(first_day: date, years: int, rain_scale: float = 1.0) -> CellSeries:
+    """Deterministic T2M / rain with an annual cycle (rain ∝ 1 + sin)."""
+    n_days = (date(first_day.year + years, 1, 1) - first_day).days
+    slots = day_of_year_index(first_day, n_days)
+    phase = 2 * np.pi * slots / 366
+    return CellSeries(first_day, {
+        "T2M": (25 + 5 * np.sin(phase)).astype(np.float32),
+        "PRECTOTCORR": (rain_scale * 4 * (1 + np.sin(phase))).astype(np.float32),
+    })
+
+
+def test_day_of_year_uses_a_leap_calendar():
+    assert day_of_year_index(date(2024, 2, 29), 1)[0] == 59
+    assert day_of_year_index(date(2023, 3, 1), 1)[0] == day_of_year_index(date(2024, 3, 1), 1)[0] == 60
+    assert day_of_year_index(date(2023, 12, 31), 2).tolist() == [365, 0]
+
+
+def test_baseline_recovers_the_seasonal_cycle():
+    baseline = build_cell_climatology(seasonal_series(date(2010, 1, 1), 10))
+
+    assert baseline.shape == (366, 2, 5)
+    # mean at the peak slot (~day 91) is 25 + 5·sin(π/2) smoothed over ±7 days
+    assert baseline[91, 0, 0] == pytest.approx(30.0, abs=0.1)
+    assert baseline[91, 0, 1] <= baseline[91, 0, 2] <= baseline[91, 0, 3]
+    assert baseline[-1, 1, 4] == pytest.approx(np.nansum(baseline[:, 1, 0]), rel=1e-5)
+
+
+def test_store_roundtrip_and_o1_window_totals(tmp_path):
+    store = ClimatologyStore(tmp_path)
+    assert not store.has(CELL)
+
+    baseline = build_cell_climatology(seasonal_series(date(2010, 1, 1), 10))
+    store.write({CELL: baseline}, {"years": [2010, 2019]})
+    reader = ClimatologyStore(tmp_path)  # e.g. another worker
+
+    stats = reader.lookup(CELL, date(2025, 4, 1))
+    assert stats["T2M"]["mean"] == pytest.approx(float(baseline[91, 0, 0]))
+    assert reader.meta["years"] == [2010, 2019]
+
+    # Window wrapping the year end: two lookups == summing the daily means
+    start, end = date(2024, 11, 15), date(2025, 2, 10)
+    slots = day_of_year_index(start, (end - start).days + 1)
+    assert reader.expected_total(CELL, "PRECTOTCORR", start, end) == pytest.approx(
+        float(baseline[slots, 1, 0].sum()), rel=1e-4
+    )
+
+    # Adding another cell keeps the first; a worker's mapped array is never replaced
+    store.write({(21.0, 79.375): baseline}, {"years": [2010, 2019]})
+    assert ClimatologyStore(tmp_path).has(CELL)
+    assert reader.has((21.0, 79.375))
+    assert len(list(tmp_path.glob("climatology.*.npy"))) == 1
+
+
+def test_rainfall_deviation_against_baseline(tmp_path):
+    store = ClimatologyStore(tmp_path)
+    store.write({CELL: build_cell_climatology(seasonal_series(date(2010, 1, 1), 10))}, {})
+
+    wet = seasonal_series(date(2024, 1, 1), 1, rain_scale=1.5).window(date(2024, 3, 1), date(2024, 8, 27))
+    normal = seasonal_series(date(2024, 1, 1), 1).window(date(2024, 3, 1), date(2024, 8, 27))
+    normal.values["PRECTOTCORR"][-3:] = np.nan  # POWER latency gap is scaled away
+
+    assert store.rainfall_deviation(CELL, wet) == pytest.approx(50.0, abs=2.0)
+    assert store.rainfall_deviation(CELL, normal) == pytest.approx(0.0, abs=2.0)
+    assert store.rainfall_deviation((10.0, 10.0), normal) is None
+
+
+@pytest.mark.asyncio
+async def test_builder_feeds_environmental_data(tmp_path):
+    calls = []
+    cache = TieredCache(namespace="nasa_power", db_path=tmp_path / "cache.db", ttl_seconds=3600)
+    climatology = ClimatologyStore(tmp_path / "climatology")
+    service = NASAService(
+        cache=cache,
+        transport=make_power_transport(calls),
+        series_store=PowerSeriesStore(tmp_path / "series", PARAMETERS),
+        climatology=climatology,
+    )
+
+    report = await build_climatologies([CELL], store=climatology, service=service, years=10, last_year=2024)
+    assert report.fetched == 1 and not report.failed
+    assert (calls[0]["start"], calls[0]["end"]) == ("20150101", "20241231")
+    assert calls[0]["parameters"] == "T2M,PRECTOTCORR"
+    assert cache.stats()["memory_entries"] == 0  # multi-year pulls bypass the cache
+
+    env = await service.get_environmental_data(19.07, 72.88)
+    series = await service.fetch_power_series(19.07, 72.88)
+    assert env.climate_deviation == round(climatology.rainfall_deviation(CELL, series), 2)
+    assert abs(env.climate_deviation) < 10  # synthetic rain has no trend
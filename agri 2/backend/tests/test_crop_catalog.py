@@ -0,0 +1,84 @@
+"""
+Tests for the in-memory crop catalog snapshot and its version invalidation.
+
+Run with:
+    python -m pytest backend/tests/test_crop_catalog.py -v
+"""
+
+import dataclasses
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.data.crop_catalog import CropCatalog, bump_catalog_version, read_catalog_version
+from backend.database import Base
+from backend.models import Crop, GrowthStageTemplate
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    db.add_all([
+        Crop(id=2, name="Cotton", season="Kharif", min_temp=20, max_temp=35, min_rainfall=500,
+             max_rainfall=1000, soil_type="Black", duration_days=160, input_cost_per_acre=25000,
+             market_price_per_quintal=6600, yield_quintal_per_acre=10),
+        Crop(id=1, name="Maize", season="Kharif, Rabi", min_temp=18, max_temp=32),
+        GrowthStageTemplate(crop_id=1, stage_name="Initial", start_day=0, end_day=20, kc_value=0.4),
+        GrowthStageTemplate(crop_id=1, stage_name="Mid", start_day=21, end_day=80, kc_value=None),
+    ])
+    db.commit()
+    db.close()
+
+    calls = []
+
+    def counting_factory():
+        calls.append(1)
+        return factory()
+
+    counting_factory.calls = calls
+    return counting_factory
+
+
+def test_snapshot_loads_once_and_serves_from_memory(session_factory, tmp_path):
+    catalog = CropCatalog(session_factory, version_file=tmp_path / "crop_catalog.version")
+
+    first = catalog.snapshot()
+    for _ in range(5):
+        assert catalog.snapshot() is first
+
+    assert len(session_factory.calls) == 1
+    assert [r.id for r in first.records] == [1, 2]
+    assert len(first.matrix) == 2
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        first.by_id[1].name = "Corn"
+
+
+def test_version_bump_reloads_snapshot(session_factory, tmp_path):
+    version_file = tmp_path / "crop_catalog.version"
+    catalog = CropCatalog(session_factory, version_file=version_file)
+    first = catalog.snapshot()
+    assert first.version == 0
+
+    assert bump_catalog_version(version_file) == 1
+    second = catalog.snapshot()
+
+    assert second is not first and second.version == read_catalog_version(version_file) == 1
+    assert len(session_factory.calls) == 2
+
+
+def test_contexts_are_precomputed_with_defaults(session_factory, tmp_path):
+    snapshot = CropCatalog(session_factory, version_file=tmp_path / "v").snapshot()
+
+    maize = snapshot.contexts[1]
+    assert maize.min_rainfall == 300.0 and maize.duration_days == 120 and maize.soil_type == "Loamy"
+    assert maize.kc_stages == [{"start_day": 0, "end_day": 20, "kc": 0.4}]
+    assert snapshot.contexts[2].kc_stages is None
+
+    selected = snapshot.contexts_for(["2", 1, 99])
+    assert [c.id for c in selected] == [1, 2]
+    selected[0].name = "changed"
+    assert snapshot.contexts[1].name == "Maize"
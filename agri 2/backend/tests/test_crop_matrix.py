@@ -0,0 +1,239 @@
+"""
+Tests for the vectorized CropMatrix prescreen against the per-crop scorer,
+the batch endpoint and the prescreen memo.
+
+Run with:
+    python -m pytest backend/tests/test_crop_matrix.py -v
+"""
+
+import asyncio
+import json
+import random
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from backend.api import routes
+from backend.data.crop_catalog import CropCatalog, CropRecord
+from backend.models import Crop, EnvironmentalData
+from backend.pydantic_models import BatchPrescreenRequest, Location, PrescreenRequest, WaterAvailability
+from backend.services import crop_selection_engine
+from backend.services.crop_matrix import CropMatrix
+from backend.services.crop_selection_engine import CropSelectionEngine
+from backend.services.input_processor import InputProcessor
+from backend.services.prescreen_memo import PrescreenMemo, prescreen_fingerprint
+
+SEASONS = ["Kharif", "Rabi", "Zaid", "Annual", "Kharif, Rabi", "Rabi,Zaid", "Perennial", None]
+SOILS = ["Black", "Loamy, Clay", "Red sandy", "Alluvial", "Black cotton soil", "", None]
+
+
+def random_crop(rng: random.Random, crop_id: int) -> Crop:
+    t_min = rng.uniform(5, 28)
+    r_min = rng.choice([0.0, rng.uniform(100, 1200)])
+    return Crop(
+        id=crop_id,
+        name=f"Crop {crop_id}",
+        season=rng.choice(SEASONS),
+        min_temp=t_min,
+        max_temp=t_min + rng.choice([0.0, rng.uniform(2, 18)]),
+        min_rainfall=r_min,
+        max_rainfall=r_min + rng.choice([0.0, rng.uniform(50, 1500)]),
+        soil_type=rng.choice(SOILS),
+        duration_days=rng.choice([0, rng.randint(60, 365)]),
+        input_cost_per_acre=rng.choice([0.0, rng.uniform(5_000, 120_000)]),
+        market_price_per_quintal=rng.choice([0.0, rng.uniform(500, 12_000)]),
+        yield_quintal_per_acre=rng.uniform(2, 60),
+        perishability=rng.choice(["Low", "High"]),
+    )
+
+
+def random_env(rng: random.Random) -> EnvironmentalData:
+    avg = rng.uniform(12, 36)
+    return EnvironmentalData(
+        avg_temp=round(avg, 2), min_temp=round(avg - 6, 2), max_temp=round(avg + 6, 2),
+        rainfall_total=round(rng.uniform(0, 1500), 2), rainfall_variability=rng.uniform(0, 100),
+        rainfall_stability=10.0, soil_moisture_index=0.3, soil_moisture_estimate=30.0,
+        avg_humidity=60.0, gdd=rng.choice([0.0, rng.uniform(200, 3500)]),
+        heat_stress_days=rng.choice([0, rng.randint(1, 40)]),
+        cold_stress_days=0, dry_spell_days=rng.randint(0, 40),
+    )
+
+
+def random_request(rng: random.Random, lat: float = 19.0, lon: float = 73.0) -> PrescreenRequest:
+    return PrescreenRequest(
+        location=Location(lat=lat, lon=lon), land_area=5.0,
+        water_availability=rng.choice(list(WaterAvailability)),
+        budget_per_acre=rng.choice([0.0, rng.uniform(3_000, 100_000)]),
+        soil_type=rng.choice(["Black", "loamy ", "clay", "cotton", "", None]),
+    )
+
+
+def make_catalog(crops, tmp_path) -> CropCatalog:
+    catalog = CropCatalog(version_file=tmp_path / "crop_catalog.version")
+    catalog.set_records([CropRecord.from_orm(c) for c in crops])
+    return catalog
+
+
+def make_engine(env: EnvironmentalData, rng: random.Random, crops, tmp_path) -> CropSelectionEngine:
+    request = random_request(rng)
+    engine = CropSelectionEngine(MagicMock(), env, request, catalog=make_catalog(crops, tmp_path))
+    engine.current_season = rng.choice(["Kharif", "Rabi", "Zaid"])
+    return engine
+
+
+def scalar_results(engine: CropSelectionEngine, crops):
+    viable = engine.hard_filter(crops)
+    max_price = max((c.market_price_per_quintal for c in viable), default=1.0)
+    scored = [{"crop": c, **engine.score_candidate(c, max_price)} for c in viable]
+    scored.sort(key=lambda x: x["score"], reverse=True)
+    return [(item["crop"].id, item["score"], item["breakdown"]) for item in scored]
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_matrix_matches_scalar_scoring(seed, tmp_path):
+    rng = random.Random(seed)
+    crops = [random_crop(rng, i) for i in range(1, 61)]
+    engine = make_engine(random_env(rng), rng, crops, tmp_path)
+
+    vectorized = engine.score_matrix(CropMatrix.from_crops(crops)).items
+
+    assert [(i["crop"].id, i["score"], i["breakdown"]) for i in vectorized] == scalar_results(engine, crops)
+
+
+def test_prescreen_response_uses_matrix_ranking(tmp_path):
+    rng = random.Random(7)
+    crops = [random_crop(rng, i) for i in range(1, 41)]
+    engine = make_engine(random_env(rng), rng, crops, tmp_path)
+
+    response = engine.get_prescreen_results()
+
+    expected = scalar_results(engine, crops)
+    assert [c.id for c in response.candidates] == [str(crop_id) for crop_id, _, _ in expected]
+    assert response.recommended_top_ids == [str(crop_id) for crop_id, _, _ in expected[:3]]
+
+
+def test_empty_catalog(tmp_path):
+    engine = make_engine(random_env(random.Random(1)), random.Random(1), [], tmp_path)
+    ranking = engine.score_matrix(CropMatrix.from_crops([]), top=5)
+    assert ranking.items == [] and ranking.n_viable == 0
+
+
+def test_batch_matches_single_farm_prescreens(tmp_path):
+    rng = random.Random(11)
+    catalog = make_catalog([random_crop(rng, i) for i in range(1, 81)], tmp_path)
+    farms = [(random_request(rng), random_env(rng)) for _ in range(12)]
+
+    with patch.object(InputProcessor, "get_current_season", return_value="Kharif"):
+        batch = CropSelectionEngine.prescreen_batch(MagicMock(), farms, catalog=catalog)
+        single = [
+            CropSelectionEngine(MagicMock(), env, request, catalog=catalog).get_prescreen_results()
+            for request, env in farms
+        ]
+
+    assert [r.model_dump() for r in batch] == [r.model_dump() for r in single]
+
+
+@pytest.mark.asyncio
+async def test_batch_route_fetches_each_grid_cell_once(tmp_path):
+    rng = random.Random(3)
+    catalog = make_catalog([random_crop(rng, i) for i in range(1, 21)], tmp_path)
+    env = random_env(rng)
+    # Two farms share a cell near Nashik, one is in Pune
+    request = BatchPrescreenRequest(farms=[
+        random_request(rng, 19.99, 73.78), random_request(rng, 20.01, 73.80), random_request(rng, 18.52, 73.85),
+    ])
+    fetch = AsyncMock(side_effect=[env, RuntimeError("NASA down")])
+
+    with patch.object(routes.EnvironmentalService, "fetch_environmental_data", fetch), \
+         patch.object(crop_selection_engine, "crop_catalog", catalog):
+        response = await routes.prescreen_crops_batch(request, db=MagicMock())
+
+    assert fetch.await_count == response.cells == 2
+    assert response.results[0] is not None and response.results[1] is not None
+    assert response.results[2] is None and response.errors == {2: "NASA down"}
+
+
+@pytest.mark.asyncio
+async def test_batch_route_caps_concurrent_cell_fetches(tmp_path, monkeypatch):
+    rng = random.Random(4)
+    catalog = make_catalog([random_crop(rng, i) for i in range(1, 6)], tmp_path)
+    env = random_env(rng)
+    request = BatchPrescreenRequest(farms=[random_request(rng, 10.0 + i, 75.0) for i in range(8)])
+    monkeypatch.setattr(routes, "NASA_PREFETCH_CONCURRENCY", 2)
+    running, peak = 0, 0
+
+    async def fetch(lat, lon):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return env
+
+    with patch.object(routes.EnvironmentalService, "fetch_environmental_data", fetch), \
+         patch.object(crop_selection_engine, "crop_catalog", catalog):
+        response = await routes.prescreen_crops_batch(request, db=MagicMock())
+
+    assert response.cells == 8 and not response.errors
+    assert peak == 2
+
+
+def test_memo_reuses_response_until_catalog_changes(tmp_path):
+    rng = random.Random(5)
+    crops = [random_crop(rng, i) for i in range(1, 31)]
+    catalog = make_catalog(crops, tmp_path)
+    memo = PrescreenMemo(max_entries=8)
+    request, env = random_request(rng), random_env(rng)
+
+    def prescreen():
+        return CropSelectionEngine(MagicMock(), env, request, catalog=catalog, memo=memo).get_prescreen_entry()
+
+    with patch.object(CropSelectionEngine, "score_matrix", wraps=CropSelectionEngine.score_matrix,
+                      autospec=True) as scoring:
+        first, second = prescreen(), prescreen()
+        assert second is first and scoring.call_count == 1
+        assert json.loads(first.json) == first.response.model_dump()
+
+        catalog.set_records([CropRecord.from_orm(c) for c in crops[:10]], version=1)
+        third = prescreen()
+
+    assert third is not first and scoring.call_count == 2
+    assert memo.stats()["invalidations"] == 1
+
+
+def test_fingerprint_quantizes_and_evicts_lru(tmp_path):
+    rng = random.Random(9)
+    env, request = random_env(rng), random_request(rng)
+    nudged = env.model_copy(update={"avg_temp": env.avg_temp + 0.001})
+    assert prescreen_fingerprint(env, request, "Kharif", 0) == prescreen_fingerprint(nudged, request, "Kharif", 0)
+    assert prescreen_fingerprint(env, request, "Kharif", 0) != prescreen_fingerprint(env, request, "Rabi", 0)
+    assert prescreen_fingerprint(env, request, "Kharif", 0) != prescreen_fingerprint(env, request, "Kharif", 1)
+
+    memo = PrescreenMemo(max_entries=2)
+    for key in ("a", "b", "c"):
+        memo.put((key,), MagicMock())
+    assert memo.get(("a",)) is None and memo.get(("c",)) is not None
+    assert memo.stats()["evictions"] == 1
+
+
+@pytest.mark.parametrize("limit,offset", [(1, 0), (3, 0), (5, 4), (10, 25), (200, 0)])
+def test_paged_prescreen_matches_slice_of_full_ranking(limit, offset, tmp_path):
+    rng = random.Random(21)
+    crops = [random_crop(rng, i) for i in range(1, 121)]
+    for crop in crops[::3]:  # plenty of score ties
+        crop.min_temp, crop.max_temp = 10.0, 40.0
+    catalog = make_catalog(crops, tmp_path)
+    request, env = random_request(rng), random_env(rng)
+    paged_request = request.model_copy(update={"limit": limit, "offset": offset})
+    memo = PrescreenMemo()
+
+    full = CropSelectionEngine(MagicMock(), env, request, catalog=catalog, memo=memo)
+    paged = CropSelectionEngine(MagicMock(), env, paged_request, catalog=catalog, memo=memo)
+    paged.current_season = full.current_season
+    everything, page = full.get_prescreen_results(), paged.get_prescreen_results()
+
+    assert [c.model_dump() for c in page.candidates] == \
+        [c.model_dump() for c in everything.candidates[offset:offset + limit]]
+    assert page.recommended_top_ids == everything.recommended_top_ids
+    assert page.total_candidates == everything.total_candidates == len(everything.candidates)
+    assert (page.offset, page.limit) == (offset, limit)
@@ -0,0 +1,126 @@
+"""
+Tests for the DAG scheduler and the DAG-driven analysis job.
+
+Run with:
+    python -m pytest backend/tests/test_dag_scheduler.py -v
+"""
+
+import asyncio
+import time
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from backend.services import llm_orchestrator
+from backend.services.analysis_job_store import AnalysisJobStore, AnalysisStatus
+from backend.services.dag_scheduler import DAGNode, DAGScheduler, topological_order
+from backend.services.models.schemas import (
+    Model1Result, Model2Result, Model3Result, Model4Result,
+    Model5Result, Model6Result, Model7Result, Model8Result,
+)
+from backend.tests.test_llm_pipeline import make_context
+
+
+def sleeper(value, seconds: float):
+    async def run(*_):
+        await asyncio.sleep(seconds)
+        return value
+    return run
+
+
+@pytest.mark.asyncio
+async def test_independent_nodes_run_concurrently():
+    nodes = [DAGNode(f"n{i}", sleeper(i, 0.1)) for i in range(5)]
+    nodes.append(DAGNode("sum", lambda *xs: asyncio.sleep(0, result=sum(xs)), deps=tuple(f"n{i}" for i in range(5))))
+
+    t0 = time.perf_counter()
+    results = await DAGScheduler(nodes).run()
+
+    assert results["sum"] == 10
+    assert time.perf_counter() - t0 < 0.3  # critical path ≈ 0.1s, not 5 × 0.1s
+
+
+@pytest.mark.asyncio
+async def test_completion_callback_streams_in_finish_order_with_timings():
+    seen = []
+    scheduler = DAGScheduler(
+        [
+            DAGNode("slow", sleeper("s", 0.05)),
+            DAGNode("fast", sleeper("f", 0.0)),
+            DAGNode("after", lambda s, f: asyncio.sleep(0, result=s + f), deps=("slow", "fast")),
+        ],
+        on_complete=lambda key, result, timing: seen.append(key),
+    )
+    results = await scheduler.run()
+
+    assert seen == ["fast", "slow", "after"]
+    assert results["after"] == "sf"
+    assert scheduler.timings["slow"]["duration_ms"] >= 40
+    assert scheduler.timings["after"]["start_ms"] >= scheduler.timings["slow"]["duration_ms"]
+
+
+@pytest.mark.asyncio
+async def test_failure_cancels_pending_nodes():
+    async def boom():
+        raise ValueError("model failed")
+
+    finished = []
+    nodes = [
+        DAGNode("boom", boom),
+        DAGNode("slow", sleeper("s", 1.0)),
+        DAGNode("final", lambda *_: asyncio.sleep(0), deps=("boom", "slow")),
+    ]
+    scheduler = DAGScheduler(nodes, on_complete=lambda key, *_: finished.append(key))
+
+    with pytest.raises(ValueError, match="model failed"):
+        await scheduler.run()
+    assert finished == []
+
+
+def test_cycles_and_unknown_deps_are_rejected():
+    noop = sleeper(None, 0)
+    with pytest.raises(ValueError, match="cycle"):
+        topological_order([DAGNode("a", noop, ("b",)), DAGNode("b", noop, ("a",))])
+    with pytest.raises(ValueError, match="unknown"):
+        topological_order([DAGNode("a", noop, ("missing",))])
+
+
+def result(cls, name: str, score: int):
+    return cls(
+        model_name=name,
+        crop_scores={"1": score, "4": score - 10, "7": score - 20},
+        risk_factors={},
+        key_findings=[f"{name} ok"],
+        confidence=80,
+    )
+
+
+@pytest.mark.asyncio
+async def test_analysis_job_streams_all_nine_models_to_job_store():
+    runners = {
+        "run_model_1": result(Model1Result, "rainfall_feasibility", 80),
+        "run_model_2": result(Model2Result, "soil_moisture", 75),
+        "run_model_3": result(Model3Result, "water_balance", 70),
+        "run_model_4": result(Model4Result, "climate_thermal", 85),
+        "run_model_5": result(Model5Result, "economic_viability", 65),
+        "run_model_6": result(Model6Result, "risk_assessment", 70),
+        "run_model_7": result(Model7Result, "market_access", 60),
+        "run_model_8": result(Model8Result, "demand_analysis", 72),
+    }
+    patches = [patch.object(llm_orchestrator, name, AsyncMock(return_value=value)) for name, value in runners.items()]
+    for p in patches:
+        p.start()
+    try:
+        job = AnalysisJobStore.create_job({})
+        raw = await llm_orchestrator.run_analysis_job(make_context(), job.job_id)
+    finally:
+        for p in patches:
+            p.stop()
+
+    assert raw["final_decision"]["best_crop_id"] == 1
+    assert set(raw["model_outputs"]) == set(llm_orchestrator._OUTPUT_KEYS.values())
+    assert set(job.model_results) == {f"model_{i}" for i in range(1, 10)}
+    assert job.completed_steps[-1] == "Final Synthesis"
+    assert set(job.node_timings) == {f"model_{i}" for i in range(1, 10)}
+    # Result is handed back to the caller, which marks the job completed
+    assert job.status == AnalysisStatus.PROCESSING_MODEL_9
@@ -0,0 +1,70 @@
+"""
+Tests for the vectorized environmental metrics.
+
+Run with:
+    python -m pytest backend/tests/test_environment_metrics.py -v
+"""
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from backend.scripts.bench_environment_metrics import legacy_environmental_data, synthetic_series
+from backend.services.environment_metrics import compute_environmental_data, longest_run
+from backend.services.power_series_store import CellSeries
+
+nan = np.nan
+
+
+def series_of(first_day: date, **columns) -> CellSeries:
+    n_days = len(next(iter(columns.values())))
+    values = {
+        name: np.array(columns.get(name, [nan] * n_days), dtype=np.float32)
+        for name in ["T2M", "T2M_MIN", "T2M_MAX", "PRECTOTCORR", "RH2M", "GWETTOP"]
+    }
+    return CellSeries(first_day, values)
+
+
+@pytest.mark.parametrize("days", [1, 45, 180, 730])
+def test_matches_dict_implementation(days):
+    rng = np.random.default_rng(days)
+    for _ in range(20):
+        series = synthetic_series(rng, days, first_day=date(2023, 11, 20))
+        assert compute_environmental_data(series) == legacy_environmental_data(series.to_power_parameters())
+
+
+def test_hand_checked_gdd_stress_and_dry_spell():
+    series = series_of(
+        date(2024, 1, 30),
+        T2M=[20, 22, 24, 26, 28],
+        T2M_MIN=[8, 12, nan, 20, 22],
+        T2M_MAX=[30, 36, 30, 38, 34],
+        PRECTOTCORR=[0, 1.0, 2.4, nan, 0.5],
+    )
+    env = compute_environmental_data(series)
+
+    # GDD: (30+8)/2-10=9, (36+12)/2-10=14, day 3 skipped (no Tmin), 19, 18
+    assert env.gdd == 60.0
+    assert env.heat_stress_days == 2
+    assert env.cold_stress_days == 1
+    # 0, 1.0, 2.4 are dry; the missing day breaks the run
+    assert env.dry_spell_days == 3
+    assert env.rainfall_total == 3.9
+    # Monthly totals Jan = 1.0 mm, Feb = 2.9 mm -> stdev 1.34 / mean 1.95
+    assert env.rainfall_variability == 68.9
+    assert env.avg_humidity == 0.0
+    assert env == legacy_environmental_data(series.to_power_parameters())
+
+
+def test_missing_temperature_raises():
+    series = series_of(date(2024, 1, 1), T2M=[nan, nan], PRECTOTCORR=[1.0, 2.0])
+    with pytest.raises(ValueError, match="No valid temperature"):
+        compute_environmental_data(series)
+
+
+def test_longest_run():
+    assert longest_run(np.array([], dtype=bool)) == 0
+    assert longest_run(np.array([False, False])) == 0
+    assert longest_run(np.array([True, True, False, True, True, True, False])) == 3
+    assert longest_run(np.array([True] * 4)) == 4
@@ -0,0 +1,93 @@
+"""
+Tests for the bulk environment prefetch (grid-cell dedup + bounded fetching).
+
+Run with:
+    python -m pytest backend/tests/test_environment_prefetch.py -v
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from backend.services.environment_prefetch import (
+    cells_for_bbox, cells_for_geojson, cells_for_points, prefetch_cells,
+)
+from backend.services.nasa_service import NASAService
+from backend.services.power_series_store import PowerSeriesStore
+from backend.services.response_cache import TieredCache
+from backend.tests.test_nasa_service import PARAMETERS, make_power_transport, power_payload
+
+
+def make_service(tmp_path, transport) -> NASAService:
+    cache = TieredCache(namespace="nasa_power", db_path=tmp_path / "cache.db", ttl_seconds=3600)
+    store = PowerSeriesStore(tmp_path / "series", PARAMETERS)
+    return NASAService(cache=cache, transport=transport, series_store=store)
+
+
+def test_points_are_deduplicated_to_cells():
+    cells = cells_for_points([(19.07, 72.88), (19.12, 73.05), (19.24, 72.70), (19.07, 72.88)])
+    assert cells == [(19.0, 73.125), (19.0, 72.5)]
+
+
+def test_bbox_covers_every_overlapping_cell():
+    cells = cells_for_bbox(18.8, 72.5, 19.6, 73.2)
+    assert set(cells) == {(lat, lon) for lat in (19.0, 19.5) for lon in (72.5, 73.125)}
+    with pytest.raises(ValueError):
+        cells_for_bbox(20, 72, 19, 73)
+
+
+def test_geojson_polygon_cells():
+    # Square 18.6..19.9 × 72.4..73.5 with a hole around (19.5, 73.125)
+    outer = [[72.4, 18.6], [73.5, 18.6], [73.5, 19.9], [72.4, 19.9], [72.4, 18.6]]
+    hole = [[73.0, 19.4], [73.2, 19.4], [73.2, 19.6], [73.0, 19.6], [73.0, 19.4]]
+    feature = {"type": "Feature", "geometry": {"type": "Polygon", "coordinates": [outer, hole]}}
+    cells = cells_for_geojson({"type": "FeatureCollection", "features": [feature]})
+
+    assert (19.0, 72.5) in cells and (19.5, 72.5) in cells
+    assert (19.5, 73.125) not in cells  # centre in the hole, no vertex in it
+
+    tiny = {"type": "Polygon", "coordinates": [[[72.86, 19.05], [72.9, 19.05], [72.9, 19.1], [72.86, 19.05]]]}
+    assert cells_for_geojson(tiny) == [(19.0, 73.125)]
+
+
+@pytest.mark.asyncio
+async def test_prefetch_warms_each_cell_once_with_bounded_concurrency(tmp_path):
+    calls, active, peak = [], 0, 0
+    inner = make_power_transport(calls)
+
+    class SlowTransport(httpx.AsyncBaseTransport):
+        async def handle_async_request(self, request):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return await inner.handle_async_request(request)
+
+    service = make_service(tmp_path, SlowTransport())
+    cells = cells_for_bbox(18.0, 72.0, 20.0, 74.0)
+    report = await prefetch_cells(cells, service=service, concurrency=3)
+
+    assert report.fetched == report.cells == len(cells) == len(calls)
+    assert not report.failed
+    assert peak <= 3
+
+    # Daytime request from any farm in a warmed cell: no network call
+    await service.get_environmental_data(19.07, 72.88)
+    assert len(calls) == len(cells)
+
+
+@pytest.mark.asyncio
+async def test_failed_cells_are_reported_not_fatal(tmp_path):
+    def handler(request: httpx.Request) -> httpx.Response:
+        query = dict(request.url.params)
+        if float(query["latitude"]) == 19.5:
+            return httpx.Response(503, text="busy")
+        return httpx.Response(200, json=power_payload(query["start"], query["end"]))
+
+    service = make_service(tmp_path, httpx.MockTransport(handler))
+    report = await prefetch_cells([(19.0, 72.5), (19.5, 72.5)], service=service)
+
+    assert report.fetched == 1
+    assert list(report.failed) == ["19.5,72.5"]
@@ -0,0 +1,113 @@
+"""
+Tests for the SSE job event stream fed by AnalysisJobStore notifications.
+
+Run with:
+    python -m pytest backend/tests/test_job_events.py -v
+"""
+
+import asyncio
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from backend.api import routes
+from backend.services.analysis_job_store import AnalysisJobStore, AnalysisStatus
+
+
+def parse(chunks):
+    events = []
+    for chunk in chunks:
+        if chunk.startswith("event: "):
+            head, data = chunk.strip().split("\n", 1)
+            events.append((head[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def connected_request():
+    request = MagicMock()
+    request.is_disconnected = AsyncMock(return_value=False)
+    return request
+
+
+async def collect(job_id: str):
+    return [chunk async for chunk in routes._job_event_stream(job_id, connected_request())]
+
+
+@pytest.mark.asyncio
+async def test_stream_pushes_each_model_then_completion():
+    job = AnalysisJobStore.create_job({})
+
+    async def run_job():
+        await asyncio.sleep(0.01)
+        AnalysisJobStore.update_status(job.job_id, AnalysisStatus.PROCESSING_MODEL_1)
+        AnalysisJobStore.set_model_1_result(job.job_id, {"crop_scores": {"1": 80}})
+        await asyncio.sleep(0.01)
+        AnalysisJobStore.set_model_result(job.job_id, "model_2", {"crop_scores": {"1": 70}})
+        AnalysisJobStore.set_transformed_result(job.job_id, {"best_crop": "Maize"})
+        AnalysisJobStore.set_full_result(job.job_id, {"model_outputs": {}})
+
+    writer = asyncio.create_task(run_job())
+    events = parse(await asyncio.wait_for(collect(job.job_id), timeout=2))
+    await writer
+
+    names = [name for name, _ in events]
+    assert names[0] == "progress"
+    assert [data["model_key"] for name, data in events if name == "model_result"] == ["model_1", "model_2"]
+    assert events[-1] == ("completed", {"result": {"best_crop": "Maize"}})
+    assert AnalysisJobStore._subscribers == {}
+
+
+@pytest.mark.asyncio
+async def test_finished_job_replays_and_closes():
+    job = AnalysisJobStore.create_job({})
+    AnalysisJobStore.set_error(job.job_id, "LLM quota exhausted")
+
+    events = parse(await collect(job.job_id))
+
+    assert events[-1] == ("failed", {"error": "LLM quota exhausted"})
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_rechecks_store_without_notifications():
+    job = AnalysisJobStore.create_job({})
+
+    async def other_worker():
+        await asyncio.sleep(0.05)
+        # Written without a notification, as another process would
+        AnalysisJobStore._get_backend().update(
+            job.job_id, {"status": AnalysisStatus.COMPLETED, "transformed_result": {"ok": True}}, 1e12,
+        )
+
+    with patch.object(routes, "JOB_EVENTS_HEARTBEAT_SECONDS", 0.02):
+        writer = asyncio.create_task(other_worker())
+        chunks = await asyncio.wait_for(collect(job.job_id), timeout=2)
+        await writer
+
+    assert ": keepalive\n\n" in chunks
+    assert parse(chunks)[-1] == ("completed", {"result": {"ok": True}})
+
+
+@pytest.mark.asyncio
+async def test_refined_model_result_is_pushed_again():
+    job = AnalysisJobStore.create_job({})
+    AnalysisJobStore.set_model_results(job.job_id, {
+        "model_1": {"crop_scores": {"1": 60}, "provenance": "numeric"},
+        "model_2": {"crop_scores": {"1": 55}, "provenance": "numeric"},
+    })
+    AnalysisJobStore.set_transformed_result(job.job_id, {"best_crop": "Maize (estimate)"})
+
+    async def run_job():
+        await asyncio.sleep(0.01)
+        AnalysisJobStore.set_model_result(job.job_id, "model_2", {"crop_scores": {"1": 80}, "provenance": "llm"})
+        await asyncio.sleep(0.01)
+        AnalysisJobStore.set_full_result(job.job_id, {"model_outputs": {}}, transformed_result={"best_crop": "Maize"})
+
+    writer = asyncio.create_task(run_job())
+    events = parse(await asyncio.wait_for(collect(job.job_id), timeout=2))
+    await writer
+
+    assert ("preliminary", {"result": {"best_crop": "Maize (estimate)"}}) in events
+    model_events = [(d["model_key"], d["result"]["provenance"]) for name, d in events if name == "model_result"]
+    assert model_events == [("model_1", "numeric"), ("model_2", "numeric"), ("model_2", "llm")]
+    assert events[-1] == ("completed", {"result": {"best_crop": "Maize"}})
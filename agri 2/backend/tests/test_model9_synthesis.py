@@ -0,0 +1,97 @@
+"""
+Tests for the deterministic Model 9 synthesis engine.
+
+Run with:
+    python -m pytest backend/tests/test_model9_synthesis.py -v
+"""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from backend.services.models.schemas import (
+    Model1Result, Model2Result, Model3Result, Model4Result,
+    Model5Result, Model6Result, Model7Result, Model8Result,
+)
+from backend.services.models.model9_synthesis import compute_synthesis, run_model_9
+from backend.tests.test_llm_pipeline import make_context
+
+
+def result(cls, name, scores, risk_factors=None, confidence=80):
+    return cls(
+        model_name=name,
+        crop_scores={str(k): v for k, v in scores.items()},
+        risk_factors={str(k): v for k, v in (risk_factors or {}).items()},
+        key_findings=[f"{name} finding"],
+        confidence=confidence,
+    )
+
+
+def make_model_outputs():
+    return (
+        result(Model1Result, "rainfall_feasibility", {1: 78, 4: 72, 7: 65}),
+        result(Model2Result, "soil_moisture", {1: 80, 4: 75, 7: 68}),
+        result(Model3Result, "water_balance", {1: 82, 4: 76, 7: 60}),
+        result(Model4Result, "climate_thermal", {1: 85, 4: 80, 7: 72}),
+        result(Model5Result, "economic_viability", {1: 75, 4: 80, 7: 65},
+               {1: {"roi_probability": 72}, 4: {"roi_probability": 60}, 7: {"roi_probability": 55}}),
+        result(Model6Result, "risk_assessment", {1: 75, 4: 65, 7: 40},
+               {1: {"risk_index": 25}, 4: {"risk_index": 35}}),  # crop 7 falls back to 100 - score
+        result(Model7Result, "market_access", {1: 80, 4: 85, 7: 75}),
+        result(Model8Result, "demand_analysis", {1: 78, 4: 82, 7: 70}),
+    )
+
+
+def test_formula_matches_documented_weights():
+    m = make_model_outputs()
+    decision = compute_synthesis(make_context(), *m)
+
+    # Maize (id 1): base = (78×.12 + 80×.10 + 82×.10 + 85×.15 + 75×.18 + 78×.12 + 80×.08) / .85
+    base = (78 * .12 + 80 * .10 + 82 * .10 + 85 * .15 + 75 * .18 + 78 * .12 + 80 * .08) / .85
+    maize = decision.decision_matrix["1"]
+    assert maize.overall_score == round(base - 25 * 0.25)
+    assert maize.risk_level == "Low"
+    assert maize.economic_outlook == "Strong"
+
+    soybean = decision.decision_matrix["4"]
+    assert soybean.risk_level == "Moderate"
+    assert soybean.economic_outlook == "Moderate"  # roi_probability below 65
+
+    cotton = decision.decision_matrix["7"]
+    assert cotton.risk_level == "Moderate"  # risk_index = 100 - 40
+    assert cotton.risk_adjusted_score == 40
+
+
+def test_ranking_and_alternatives():
+    decision = compute_synthesis(make_context(), *make_model_outputs())
+    ranked = sorted(decision.decision_matrix.values(), key=lambda e: -e.overall_score)
+    assert decision.best_crop_id == ranked[0].crop_id
+    assert decision.alternative_crop_ids == [e.crop_id for e in ranked[1:3]]
+    assert 0 <= decision.confidence_score <= 100
+    assert decision.cropping_system == "Standalone"
+    assert "Maize" in decision.reasoning_summary
+
+
+@pytest.mark.asyncio
+async def test_run_model_9_needs_no_llm_by_default():
+    with patch("backend.services.models.model9_synthesis.call_llm", new_callable=AsyncMock) as mock_llm:
+        decision = await run_model_9(make_context(), *make_model_outputs(), use_llm_summary=False)
+        mock_llm.assert_not_called()
+    assert decision.best_crop_id == 1
+
+
+@pytest.mark.asyncio
+async def test_llm_only_writes_the_summary():
+    with patch("backend.services.models.model9_synthesis.call_llm", new_callable=AsyncMock) as mock_llm:
+        mock_llm.return_value = {"reasoning_summary": "Grow maize.", "best_crop_id": 7}
+        decision = await run_model_9(make_context(), *make_model_outputs(), use_llm_summary=True)
+    assert decision.reasoning_summary == "Grow maize."
+    assert decision.best_crop_id == 1
+
+
+@pytest.mark.asyncio
+async def test_llm_summary_failure_keeps_decision():
+    with patch("backend.services.models.model9_synthesis.call_llm", new_callable=AsyncMock) as mock_llm:
+        mock_llm.side_effect = ValueError("429")
+        decision = await run_model_9(make_context(), *make_model_outputs(), use_llm_summary=True)
+    assert decision.best_crop_id == 1
+    assert "Maize" in decision.reasoning_summary
@@ -0,0 +1,91 @@
+"""
+Tests for the legacy rule-based models and the concurrent /farm/analyze path.
+
+Run with:
+    python -m pytest backend/tests/test_model_engine.py -v
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from backend.api import routes
+from backend.data.crop_catalog import CropCatalog, CropRecord
+from backend.models import EnvironmentalData, FarmInput, ModelResult
+from backend.services import crop_selection_engine
+from backend.services.input_processor import InputProcessor
+from backend.services.model_engine import ModelOrchestrator
+
+
+def make_record(crop_id: int, name: str, **overrides) -> CropRecord:
+    fields = dict(
+        id=crop_id, name=name, season="Kharif, Rabi, Zaid", min_temp=18.0, max_temp=34.0,
+        min_rainfall=400.0, max_rainfall=1000.0, water_requirement_mm=600.0, soil_type="Black, Loamy",
+        duration_days=110, input_cost_per_acre=15000.0, market_price_per_quintal=4500.0,
+        market_potential="High", yield_quintal_per_acre=10.0, risk_factor="Medium",
+        perishability="Low", base_temp_c=10.0,
+    )
+    fields.update(overrides)
+    return CropRecord(**fields)
+
+
+ENV = EnvironmentalData(
+    avg_temp=27.0, min_temp=21.0, max_temp=33.0, rainfall_total=420.0, rainfall_variability=35.0,
+    soil_moisture_index=0.4, gdd=1800.0, heat_stress_days=2, dry_spell_days=6,
+)
+FARM = FarmInput(latitude=19.99, longitude=73.78, land_area=4, soil_type="Black",
+                 water_source="Canal", budget=20000)
+
+
+@pytest.mark.asyncio
+async def test_all_six_models_run_for_a_catalog_record():
+    results = await ModelOrchestrator.run_all_models(InputProcessor.process(FARM), ENV, make_record(1, "Soybean"))
+
+    assert [r.id for r in results] == [1, 2, 3, 4, 5, 6]
+    assert all(isinstance(r, ModelResult) and 0 <= r.score <= 100 for r in results)
+    water, economics = results[2], results[4]
+    assert water.name == "Water Balance" and water.score == 90
+    assert economics.name == "Economic Viability" and economics.status == "Green"
+
+
+@pytest.mark.asyncio
+async def test_candidates_run_concurrently_with_a_bound():
+    in_flight, peak = 0, 0
+
+    async def slow_models(ctx, env, crop):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return [crop.name]
+
+    crops = [make_record(i, f"Crop {i}") for i in range(6)]
+    with patch.object(ModelOrchestrator, "run_all_models", side_effect=slow_models):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        results = await ModelOrchestrator.run_for_candidates(None, ENV, crops, concurrency=3)
+        elapsed = loop.time() - started
+
+    assert [r for _, r in results] == [[c.name] for c in crops]
+    assert peak == 3 and elapsed < 0.25
+
+
+@pytest.mark.asyncio
+async def test_analyze_farm_uses_catalog_rows_without_requery(tmp_path):
+    catalog = CropCatalog(version_file=tmp_path / "crop_catalog.version")
+    catalog.set_records([
+        make_record(1, "Soybean"),
+        make_record(2, "Cotton", risk_factor="High", market_price_per_quintal=6600.0),
+        make_record(3, "Grapes", min_temp=40.0, max_temp=45.0),  # fails the hard filter
+    ])
+    db = MagicMock()
+
+    with patch.object(routes.EnvironmentalService, "fetch_environmental_data", AsyncMock(return_value=ENV)), \
+         patch.object(crop_selection_engine, "crop_catalog", catalog):
+        response = await routes.analyze_farm(FARM, db=db)
+
+    db.query.assert_not_called()
+    assert response.final_decision.crop in {"Soybean", "Cotton"}
+    assert len(response.models) == 6
@@ -0,0 +1,100 @@
+"""
+Tests for the batched multi-domain mode (Models 2–8 in one LLM call).
+
+Run with:
+    python -m pytest backend/tests/test_multi_domain.py -v
+"""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from backend.services.models.multi_domain import DOMAINS, run_models_2_to_8_batched
+from backend.services.models.schemas import Model3Result, Model8Result
+from backend.tests.test_llm_pipeline import make_context
+
+
+def section(name: str, score: int) -> dict:
+    return {
+        "model_name": name,
+        "crop_scores": {"1": score, "4": score - 5, "7": score - 10},
+        "risk_factors": {"1": {"note": name}},
+        "key_findings": [f"{name} looks fine"],
+        "confidence": 80,
+    }
+
+
+BATCHED_RESPONSE = {key: section(name, 70) for key, _, name, _, _ in DOMAINS}
+
+
+@pytest.mark.asyncio
+async def test_one_call_yields_all_seven_results():
+    with patch("backend.services.models.multi_domain.call_llm", new_callable=AsyncMock) as mock_llm:
+        mock_llm.return_value = BATCHED_RESPONSE
+        results = await run_models_2_to_8_batched(make_context())
+
+    mock_llm.assert_awaited_once()
+    assert list(results) == [f"model_{i}" for i in range(2, 9)]
+    assert isinstance(results["model_3"], Model3Result)
+    assert isinstance(results["model_8"], Model8Result)
+    assert results["model_4"].model_name == "climate_thermal"
+    assert results["model_6"].crop_scores == {"1": 70, "4": 65, "7": 60}
+
+
+@pytest.mark.asyncio
+async def test_broken_section_falls_back_to_its_own_model():
+    partial = dict(BATCHED_RESPONSE)
+    partial["demand"] = "not a section"
+    del partial["water_balance"]
+
+    with patch("backend.services.models.multi_domain.call_llm", new_callable=AsyncMock) as batch_llm, \
+         patch("backend.services.models.model3_water_balance.call_llm", new_callable=AsyncMock) as m3_llm, \
+         patch("backend.services.models.model8_demand.call_llm", new_callable=AsyncMock) as m8_llm:
+        batch_llm.return_value = partial
+        m3_llm.return_value = section("water_balance", 40)
+        m8_llm.return_value = section("demand_analysis", 30)
+        results = await run_models_2_to_8_batched(make_context())
+
+    m3_llm.assert_awaited_once()
+    m8_llm.assert_awaited_once()
+    assert results["model_3"].crop_scores["1"] == 40
+    assert results["model_8"].crop_scores["1"] == 30
+    assert results["model_2"].crop_scores["1"] == 70
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_call_runs_every_model():
+    with patch("backend.services.models.multi_domain.call_llm", new_callable=AsyncMock) as batch_llm:
+        batch_llm.side_effect = ValueError("LLM returned non-JSON")
+        patches = [
+            patch(f"{module.__name__}.call_llm", new_callable=AsyncMock, return_value=section(name, 55))
+            for _, _, name, _, module in DOMAINS
+        ]
+        mocks = [p.start() for p in patches]
+        try:
+            results = await run_models_2_to_8_batched(make_context())
+        finally:
+            for p in patches:
+                p.stop()
+
+    assert all(m.await_count == 1 for m in mocks)
+    assert len(results) == 7
+
+
+@pytest.mark.asyncio
+async def test_numeric_model_3_drops_water_balance_from_the_batch(monkeypatch):
+    monkeypatch.setattr("backend.services.models.multi_domain.MODEL3_MODE", "numeric")
+    context = make_context()
+    context.environment.et0_mm_day = 5.0
+    without_water = {k: v for k, v in BATCHED_RESPONSE.items() if k != "water_balance"}
+
+    with patch("backend.services.models.multi_domain.call_llm", new_callable=AsyncMock) as mock_llm, \
+         patch("backend.services.models.model3_water_balance.call_llm", new_callable=AsyncMock) as m3_llm:
+        mock_llm.return_value = without_water
+        results = await run_models_2_to_8_batched(context)
+
+    system_prompt, user_prompt = mock_llm.await_args.args[:2]
+    assert "water_balance" not in system_prompt
+    assert "et0_mm_day" not in user_prompt
+    m3_llm.assert_not_awaited()
+    assert list(results) == [f"model_{i}" for i in range(2, 9)]
+    assert results["model_3"].provenance == "computed"
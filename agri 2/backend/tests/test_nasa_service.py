@@ -0,0 +1,205 @@
+"""
+Tests for the NASA POWER client: grid snapping, the cell + window cache and
+request coalescing in EnvironmentalService.
+
+No real API calls: a stand-in POWER server (httpx.MockTransport) answers
+with a synthetic daily payload and records every request it receives.
+
+Run with:
+    python -m pytest backend/tests/test_nasa_service.py -v
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+import backend.config as cfg
+from backend.services import environmental_service
+from backend.services.environmental_service import EnvironmentalService
+from backend.services.nasa_service import NASAService, snap_to_grid
+from backend.services.power_series_store import PowerSeriesStore
+from backend.services.response_cache import TieredCache
+
+PARAMETERS = cfg.NASA_PARAMETERS.split(",")
+
+
+def power_payload(start: str, end: str, missing_from: str = "99999999", lagging=None) -> dict:
+    """
+    Synthetic POWER daily/point JSON covering start..end (YYYYMMDD); -999 from
+    `missing_from` on, for the `lagging` parameters only if given.
+    """
+    day = datetime.strptime(start, "%Y%m%d")
+    last = datetime.strptime(end, "%Y%m%d")
+    params = {name: {} for name in ("T2M", "T2M_MAX", "T2M_MIN", "PRECTOTCORR", "RH2M", "GWETTOP")}
+    while day <= last:
+        key = day.strftime("%Y%m%d")
+        i = day.toordinal()  # values depend on the date only, like real data
+        params["T2M"][key] = 25.0 + (i % 7)
+        params["T2M_MAX"][key] = 31.0 + (i % 9)
+        params["T2M_MIN"][key] = 18.0 + (i % 5)
+        params["PRECTOTCORR"][key] = [0.0, 1.2, 8.5, 0.0, 14.0, 0.3, 0.0][i % 7]
+        params["RH2M"][key] = 60.0 + (i % 11)
+        params["GWETTOP"][key] = 0.4 + (i % 3) / 10
+        if key >= missing_from:
+            for name, values in params.items():
+                if lagging is None or name in lagging:
+                    values[key] = -999.0
+        day += timedelta(days=1)
+    return {"geometry": {"coordinates": [0, 0, 550.0]}, "properties": {"parameter": params}}
+
+
+def make_power_transport(calls: list, missing_from: str = "99999999", lagging=None) -> httpx.MockTransport:
+    """Stand-in POWER server; appends each request's query params to `calls`."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        query = dict(request.url.params)
+        calls.append(query)
+        return httpx.Response(200, json=power_payload(query["start"], query["end"], missing_from, lagging))
+    return httpx.MockTransport(handler)
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def service(tmp_path, calls):
+    cache = TieredCache(namespace="nasa_power", db_path=tmp_path / "cache.db", ttl_seconds=3600)
+    store = PowerSeriesStore(tmp_path / "series", PARAMETERS)
+    return NASAService(cache=cache, transport=make_power_transport(calls), series_store=store)
+
+
+def test_snap_to_grid_uses_power_cell_centres():
+    assert snap_to_grid(19.07, 72.88) == (19.0, 73.125)
+    assert snap_to_grid(19.24, 72.70) == (19.0, 72.5)
+    assert snap_to_grid(-0.2, -0.4) == (0.0, -0.625)
+
+
+@pytest.mark.asyncio
+async def test_farms_in_one_cell_share_a_single_fetch(service, calls):
+    first = await service.get_environmental_data(19.07, 72.88)
+    second = await service.get_environmental_data(19.12, 73.05)  # same cell, different farm
+
+    assert len(calls) == 1
+    assert (float(calls[0]["latitude"]), float(calls[0]["longitude"])) == (19.0, 73.125)
+    assert first == second
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_a_new_process(tmp_path, calls):
+    db_path = tmp_path / "cache.db"
+    await NASAService(
+        cache=TieredCache(namespace="nasa_power", db_path=db_path, ttl_seconds=3600),
+        transport=make_power_transport(calls),
+    ).fetch_power_data(19.07, 72.88)
+
+    restarted = NASAService(
+        cache=TieredCache(namespace="nasa_power", db_path=db_path, ttl_seconds=3600),
+        transport=make_power_transport(calls),
+    )
+    await restarted.fetch_power_data(19.07, 72.88)
+
+    assert len(calls) == 1
+    assert restarted.cache.stats()["disk_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_other_cell_or_window_is_fetched(service, calls):
+    end = datetime(2025, 6, 30)
+    await service.fetch_power_data(19.07, 72.88, end - timedelta(days=30), end)
+    await service.fetch_power_data(19.07, 72.88, end - timedelta(days=60), end)  # other window
+    await service.fetch_power_data(21.15, 79.09, end - timedelta(days=30), end)  # other cell
+
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_next_day_fetches_only_the_new_day(service, calls):
+    end = datetime(2025, 6, 30)
+    first = await service.fetch_power_series(19.07, 72.88, end - timedelta(days=180), end)
+    await service.fetch_power_series(19.07, 72.88, end - timedelta(days=179), end + timedelta(days=1))
+
+    assert len(calls) == 2
+    assert calls[1]["start"] == calls[1]["end"] == "20250701"
+    assert first.n_days == 181
+    assert service.cache.stats()["sets"] == 0  # the series store is the only persisted copy
+
+
+@pytest.mark.asyncio
+async def test_window_from_store_matches_a_direct_fetch(service, calls):
+    end = datetime(2025, 6, 30)
+    await service.fetch_power_series(19.07, 72.88, end - timedelta(days=200), end - timedelta(days=20))
+    stitched = await service.fetch_power_series(19.07, 72.88, end - timedelta(days=180), end)
+
+    direct = power_payload((end - timedelta(days=180)).strftime("%Y%m%d"), end.strftime("%Y%m%d"))
+    parameters = stitched.to_power_parameters()
+    for name, by_day in direct["properties"]["parameter"].items():
+        assert parameters[name] == pytest.approx(by_day)
+    assert calls[1]["start"] == "20250611"
+
+
+@pytest.mark.asyncio
+async def test_trailing_missing_days_are_not_persisted(tmp_path, calls):
+    store = PowerSeriesStore(tmp_path / "series", PARAMETERS)
+    cache = TieredCache(namespace="nasa_power", db_path=tmp_path / "cache.db", ttl_seconds=3600, enabled=False)
+    end = datetime(2025, 6, 30)
+    service = NASAService(cache=cache, transport=make_power_transport(calls, missing_from="20250629"), series_store=store)
+
+    await service.fetch_power_series(19.07, 72.88, end - timedelta(days=30), end)
+    assert store.load(snap_to_grid(19.07, 72.88)).last_day.isoformat() == "2025-06-28"
+
+    # POWER has published the late days by the next request: only they are fetched
+    service.transport = make_power_transport(calls)
+    series = await service.fetch_power_series(19.07, 72.88, end - timedelta(days=30), end)
+    assert (calls[-1]["start"], calls[-1]["end"]) == ("20250629", "20250630")
+    assert not any(v != v for v in series.values["T2M"].tolist())  # no NaN left
+
+
+@pytest.mark.asyncio
+async def test_partially_published_days_are_refetched(tmp_path, calls):
+    store = PowerSeriesStore(tmp_path / "series", PARAMETERS)
+    cache = TieredCache(namespace="nasa_power", db_path=tmp_path / "cache.db", ttl_seconds=3600, enabled=False)
+    end = datetime(2025, 6, 30)
+    # The newest day has T2M but PRECTOTCORR is still -999
+    transport = make_power_transport(calls, missing_from="20250630", lagging=("PRECTOTCORR",))
+    service = NASAService(cache=cache, transport=transport, series_store=store)
+
+    await service.fetch_power_series(19.07, 72.88, end - timedelta(days=30), end)
+    assert store.load(snap_to_grid(19.07, 72.88)).last_day.isoformat() == "2025-06-29"
+
+    service.transport = make_power_transport(calls)
+    series = await service.fetch_power_series(19.07, 72.88, end - timedelta(days=30), end)
+    assert (calls[-1]["start"], calls[-1]["end"]) == ("20250630", "20250630")
+    assert not any(v != v for v in series.values["PRECTOTCORR"].tolist())
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_for_one_cell_share_a_fetch(tmp_path, calls):
+    inner = make_power_transport(calls)
+
+    class SlowTransport(httpx.AsyncBaseTransport):
+        async def handle_async_request(self, request):
+            await asyncio.sleep(0.05)
+            return await inner.handle_async_request(request)
+
+    cache = TieredCache(namespace="nasa_power", db_path=tmp_path / "cache.db", ttl_seconds=3600)
+    store = PowerSeriesStore(tmp_path / "series", PARAMETERS)
+    slow = NASAService(cache=cache, transport=SlowTransport(), series_store=store)
+
+    with patch.object(environmental_service, "nasa_service", slow):
+        farms = [(19.07, 72.88), (19.12, 73.05), (19.2, 72.9)] * 4 + [(21.15, 79.09)]
+        results = await asyncio.gather(
+            *(EnvironmentalService.fetch_environmental_data(lat, lon) for lat, lon in farms)
+        )
+
+    assert len(calls) == 2  # one per distinct cell
+    assert all(r == results[0] for r in results[:-1])
+    # Coalesced callers get distinct objects: one farm's edits don't leak into another's
+    assert len({id(r) for r in results}) == len(results)
+    results[0].daily_rain_mm.append(99.0)
+    results[0].avg_temp = -1.0
+    assert results[1].avg_temp != -1.0 and results[1].daily_rain_mm != results[0].daily_rain_mm
+    assert environmental_service.env_inflight.stats()["in_flight"] == 0
@@ -0,0 +1,335 @@
+"""
+Tests for the numeric Models 1–8, the LLM-unavailable degradation path and
+refine-mode jobs (numeric estimate first, LLM results replace it).
+
+Run with:
+    python -m pytest backend/tests/test_numeric_engine.py -v
+"""
+
+import time
+
+import httpx
+import pytest
+from fastapi import BackgroundTasks
+from pydantic import ValidationError
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import backend.config as cfg
+from backend.api import routes
+from backend.data.crop_catalog import CropCatalog
+from backend.services import llm_orchestrator, openrouter_client
+from backend.services.analysis_job_store import AnalysisJobStore
+from backend.services.llm_orchestrator import run_pipeline
+from backend.services.model_engine import ClimateModel, RiskAssessmentModel, SoilAnalysisModel
+from backend.services.models.numeric_engine import NumericInputs, run_numeric_models
+from backend.services.models.schemas import FullAnalysisRequest, Model1Result, Model9Result
+from backend.services.openrouter_client import LLMUnavailableError
+from backend.services.rate_limiter import LLMRateLimiter
+from backend.services.response_cache import TieredCache
+from backend.services.risk_service import RiskService
+from backend.tests.test_llm_pipeline import make_context
+from backend.tests.test_model_engine import ENV, make_record
+
+MODEL_NAMES = [
+    "rainfall_feasibility", "soil_moisture", "water_balance", "climate_thermal",
+    "economic_viability", "risk_assessment", "market_access", "demand_analysis",
+]
+
+
+@pytest.fixture(autouse=True)
+def isolated_client_state(tmp_path, monkeypatch):
+    """Throwaway response cache and limiter, so 429 pauses don't leak into other tests."""
+    monkeypatch.setattr(
+        openrouter_client, "llm_cache",
+        TieredCache(namespace="llm_response", db_path=tmp_path / "cache.db", ttl_seconds=60),
+    )
+    monkeypatch.setattr(
+        openrouter_client, "rate_limiter", LLMRateLimiter({"default": {"rpm": 0, "tpm": 0}}),
+    )
+
+
+def test_numeric_models_cover_every_crop():
+    results = run_numeric_models(make_context())
+
+    assert list(results) == [f"model_{i}" for i in range(1, 9)]
+    assert [r.model_name for r in results.values()] == MODEL_NAMES
+    assert isinstance(results["model_1"], Model1Result)
+    for result in results.values():
+        assert set(result.crop_scores) == set(result.risk_factors) == {"1", "4", "7"}
+        assert all(0 <= s <= 100 for s in result.crop_scores.values())
+        assert len(result.key_findings) == 2
+    # Model 9 reads these numeric fields
+    assert all(0 <= f["risk_index"] <= 100 for f in results["model_6"].risk_factors.values())
+    assert all(0 <= f["roi_probability"] <= 100 for f in results["model_5"].risk_factors.values())
+
+
+def test_numeric_models_are_deterministic():
+    first = {k: r.model_dump() for k, r in run_numeric_models(make_context()).items()}
+    second = {k: r.model_dump() for k, r in run_numeric_models(make_context()).items()}
+    assert first == second
+
+
+def test_soil_climate_and_risk_use_the_rule_based_scorers():
+    context = make_context()
+    inputs = NumericInputs(context)
+    results = run_numeric_models(context)
+
+    for crop in context.selected_crops:
+        cid = str(crop.id)
+        climate, _ = ClimateModel.assess(inputs.env_data, crop)
+        safety, _ = RiskAssessmentModel.assess(inputs.env_data, crop)
+        safety += RiskService.calculate_risk_penalty(crop, inputs.env_data)
+        assert results["model_4"].crop_scores[cid] == climate
+        assert results["model_6"].crop_scores[cid] == max(0, min(100, safety))
+        assert results["model_6"].risk_factors[cid]["risk_index"] == 100 - results["model_6"].crop_scores[cid]
+
+    # Model 2: SoilAnalysisModel's soil-type match moves the score, moisture unchanged
+    crop = context.selected_crops[0]
+    matching, other = make_context(), make_context()
+    matching.user.soil_type, other.user.soil_type = crop.soil_type, "Laterite-xyz"
+    assert SoilAnalysisModel.assess(matching.user.soil_type, crop.soil_type)[0] == 95
+    assert run_numeric_models(matching)["model_2"].crop_scores[str(crop.id)] > \
+        run_numeric_models(other)["model_2"].crop_scores[str(crop.id)]
+
+
+def test_drier_farm_scores_lower_on_rainfall():
+    wet, dry = make_context(), make_context()
+    dry.environment.rainfall_mm = 60.0
+    assert sum(run_numeric_models(dry)["model_1"].crop_scores.values()) < \
+        sum(run_numeric_models(wet)["model_1"].crop_scores.values())
+
+
+@pytest.mark.asyncio
+async def test_instant_mode_makes_no_llm_calls(monkeypatch):
+    monkeypatch.setattr(cfg, "OPENROUTER_API_KEY", "sk-or-fake-key-for-test")
+    with patch.object(llm_orchestrator, "ANALYSIS_MODE", "instant"), \
+         patch.object(openrouter_client, "_post_with_retries", new_callable=AsyncMock) as mock_post, \
+         patch("backend.services.models.model9_synthesis.call_llm", new_callable=AsyncMock) as mock_m9:
+        mock_m9.side_effect = LLMUnavailableError("no key")
+        results, _ = await run_pipeline(make_context())
+
+    mock_post.assert_not_called()
+    assert isinstance(results["model_9"], Model9Result)
+    assert [results[f"model_{i}"].model_name for i in range(1, 9)] == MODEL_NAMES
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("batch_mode", [False, True])
+async def test_402_degrades_to_numeric_in_milliseconds(batch_mode, monkeypatch):
+    monkeypatch.setattr(cfg, "OPENROUTER_API_KEY", "sk-or-fake-key-for-test")
+    monkeypatch.setattr(llm_orchestrator, "LLM_BATCH_MODE", batch_mode)
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(402, json={"error": {"message": "Insufficient credits"}})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        monkeypatch.setattr(openrouter_client, "get_client", lambda: client)
+        started = time.perf_counter()
+        results, _ = await run_pipeline(make_context())
+        elapsed = time.perf_counter() - started
+
+    expected = run_numeric_models(make_context())
+    assert requests and elapsed < 1.0
+    for key, estimate in expected.items():
+        assert results[key].provenance == "numeric_fallback"
+        assert results[key].crop_scores == estimate.crop_scores
+    assert isinstance(results["model_9"], Model9Result)
+    assert results["model_9"].provenance == "numeric_fallback"
+
+
+@pytest.mark.asyncio
+async def test_429_with_long_retry_after_gives_up_at_once(monkeypatch):
+    monkeypatch.setattr(cfg, "OPENROUTER_API_KEY", "sk-or-fake-key-for-test")
+    transport = httpx.MockTransport(lambda request: httpx.Response(429, headers={"Retry-After": "3600"}))
+
+    async with httpx.AsyncClient(transport=transport) as client:
+        with pytest.raises(LLMUnavailableError, match="429"):
+            await openrouter_client.call_llm("system", "quota", client=client, use_cache=False)
+
+
+@pytest.mark.asyncio
+async def test_fallback_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(llm_orchestrator, "LLM_FALLBACK_ENABLED", False)
+    monkeypatch.setattr(llm_orchestrator, "LLM_BATCH_MODE", False)
+    monkeypatch.setattr(cfg, "OPENROUTER_API_KEY", "")
+
+    with pytest.raises(LLMUnavailableError):
+        await run_pipeline(make_context())
+
+
+# ─── Refine mode ──────────────────────────────────────────────────────────────
+
+def llm_result(model_key: str, score: int):
+    estimate = run_numeric_models(make_context())[model_key]
+    return estimate.model_copy(update={
+        "crop_scores": {cid: score for cid in estimate.crop_scores}, "provenance": None,
+    })
+
+
+@pytest.mark.asyncio
+async def test_refine_job_stores_estimates_then_replaces_them():
+    job = AnalysisJobStore.create_job({})
+    estimate = llm_orchestrator.store_estimates(make_context(), job.job_id)
+
+    stored = AnalysisJobStore.get_job(job.job_id).model_results
+    assert set(stored) == {f"model_{i}" for i in range(1, 10)}
+    assert {r["provenance"] for r in stored.values()} == {"numeric"}
+    assert estimate["final_decision"]["provenance"] == "numeric"
+
+    patches = [
+        patch.object(llm_orchestrator, f"run_model_{i}", AsyncMock(return_value=llm_result(f"model_{i}", 90)))
+        for i in range(1, 9)
+    ]
+    for p in patches:
+        p.start()
+    try:
+        raw = await llm_orchestrator.run_analysis_job(make_context(), job.job_id, mode="refine")
+    finally:
+        for p in patches:
+            p.stop()
+
+    stored = AnalysisJobStore.get_job(job.job_id).model_results
+    assert {r["provenance"] for r in stored.values()} == {"llm"}
+    assert stored["model_4"]["crop_scores"] == {"1": 90, "4": 90, "7": 90}
+    assert raw["final_decision"]["provenance"] == "llm"
+
+
+@pytest.mark.asyncio
+async def test_refine_fao56_model_3_is_final_from_the_start(monkeypatch):
+    monkeypatch.setattr(cfg, "MODEL3_MODE", "numeric")
+    monkeypatch.setattr(llm_orchestrator, "LLM_BATCH_MODE", False)
+    context = make_context()
+    context.environment.et0_mm_day = 5.0
+    job = AnalysisJobStore.create_job({})
+    llm_orchestrator.store_estimates(context, job.job_id)
+
+    stored = AnalysisJobStore.get_job(job.job_id).model_results
+    assert stored["model_3"]["provenance"] == "computed"
+    assert stored["model_1"]["provenance"] == "numeric"
+
+    patches = [
+        patch.object(llm_orchestrator, f"run_model_{i}", AsyncMock(return_value=llm_result(f"model_{i}", 90)))
+        for i in range(1, 9) if i != 3
+    ]
+    for p in patches:
+        p.start()
+    try:
+        raw = await llm_orchestrator.run_analysis_job(context, job.job_id, mode="refine")
+    finally:
+        for p in patches:
+            p.stop()
+
+    stored = AnalysisJobStore.get_job(job.job_id).model_results
+    assert stored["model_3"]["provenance"] == "computed"
+    assert raw["final_decision"]["provenance"] == "llm"
+
+
+@pytest.mark.asyncio
+async def test_submit_refine_returns_preliminary_result(tmp_path):
+    catalog = CropCatalog(version_file=tmp_path / "crop_catalog.version")
+    catalog.set_records([make_record(1, "Soybean"), make_record(2, "Cotton", risk_factor="High")])
+    request = FullAnalysisRequest(
+        location={"lat": 19.99, "lon": 73.78}, land_area=4, water_availability="Limited",
+        budget_per_acre=20000, selected_crop_ids=[1, 2], soil_type="Black", mode="refine",
+    )
+    tasks = BackgroundTasks()
+
+    with patch.object(routes.EnvironmentalService, "fetch_environmental_data", AsyncMock(return_value=ENV)), \
+         patch.object(routes, "crop_catalog", catalog):
+        response = await routes.submit_crop_job(request, tasks, db=MagicMock())
+
+    preliminary = response["preliminary_result"]
+    assert response["mode"] == "refine" and len(tasks.tasks) == 1
+    assert preliminary["best_crop"] in {"Soybean", "Cotton"}
+    assert [card["provenance"] for card in preliminary["modelResults"]] == ["numeric"] * 9
+
+    status = routes.get_job_status(response["job_id"])
+    assert status["result"] is None and status["preliminary_result"] == preliminary
+
+
+def test_request_rejects_unknown_mode():
+    with pytest.raises(ValidationError, match="mode"):
+        FullAnalysisRequest(
+            location={"lat": 19.99, "lon": 73.78}, land_area=4, water_availability="Limited",
+            budget_per_acre=20000, selected_crop_ids=[1], mode="turbo",
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [
+    ValueError("Model 4 returned invalid JSON"),
+    httpx.HTTPStatusError("502", request=httpx.Request("POST", "https://openrouter.ai"),
+                          response=httpx.Response(502)),
+    httpx.ReadTimeout("timed out"),
+])
+async def test_refine_job_keeps_estimate_when_llm_fails(error, monkeypatch):
+    monkeypatch.setattr(llm_orchestrator, "LLM_BATCH_MODE", False)
+    job = AnalysisJobStore.create_job({})
+    llm_orchestrator.store_estimates(make_context(), job.job_id)
+
+    patches = [
+        patch.object(llm_orchestrator, f"run_model_{i}", AsyncMock(return_value=llm_result(f"model_{i}", 90)))
+        for i in range(1, 9) if i != 4
+    ] + [patch.object(llm_orchestrator, "run_model_4", AsyncMock(side_effect=error))]
+    for p in patches:
+        p.start()
+    try:
+        raw = await llm_orchestrator.run_analysis_job(make_context(), job.job_id, mode="refine")
+    finally:
+        for p in patches:
+            p.stop()
+
+    stored = AnalysisJobStore.get_job(job.job_id).model_results
+    assert stored["model_4"]["provenance"] == "numeric_fallback"
+    assert stored["model_4"]["crop_scores"] == run_numeric_models(make_context())["model_4"].crop_scores
+    assert stored["model_1"]["provenance"] == "llm"
+    assert raw["final_decision"]["provenance"] == "mixed"
+
+
+@pytest.mark.asyncio
+async def test_llm_mode_still_fails_on_llm_errors(monkeypatch):
+    monkeypatch.setattr(llm_orchestrator, "LLM_BATCH_MODE", False)
+    with patch.object(llm_orchestrator, "run_model_1", AsyncMock(side_effect=ValueError("bad JSON"))):
+        with pytest.raises(ValueError, match="bad JSON"):
+            await run_pipeline(make_context(), mode="llm")
+
+
+@pytest.mark.asyncio
+async def test_start_analysis_honours_refine_mode(tmp_path):
+    catalog = CropCatalog(version_file=tmp_path / "crop_catalog.version")
+    catalog.set_records([make_record(1, "Soybean"), make_record(2, "Cotton")])
+    request = FullAnalysisRequest(
+        location={"lat": 19.99, "lon": 73.78}, land_area=4, water_availability="Limited",
+        budget_per_acre=20000, selected_crop_ids=[1, 2], mode="refine",
+    )
+    tasks = BackgroundTasks()
+
+    with patch.object(routes.EnvironmentalService, "fetch_environmental_data", AsyncMock(return_value=ENV)), \
+         patch.object(routes, "crop_catalog", catalog), \
+         patch.object(routes, "run_analysis_job", AsyncMock(return_value={})) as mock_job:
+        response = await routes.start_analysis(request, tasks, db=MagicMock())
+        await tasks()
+
+    assert response["mode"] == "refine"
+    status = routes.get_analysis_status(response["analysis_id"])
+    assert {r["provenance"] for r in status["model_results"].values()} == {"numeric"}
+    assert mock_job.await_args.kwargs["mode"] == "refine"
+
+
+@pytest.mark.asyncio
+async def test_full_analysis_passes_mode(tmp_path):
+    catalog = CropCatalog(version_file=tmp_path / "crop_catalog.version")
+    catalog.set_records([make_record(1, "Soybean")])
+    request = FullAnalysisRequest(
+        location={"lat": 19.99, "lon": 73.78}, land_area=4, water_availability="Limited",
+        budget_per_acre=20000, selected_crop_ids=[1], mode="instant",
+    )
+
+    with patch.object(routes.EnvironmentalService, "fetch_environmental_data", AsyncMock(return_value=ENV)), \
+         patch.object(routes, "crop_catalog", catalog), \
+         patch.object(routes, "run_full_analysis", AsyncMock(return_value="result")) as mock_run:
+        assert await routes.full_analysis(request, db=MagicMock()) == "result"
+
+    assert mock_run.await_args.kwargs["mode"] == "instant"
@@ -0,0 +1,145 @@
+"""
+Tests for the shared OpenRouter client (connection pool).
+
+No real API calls: requests are answered by an httpx.MockTransport.
+
+Run with:
+    python -m pytest backend/tests/test_openrouter_client.py -v
+"""
+
+import json
+
+import httpx
+import pytest
+
+import backend.config as cfg
+from backend.services import openrouter_client
+from backend.services.rate_limiter import LLMRateLimiter
+from backend.services.response_cache import TieredCache
+
+
+def make_transport(calls: list) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(json.loads(request.content))
+        content = json.dumps({"model_name": "test", "crop_scores": {"1": 70}})
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+    return httpx.MockTransport(handler)
+
+
+@pytest.fixture(autouse=True)
+def isolated_client_state(tmp_path, monkeypatch):
+    """Fake API key, throwaway response cache and no quota pacing for every test."""
+    monkeypatch.setattr(cfg, "OPENROUTER_API_KEY", "sk-or-fake-key-for-test")
+    monkeypatch.setattr(
+        openrouter_client, "llm_cache",
+        TieredCache(namespace="llm_response", db_path=tmp_path / "cache.db", ttl_seconds=60),
+    )
+    monkeypatch.setattr(
+        openrouter_client, "rate_limiter", LLMRateLimiter({"default": {"rpm": 0, "tpm": 0}}),
+    )
+
+
+@pytest.mark.asyncio
+async def test_shared_client_is_reused():
+    """get_client() should hand back the same pooled client within one event loop."""
+    try:
+        first = openrouter_client.get_client()
+        second = openrouter_client.get_client()
+        assert first is second
+        assert not first.is_closed
+    finally:
+        await openrouter_client.close_client()
+
+
+@pytest.mark.asyncio
+async def test_new_event_loop_closes_the_old_pool(monkeypatch):
+    """A pool left over from another (still running) loop is closed on that loop, not orphaned."""
+    import asyncio
+    import threading
+    import time
+
+    other_loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=other_loop.run_forever, daemon=True)
+    thread.start()
+    old = openrouter_client.create_client()
+    monkeypatch.setattr(openrouter_client, "_CLIENT", old)
+    monkeypatch.setattr(openrouter_client, "_CLIENT_LOOP", other_loop)
+    try:
+        new = openrouter_client.get_client()
+        deadline = time.monotonic() + 2
+        while not old.is_closed and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        assert new is not old and old.is_closed
+    finally:
+        await openrouter_client.close_client()
+        other_loop.call_soon_threadsafe(other_loop.stop)
+        thread.join()
+        other_loop.close()
+
+
+@pytest.mark.asyncio
+async def test_call_llm_uses_injected_client():
+    """An explicitly injected client should carry the request."""
+    calls = []
+    async with httpx.AsyncClient(transport=make_transport(calls)) as client:
+        result = await openrouter_client.call_llm("system", "user", client=client)
+    assert result["crop_scores"] == {"1": 70}
+    assert len(calls) == 1
+    assert calls[0]["messages"][-1] == {"role": "user", "content": "user"}
+
+
+@pytest.mark.asyncio
+async def test_identical_calls_are_served_from_cache():
+    """The second identical call should not reach the network."""
+    calls = []
+    async with httpx.AsyncClient(transport=make_transport(calls)) as client:
+        first = await openrouter_client.call_llm("system", "same farm", client=client)
+        second = await openrouter_client.call_llm("system", "same farm", client=client)
+        await openrouter_client.call_llm("system", "other farm", client=client)
+    assert first == second
+    assert len(calls) == 2
+    assert openrouter_client.llm_cache.stats()["memory_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_request():
+    """Identical in-flight calls should be coalesced onto a single POST."""
+    import asyncio
+    calls = []
+    release = asyncio.Event()
+
+    async def slow_handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await release.wait()
+        content = json.dumps({"crop_scores": {"1": 55}})
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(slow_handler)) as client:
+        tasks = [
+            asyncio.create_task(openrouter_client.call_llm("system", "burst", client=client))
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0.05)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+    assert len(calls) == 1
+    assert all(r == {"crop_scores": {"1": 55}} for r in results)
+    # Every caller gets its own dict
+    assert len({id(r) for r in results}) == 5
+
+
+@pytest.mark.asyncio
+async def test_429_honours_retry_after():
+    """A 429 with Retry-After should pause the limiter, then retry and succeed."""
+    import time
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "0.2"}),
+        httpx.Response(200, json={"choices": [{"message": {"content": '{"ok": true}'}}]}),
+    ]
+    transport = httpx.MockTransport(lambda request: responses.pop(0))
+    t0 = time.perf_counter()
+    async with httpx.AsyncClient(transport=transport) as client:
+        result = await openrouter_client.call_llm("system", "retry", client=client)
+    assert result == {"ok": True}
+    assert time.perf_counter() - t0 >= 0.2
@@ -0,0 +1,64 @@
+"""
+Tests for the compact, domain-filtered prompt encoder.
+
+Run with:
+    python -m pytest backend/tests/test_prompt_encoder.py -v
+"""
+
+import json
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from backend.services.models import model4_climate
+from backend.services.models.prompt_encoder import DOMAIN_FIELDS, encode_context
+from backend.services.rate_limiter import estimate_tokens
+from backend.tests.test_llm_pipeline import make_context
+
+
+def test_crops_are_csv_rows_with_domain_columns():
+    text = encode_context(make_context(), "climate")
+    lines = text.splitlines()
+
+    header = lines.index("CROPS") + 1
+    assert lines[header] == "id,name,season,min_temp,max_temp,duration_days"
+    assert lines[header + 1] == "1,Maize,Kharif,18,35,110"
+    assert len(lines) == header + 1 + 3  # one row per selected crop
+
+
+def test_irrelevant_fields_are_stripped():
+    text = encode_context(make_context(), "climate")
+
+    assert "avg_temp=26.4" in text
+    assert "budget_per_acre" not in text
+    assert "market_price_per_quintal" not in text
+    assert "FARM" not in text  # climate needs no user fields
+
+
+def test_every_domain_is_smaller_than_the_indented_json_dump():
+    context = make_context()
+    baseline = estimate_tokens(json.dumps(context.model_dump(), indent=2))
+
+    for domain in DOMAIN_FIELDS:
+        assert estimate_tokens(encode_context(context, domain)) < baseline / 2, domain
+
+
+def test_all_domain_keeps_every_crop_column_used_by_models_2_to_8():
+    columns = encode_context(make_context(), "all").splitlines()
+    header = columns[columns.index("CROPS") + 1].split(",")
+
+    for domain in ("soil", "water_balance", "climate", "economic", "risk", "market_access", "demand"):
+        assert set(DOMAIN_FIELDS[domain][2]) <= set(header)
+
+
+@pytest.mark.asyncio
+async def test_model_sends_encoded_prompt():
+    mock = AsyncMock(return_value={
+        "model_name": "climate_thermal", "crop_scores": {"1": 80},
+        "risk_factors": {}, "key_findings": [], "confidence": 70,
+    })
+    context = make_context()
+    with patch.object(model4_climate, "call_llm", mock):
+        await model4_climate.run_model_4(context)
+
+    assert mock.call_args.args[1] == encode_context(context, "climate")
@@ -0,0 +1,80 @@
+"""
+Tests for the token-bucket LLM rate limiter.
+
+Run with:
+    python -m pytest backend/tests/test_rate_limiter.py -v
+"""
+
+import pytest
+
+from backend.services.rate_limiter import LLMRateLimiter, TokenBucket, _parse_reset_seconds
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_bucket_refills_continuously():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock)  # 1 token / second
+    for _ in range(60):
+        bucket.consume(1)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    clock.now += 0.5
+    assert bucket.wait_time(1) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert bucket.wait_time(1) == 0.0
+
+
+def test_zero_limit_means_unlimited():
+    bucket = TokenBucket(0)
+    bucket.consume(10_000)
+    assert bucket.wait_time(10_000) == 0.0
+
+
+def test_groups_resolve_model_then_provider_then_default():
+    limiter = LLMRateLimiter({
+        "default": {"rpm": 20},
+        "meta-llama": {"rpm": 30},
+        "meta-llama/llama-3.3-70b-instruct:free": {"rpm": 5},
+    })
+    assert limiter._group_key("meta-llama/llama-3.3-70b-instruct:free") == "meta-llama/llama-3.3-70b-instruct:free"
+    assert limiter._group_key("meta-llama/llama-3.2-3b-instruct") == "meta-llama"
+    assert limiter._group_key("google/gemma-3-12b-it") == "default"
+
+
+@pytest.mark.asyncio
+async def test_acquire_only_waits_when_quota_is_spent():
+    limiter = LLMRateLimiter({"default": {"rpm": 600, "tpm": 0}})  # 10 req/s
+    _, group = limiter._group("m")
+    group.requests.tokens = 2
+    assert await limiter.acquire("m", 100) == 0.0
+    assert await limiter.acquire("m", 100) == 0.0
+    waited = await limiter.acquire("m", 100)
+    assert 0.05 < waited < 0.5
+
+
+def test_headers_clamp_and_pause_the_group():
+    clock = FakeClock()
+    limiter = LLMRateLimiter({"default": {"rpm": 20, "tpm": 6000}}, clock)
+    limiter.observe("m", {"x-ratelimit-remaining-tokens": "1200"}, 200)
+    _, group = limiter._group("m")
+    assert group.tokens.tokens == 1200
+
+    limiter.observe("m", {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "1m30s"}, 200)
+    assert group.blocked_until == pytest.approx(clock.now + 90)
+
+    delay = limiter.observe("m", {"Retry-After": "120"}, 429)
+    assert delay == 120
+    assert group.blocked_until == pytest.approx(clock.now + 120)
+
+
+def test_reset_header_formats():
+    assert _parse_reset_seconds("7.5") == 7.5
+    assert _parse_reset_seconds("250ms") == pytest.approx(0.25)
+    assert _parse_reset_seconds("2m59.56s") == pytest.approx(179.56)
+    assert _parse_reset_seconds("not-a-time") is None
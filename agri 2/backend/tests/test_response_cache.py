@@ -0,0 +1,90 @@
+"""
+Tests for the two-tier (memory LRU + SQLite) response cache.
+
+Run with:
+    python -m pytest backend/tests/test_response_cache.py -v
+"""
+
+import threading
+import time
+
+import pytest
+
+from backend.services.response_cache import TieredCache, make_cache_key
+
+
+def make_cache(tmp_path, **kwargs) -> TieredCache:
+    options = dict(namespace="test", db_path=tmp_path / "cache.db", ttl_seconds=60)
+    options.update(kwargs)
+    return TieredCache(**options)
+
+
+def test_cache_key_is_stable_and_order_sensitive():
+    assert make_cache_key("m", "sys", "user", 0.6, 500) == make_cache_key("m", "sys", "user", 0.6, 500)
+    assert make_cache_key("m", "sys", "user", 0.6, 500) != make_cache_key("m", "user", "sys", 0.6, 500)
+
+
+@pytest.mark.asyncio
+async def test_memory_then_disk_hits(tmp_path):
+    cache = make_cache(tmp_path)
+    assert await cache.get("k") is None
+    await cache.set("k", {"crop_scores": {"1": 80}})
+    assert await cache.get("k") == {"crop_scores": {"1": 80}}
+
+    # A fresh instance on the same file only has the disk tier
+    reopened = make_cache(tmp_path)
+    assert await reopened.get("k") == {"crop_scores": {"1": 80}}
+    assert reopened.stats()["disk_hits"] == 1
+    assert await reopened.get("k") is not None
+    assert reopened.stats()["memory_hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_misses(tmp_path):
+    cache = make_cache(tmp_path, ttl_seconds=0.05)
+    await cache.set("k", [1, 2, 3])
+    time.sleep(0.1)
+    assert await cache.get("k") is None
+    assert await make_cache(tmp_path).get("k") is None
+
+
+@pytest.mark.asyncio
+async def test_size_caps_evict_oldest(tmp_path):
+    cache = make_cache(tmp_path, max_memory_entries=2, max_disk_entries=3)
+    for i in range(5):
+        await cache.set(f"k{i}", i)
+    assert cache.stats()["memory_entries"] == 2
+
+    reopened = make_cache(tmp_path)
+    assert await reopened.get("k0") is None
+    assert await reopened.get("k1") is None
+    assert [await reopened.get(f"k{i}") for i in (2, 3, 4)] == [2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_never_stores(tmp_path):
+    cache = make_cache(tmp_path, enabled=False)
+    await cache.set("k", 1)
+    assert await cache.get("k") is None
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_runs_off_the_event_loop(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path)
+    threads = []
+    for name in ("_disk_get", "_disk_put"):
+        original = getattr(cache, name)
+
+        def record(*args, _original=original):
+            threads.append(threading.get_ident())
+            return _original(*args)
+
+        monkeypatch.setattr(cache, name, record)
+
+    await cache.set("k", 1)
+    assert await cache.get("k") == 1  # memory hit: no disk read
+    assert await cache.get("other") is None
+
+    assert len(threads) == 2
+    assert threading.get_ident() not in threads
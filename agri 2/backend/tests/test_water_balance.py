@@ -0,0 +1,118 @@
+"""
+Tests for FAO-56 ET₀, Kc curves and the numeric Model 3 water balance.
+
+Run with:
+    python -m pytest backend/tests/test_water_balance.py -v
+"""
+
+from datetime import date
+
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, patch
+
+import backend.config as cfg
+from backend.services.environment_metrics import compute_environmental_data
+from backend.services.evapotranspiration import reference_et0, saturation_vapour_pressure
+from backend.services.models import model3_water_balance
+from backend.services.power_series_store import CellSeries
+from backend.services.water_balance import crop_water_balance, default_kc_curve, stage_kc_curve
+from backend.tests.test_llm_pipeline import make_context
+
+
+def test_et0_matches_fao56_example_18():
+    # Brussels, 6 July: Tmax 21.5, Tmin 12.3, ea 1.409 kPa, u2 2.078 m/s, Rs 22.07 → ET₀ 3.9 mm/day
+    es = (saturation_vapour_pressure(21.5) + saturation_vapour_pressure(12.3)) / 2
+    et0 = reference_et0(
+        np.array([21.5]), np.array([12.3]), np.array([187]), latitude=50.8, elevation=100,
+        rh_mean=np.array([1.409 / es * 100]), wind_2m=np.array([2.078]), solar_radiation=np.array([22.07]),
+    )
+    assert et0[0] == pytest.approx(3.9, abs=0.05)
+
+
+def test_et0_falls_back_for_missing_inputs():
+    et0 = reference_et0(
+        np.array([34.0, 34.0]), np.array([22.0, 22.0]), np.array([150, 150]), latitude=19.0,
+        rh_mean=np.array([np.nan, 55.0]), wind_2m=None, solar_radiation=np.array([np.nan, 24.0]),
+    )
+    assert np.all(np.isfinite(et0)) and np.all((et0 > 3) & (et0 < 9))
+
+
+def test_default_kc_curve_follows_fao_stages():
+    curve = default_kc_curve("Maize (Hybrid)", 100)
+    assert curve[0] == pytest.approx(0.30)
+    assert curve[50] == pytest.approx(1.20)
+    assert curve[-1] == pytest.approx(0.6, abs=0.02)
+    assert default_kc_curve("Unknown crop", 10)[0] == pytest.approx(0.40)
+
+
+def test_stage_templates_override_defaults():
+    stages = [
+        {"start_day": 0, "end_day": 19, "kc": 0.5},
+        {"start_day": 20, "end_day": 59, "kc": 1.1},
+    ]
+    curve = stage_kc_curve(stages, 70)
+    assert curve[0] == 0.5 and curve[30] == 1.1 and curve[65] == 1.1
+
+
+def test_balance_deficit_and_irrigation_cover():
+    crops = make_context().selected_crops
+    dry = crop_water_balance(crops, [5.0] * 30, [0.0] * 30, "Rainfed", initial_soil_moisture=0.0)
+    wet = crop_water_balance(crops, [3.0] * 30, [20.0] * 30, "Rainfed", initial_soil_moisture=1.0)
+    irrigated = crop_water_balance(crops, [5.0] * 30, [0.0] * 30, "Adequate", initial_soil_moisture=0.0)
+
+    for crop in crops:
+        key = str(crop.id)
+        assert dry[key]["deficit_mm"] == pytest.approx(dry[key]["etc_mm"], abs=0.2)
+        assert dry[key]["surplus_mm"] == 0
+        assert wet[key]["deficit_mm"] == 0 and wet[key]["surplus_mm"] > 0
+        assert irrigated[key]["unmet_deficit_mm"] == 0
+
+
+def series_with_weather(days: int = 120) -> CellSeries:
+    t = np.arange(days)
+    values = {
+        "T2M": np.full(days, 28.0), "T2M_MIN": np.full(days, 22.0), "T2M_MAX": np.full(days, 34.0),
+        "PRECTOTCORR": np.where(t % 5 == 0, 12.0, 0.0), "RH2M": np.full(days, 65.0),
+        "GWETTOP": np.full(days, 0.5), "WS2M": np.full(days, 2.5), "ALLSKY_SFC_SW_DWN": np.full(days, 20.0),
+    }
+    return CellSeries(date(2025, 6, 1), {k: v.astype(np.float32) for k, v in values.items()}, elevation=560.0)
+
+
+def test_environmental_data_carries_et0_but_does_not_serialize_daily_series():
+    env = compute_environmental_data(series_with_weather(), latitude=19.0)
+    assert 3 < env.et0_mm_day < 7
+    assert len(env.daily_et0_mm) == len(env.daily_rain_mm) == 120
+    assert "daily_et0_mm" not in env.model_dump()
+    assert compute_environmental_data(series_with_weather()).et0_mm_day is None
+
+
+@pytest.mark.asyncio
+async def test_numeric_model_3_needs_no_llm():
+    env = compute_environmental_data(series_with_weather(), latitude=19.0)
+    context = make_context()
+    context.environment.et0_mm_day = env.et0_mm_day
+    context.environment.daily_et0_mm = env.daily_et0_mm
+    context.environment.daily_rain_mm = env.daily_rain_mm
+
+    with patch.object(cfg, "MODEL3_MODE", "numeric"), \
+         patch.object(model3_water_balance, "call_llm", new_callable=AsyncMock) as llm:
+        result = await model3_water_balance.run_model_3(context)
+
+    llm.assert_not_called()
+    assert set(result.crop_scores) == {"1", "4", "7"}
+    assert all(0 <= s <= 100 for s in result.crop_scores.values())
+    assert result.risk_factors["1"]["status"] in {"Deficit", "Balanced", "Surplus"}
+    assert result.confidence == 85
+
+
+@pytest.mark.asyncio
+async def test_model_3_falls_back_to_llm_without_et0():
+    reply = {"model_name": "water_balance", "crop_scores": {"1": 70}, "risk_factors": {},
+             "key_findings": ["ok"], "confidence": 60}
+    with patch.object(cfg, "MODEL3_MODE", "numeric"), \
+         patch.object(model3_water_balance, "call_llm", new=AsyncMock(return_value=reply)) as llm:
+        result = await model3_water_balance.run_model_3(make_context())
+
+    llm.assert_awaited_once()
+    assert result.crop_scores == {"1": 70}
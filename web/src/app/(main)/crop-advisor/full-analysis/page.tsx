@@ -3,6 +3,7 @@
 import React, { useEffect, useState, useRef, Suspense, useCallback } from "react";
 import { useSearchParams } from "next/navigation";
 import EnvironmentalLoadingScreen from "@/components/agri2/EnvironmentalLoadingScreen";
+import { streamJobUntilComplete } from "@/services/cropAdvisor/pipeline";
 
 // ─── Types ────────────────────────────────────────────────────────────────────
 
@@ -28,6 +29,27 @@ const MODEL_META = [
   { icon: "trending_up", title: "Demand & Price Outlook", thinkMsg: "Analyzing commodity demand trends..." },
 ];
 
+// Where a result's numbers came from (backend `provenance`). Refine jobs show
+// the numeric estimate at once; each card flips to "AI" as the LLM replaces it.
+// "computed" (FAO-56 water balance) is final from the start.
+const PROVENANCE_BADGE: Record<string, { label: string; className: string }> = {
+  llm: { label: "AI", className: "bg-indigo-50 text-indigo-600 border-indigo-200" },
+  computed: { label: "Computed", className: "bg-emerald-50 text-emerald-700 border-emerald-200" },
+  numeric: { label: "Estimate", className: "bg-slate-100 text-slate-500 border-slate-200" },
+  numeric_fallback: { label: "Estimate · AI unavailable", className: "bg-amber-50 text-amber-700 border-amber-200" },
+  mixed: { label: "AI + Estimate", className: "bg-sky-50 text-sky-700 border-sky-200" },
+};
+
+function ProvenanceBadge({ provenance }: { provenance?: string }) {
+  const badge = provenance ? PROVENANCE_BADGE[provenance] : undefined;
+  if (!badge) return null;
+  return (
+    <span className={`px-2 py-0.5 ml-1 rounded-full text-[10px] font-bold uppercase tracking-wider border ${badge.className}`}>
+      {badge.label}
+    </span>
+  );
+}
+
 // Map backend status string → which model index is currently loading (0-indexed)
 const STATUS_TO_LOADING_IDX: Record<string, number> = {
   processing_model_1: 0,
@@ -149,6 +171,7 @@ function ModelCard({ num, state, data, icon, title, thinkMsg }: ModelCardProps)
               {scoreLabel}
             </span>
           )}
+          {state === "completed" && <ProvenanceBadge provenance={data?.provenance} />}
           {state === "error" && (
             <span className="px-2 py-0.5 ml-2 rounded-full text-[10px] font-bold uppercase tracking-wider bg-red-50 text-red-600 border border-red-200">
               Error
@@ -585,6 +608,8 @@ function FullAnalysisContent() {
             water_availability: water,
             budget_per_acre: parseFloat(budgetStr || "50000"),
             soil_type: soil,
+            // Numeric estimate for every card at once, then the LLM refines it
+            mode: "refine",
           }),
         });
         if (!res.ok) return;
@@ -643,6 +668,22 @@ function FullAnalysisContent() {
     return () => clearInterval(interval);
   }, [analysisId, status, updateModelCards, serverRestarted]);
 
+  // ── Push each model card the moment it finishes (SSE) ───────────────────
+  // Polling above still owns status and the final result; the event stream
+  // only delivers model_result events so cards don't wait for the next poll.
+  useEffect(() => {
+    if (!analysisId || serverRestarted) return;
+    const controller = new AbortController();
+    streamJobUntilComplete(analysisId, undefined, controller.signal, (modelKey, result) => {
+      setModelResults(prev => ({ ...prev, [modelKey]: result }));
+    }).catch(() => { /* polling reports failures */ });
+    return () => controller.abort();
+  }, [analysisId, serverRestarted]);
+
+  useEffect(() => {
+    updateModelCards(status, modelResults, fullResult);
+  }, [status, modelResults, fullResult, updateModelCards]);
+
 
   // cropNames are now populated directly from polling response (data.crop_names)
   // Fallback: also try URL param crop_names if backend didn't return any yet
@@ -658,20 +699,23 @@ function FullAnalysisContent() {
   }, []);
 
   // ── Computed values from result ─────────────────────────────────────────
-  const bestCrop = fullResult?.final_decision
-    ? cropNames[String(fullResult.final_decision.best_crop_id)] ||
-    `Crop ${fullResult.final_decision.best_crop_id}`
+  // Refine jobs store a numeric Model 9 up front: show it until the final result lands
+  const decision = fullResult?.final_decision ?? modelResults["model_9"] ?? null;
+  const bestCrop = decision
+    ? cropNames[String(decision.best_crop_id)] ||
+    `Crop ${decision.best_crop_id}`
     : "Analyzing...";
-  const confidence = fullResult?.final_decision?.confidence_score ?? 0;
-  const compositeScore = fullResult?.final_decision
-    ? Object.values(fullResult.final_decision.decision_matrix as Record<string, any>)
-      .find((e: any) => String(e.crop_id) === String(fullResult.final_decision.best_crop_id))
+  const confidence = decision?.confidence_score ?? 0;
+  const compositeScore = decision
+    ? Object.values(decision.decision_matrix as Record<string, any>)
+      .find((e: any) => String(e.crop_id) === String(decision.best_crop_id))
       ?.overall_score ?? 94
     : 0;
 
-  // true when all 8 models have returned results (triggers TopCropsCard reveal)
+  // true when all 8 models have returned results (triggers TopCropsCard reveal);
+  // a refine-mode estimate still waiting for its LLM result doesn't count
   const isFullyDone = status === "completed" ||
-    MODEL_KEYS.every(k => !!modelResults[k]);
+    MODEL_KEYS.every(k => !!modelResults[k] && modelResults[k].provenance !== "numeric");
 
   // ─── Server-restarted error screen ───────────────────────────────────────
   if (serverRestarted) {
@@ -806,6 +850,7 @@ function FullAnalysisContent() {
               <span className="text-slate-500 text-xs">
                 {isFullyDone ? "Analysis Complete" : "Analysis In Progress…"}
               </span>
+              <ProvenanceBadge provenance={decision?.provenance} />
             </div>
             <h1 className="text-4xl font-extrabold text-black tracking-tight mb-2">
               {bestCrop}{" "}
@@ -896,9 +941,9 @@ function FullAnalysisContent() {
           {(() => {
             const completedCount = Object.keys(modelResults).length;
 
-            // ── Resolve best crop ID from fullResult ──────────────────────────
-            const bestCropId = fullResult?.final_decision?.best_crop_id
-              ? String(fullResult.final_decision.best_crop_id)
+            // ── Resolve best crop ID from the (possibly preliminary) decision ──
+            const bestCropId = decision?.best_crop_id
+              ? String(decision.best_crop_id)
               : undefined;
 
             // Helper: get a model's score for the best crop (or avg of all crops)
@@ -951,9 +996,9 @@ function FullAnalysisContent() {
             const hasEconomicData = !!modelResults['model_5'];
             const econFindings: string[] = modelResults['model_5']?.key_findings ?? [];
             const econScore = getModelScore('model_5', 0);
-            // Estimate yield profit: use market_price and yield from fullResult's decision matrix
-            const dmEntry = fullResult?.final_decision?.decision_matrix
-              ? Object.values(fullResult.final_decision.decision_matrix as Record<string, any>)
+            // Estimate yield profit: use market_price and yield from the decision matrix
+            const dmEntry = decision?.decision_matrix
+              ? Object.values(decision.decision_matrix as Record<string, any>)
                 .find((e: any) => bestCropId && String(e.crop_id) === bestCropId)
               : undefined;
             const profitPerAcre = dmEntry?.profit_per_acre  // might be string "₹12000"
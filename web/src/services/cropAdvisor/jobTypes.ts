@@ -3,6 +3,8 @@
  * Type definitions for job-based pipeline execution
  */
 
+import type { FinalDecision } from "./types";
+
 export interface JobProgress {
     current_model: number;
     total_models: number;
@@ -17,6 +19,7 @@ export interface JobStatusResponse {
     status: JobStatus;
     progress: JobProgress | null;
     result: any | null; // Will be FinalDecision when completed
+    preliminary_result?: FinalDecision | null; // refine mode: numeric estimate until completed
     error: string | null;
     created_at: string;
     updated_at: string;
@@ -26,4 +29,6 @@ export interface JobSubmitResponse {
     job_id: string;
     status: string;
     message: string;
+    mode?: string;
+    preliminary_result?: FinalDecision | null; // refine mode only
 }
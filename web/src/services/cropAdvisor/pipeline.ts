@@ -7,11 +7,20 @@ import type { JobSubmitResponse, JobStatusResponse, JobProgress } from "./jobTyp
 
 // Re-export job types for convenience
 export type { JobSubmitResponse, JobStatusResponse, JobProgress };
+/** Raw per-model result pushed by the backend ("model_1".."model_9") */
+export type ModelResultHandler = (modelKey: string, result: Record<string, any>) => void;
+/** Refine-mode numeric estimate, shown until the LLM result replaces it */
+export type PreliminaryHandler = (result: FinalDecision) => void;
+
+/** "refine" = numeric estimate at once, then LLM results replace it card by card */
+export type AnalysisMode = 'llm' | 'instant' | 'refine';
+
 export interface PipelineOptions {
     district?: string;
     state?: string;
     marketDistance?: number;
     selectedCropIds?: string[];
+    mode?: AnalysisMode; // omitted = server's ANALYSIS_MODE
 }
 
 // Python backend URL
@@ -46,7 +55,8 @@ export async function submitPipelineJob(
             district: options?.district,
             state: options?.state,
             market_distance: options?.marketDistance,
-            selected_crop_ids: options?.selectedCropIds
+            selected_crop_ids: options?.selectedCropIds,
+            mode: options?.mode
         })
     });
 
@@ -102,9 +112,11 @@ export async function getJobResult(jobId: string): Promise<FinalDecision> {
 export async function pollJobUntilComplete(
     jobId: string,
     onProgress?: (progress: JobProgress) => void,
-    signal?: AbortSignal
+    signal?: AbortSignal,
+    onPreliminary?: PreliminaryHandler
 ): Promise<FinalDecision> {
     let attempts = 0;
+    let sentPreliminary = false;
 
     while (attempts < MAX_POLL_ATTEMPTS) {
         if (signal?.aborted) {
@@ -119,6 +131,11 @@ export async function pollJobUntilComplete(
                 onProgress(status.progress);
             }
 
+            if (status.preliminary_result && onPreliminary && !sentPreliminary) {
+                sentPreliminary = true;
+                onPreliminary(status.preliminary_result);
+            }
+
             // Check if completed
             if (status.status === 'completed' && status.result) {
                 clearJobId(); // Clear stored job ID on completion
@@ -149,6 +166,73 @@ export async function pollJobUntilComplete(
     throw new Error('Job polling timeout - job took too long to complete');
 }
 
+/**
+ * Follow a job over Server-Sent Events (/jobs/{id}/events).
+ * The backend pushes progress and each model result as it completes, so there
+ * is no polling delay; onModelResult receives every model card the moment it
+ * is ready, and onPreliminary the refine-mode estimate. Falls back to polling
+ * if EventSource is unavailable or the stream errors before the job finishes
+ * (polling reports progress and the preliminary result only).
+ */
+export function streamJobUntilComplete(
+    jobId: string,
+    onProgress?: (progress: JobProgress) => void,
+    signal?: AbortSignal,
+    onModelResult?: ModelResultHandler,
+    onPreliminary?: PreliminaryHandler
+): Promise<FinalDecision> {
+    if (typeof EventSource === 'undefined') {
+        return pollJobUntilComplete(jobId, onProgress, signal, onPreliminary);
+    }
+
+    return new Promise<FinalDecision>((resolve, reject) => {
+        const source = new EventSource(`${PYTHON_API_URL}/api/crop-advisor/jobs/${jobId}/events`);
+        let settled = false;
+        const finish = () => {
+            settled = true;
+            source.close();
+        };
+
+        signal?.addEventListener('abort', () => {
+            finish();
+            reject(new Error('Polling cancelled'));
+        });
+
+        source.addEventListener('progress', (event) => {
+            if (onProgress) onProgress(JSON.parse((event as MessageEvent).data) as JobProgress);
+        });
+
+        source.addEventListener('preliminary', (event) => {
+            if (onPreliminary) onPreliminary(JSON.parse((event as MessageEvent).data).result as FinalDecision);
+        });
+
+        source.addEventListener('model_result', (event) => {
+            if (!onModelResult) return;
+            const { model_key, result } = JSON.parse((event as MessageEvent).data);
+            onModelResult(model_key, result);
+        });
+
+        source.addEventListener('completed', (event) => {
+            finish();
+            clearJobId();
+            resolve(JSON.parse((event as MessageEvent).data).result as FinalDecision);
+        });
+
+        source.addEventListener('failed', (event) => {
+            finish();
+            clearJobId();
+            reject(new Error(JSON.parse((event as MessageEvent).data).error || 'Job failed'));
+        });
+
+        source.onerror = () => {
+            if (settled) return;
+            // Stream dropped (proxy, server restart): carry on by polling
+            finish();
+            pollJobUntilComplete(jobId, onProgress, signal, onPreliminary).then(resolve, reject);
+        };
+    });
+}
+
 /**
  * Main function: Run pipeline with job-based approach
  * This is the new recommended way to run the pipeline
@@ -157,17 +241,22 @@ export async function runPipelineWithJob(
     input: UserInput,
     envData: EnvironmentalData,
     options?: PipelineOptions,
-    onProgress?: (progress: JobProgress) => void
+    onProgress?: (progress: JobProgress) => void,
+    onModelResult?: ModelResultHandler,
+    onPreliminary?: PreliminaryHandler
 ): Promise<FinalDecision> {
     try {
-        // 1. Submit job
-        const { job_id } = await submitPipelineJob(input, options);
+        // 1. Submit job (refine mode answers with a numeric estimate right away)
+        const { job_id, preliminary_result } = await submitPipelineJob(input, options);
+        if (preliminary_result && onPreliminary) {
+            onPreliminary(preliminary_result);
+        }
 
         // 2. Save job ID for reconnection
         saveJobId(job_id);
 
-        // 3. Poll until complete
-        const result = await pollJobUntilComplete(job_id, onProgress);
+        // 3. Stream progress until complete
+        const result = await streamJobUntilComplete(job_id, onProgress, undefined, onModelResult);
 
         return result;
 
@@ -184,7 +273,9 @@ export async function runPipelineWithJob(
  */
 export async function reconnectToJob(
     jobId: string,
-    onProgress?: (progress: JobProgress) => void
+    onProgress?: (progress: JobProgress) => void,
+    onModelResult?: ModelResultHandler,
+    onPreliminary?: PreliminaryHandler
 ): Promise<FinalDecision | null> {
     try {
         // Check initial status
@@ -200,8 +291,8 @@ export async function reconnectToJob(
             throw new Error(status.error || 'Job failed');
         }
 
-        // If still processing, poll until complete
-        return await pollJobUntilComplete(jobId, onProgress);
+        // If still processing, stream until complete
+        return await streamJobUntilComplete(jobId, onProgress, undefined, onModelResult, onPreliminary);
 
     } catch (error) {
         console.error("Reconnection error:", error);
@@ -214,7 +305,9 @@ export async function reconnectToJob(
  * Check if there's an active job and try to reconnect
  */
 export async function checkAndReconnectActiveJob(
-    onProgress?: (progress: JobProgress) => void
+    onProgress?: (progress: JobProgress) => void,
+    onModelResult?: ModelResultHandler,
+    onPreliminary?: PreliminaryHandler
 ): Promise<FinalDecision | null> {
     const jobId = getActiveJobId();
 
@@ -223,7 +316,7 @@ export async function checkAndReconnectActiveJob(
     }
 
     console.log(`🔄 Found active job ${jobId}, attempting to reconnect...`);
-    return await reconnectToJob(jobId, onProgress);
+    return await reconnectToJob(jobId, onProgress, onModelResult, onPreliminary);
 }
 
 // ==========================================
@@ -58,6 +58,7 @@ export interface ModelResult {
     summary: string; // "Rainfall is highly consistent."
     ui_state: 'success' | 'warning' | 'danger';
     debug_info?: any;
+    provenance?: 'llm' | 'computed' | 'numeric' | 'numeric_fallback' | 'mixed'; // where the score came from
 }
 
 export interface ScoreComponent {